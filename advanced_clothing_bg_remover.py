@@ -9,21 +9,75 @@ import sys
 from pathlib import Path
 from PIL import Image, ImageEnhance, ImageOps
 import numpy as np
-from rembg import remove, new_session
 import cv2
 
+from batch_scheduler import BatchScheduler
+from mask_utils import apply_masks, combine_masks
+from metrics import stage_timer
+from stage_timings import StageTimings
+from model_discovery import resolve_precision, session_key
+from session_pool import get_session_pool
+from image_io import open_image
+from variant_utils import render_variant
+
 class AdvancedClothingBgRemover:
-    def __init__(self, model_name='u2net_cloth_seg'):
+    # E-ticaret standart boyutları (create_product_variants / render_product_variants)
+    VARIANT_SIZES = {
+        "thumbnail": (150, 150),
+        "small": (300, 300),
+        "medium": (600, 600),
+        "large": (1200, 1200),
+        "square": (800, 800)
+    }
+    
+    def __init__(self, model_name='u2net_cloth_seg', batch_size=1, batch_wait_ms=10, mask_cache=None,
+                 session_pool=None, precision='fp32'):
         self.model_name = model_name
-        self.session = new_session(model_name)
-        print(f"✅ Model yüklendi: {model_name}")
+        # 'fp32' / 'int8' - nicelenmiş model kabul edilmemişse fp32'ye düşer
+        self.precision = resolve_precision(model_name, precision)
+        # Session'lar süreç genelindeki havuzdan alınır (diğer remover'larla paylaşılır)
+        self.session_pool = session_pool or get_session_pool()
+        self.session_pool.get(model_name, self.precision)
+        # Ham model maskelerinin önbelleği (isteğe bağlı, MaskCache)
+        self.mask_cache = mask_cache
+        # Eşzamanlı istekleri tek ONNX çalıştırmasında toplayan zamanlayıcı
+        self.scheduler = BatchScheduler(
+            lambda: self.session_pool.get(self.model_name, self.precision),
+            model_name, batch_size, batch_wait_ms
+        )
+        print(f"✅ Model yüklendi: {self.model_label}")
         
+    @property
+    def session(self):
+        """
+        Modelin session'ı - havuzdan alınır
+        """
+        return self.session_pool.get(self.model_name, self.precision)
+    
+    @property
+    def model_label(self):
+        """
+        Yanıtlarda raporlanan model adı, ör. 'u2net_cloth_seg@int8'
+        """
+        return session_key(self.model_name, self.precision)
+    
     def analyze_image(self, image_path):
         """
         Görüntüyü analiz et ve öneriler sun
         """
         try:
             img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ Analiz hatası: {e}")
+            return None
+        
+        return self.analyze_loaded_image(img)
+    
+    def analyze_loaded_image(self, img):
+        """
+        Bellekteki görüntüyü analiz et ve öneriler sun
+        """
+        try:
             width, height = img.size
             aspect_ratio = width / height
             
@@ -55,12 +109,27 @@ class AdvancedClothingBgRemover:
         """
         try:
             img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ Ön işleme hatası: {e}")
+            return None
+        
+        return self.preprocess_loaded_image(img, target_size, maintain_aspect)
+    
+    def preprocess_loaded_image(self, img, target_size=None, maintain_aspect=True):
+        """
+        Bellekteki görüntüyü rembg için optimize et
+        """
+        try:
             original_size = img.size
             
             # RGB'ye çevir
             if img.mode != 'RGB':
+                original_mode = img.mode
                 img = img.convert('RGB')
-                print(f"🔄 {img.mode} -> RGB dönüştürüldü")
+                print(f"🔄 {original_mode} -> RGB dönüştürüldü")
+            else:
+                # thumbnail() yerinde çalışır, çağıranın görüntüsünü bozmamak için kopyala
+                img = img.copy()
             
             # Boyut optimizasyonu
             if target_size:
@@ -87,82 +156,147 @@ class AdvancedClothingBgRemover:
         """
         Gelişmiş arka plan kaldırma
         """
+        print(f"\n🔄 İşleniyor: {os.path.basename(input_path)}")
+        
+        try:
+            img = Image.open(input_path)
+        except Exception as e:
+            print(f"❌ Arka plan kaldırma hatası: {e}")
+            return None
+        
+        result = self.remove_background_image(img, preprocess=preprocess)
+        if result is None:
+            return None
+        
+        # Çıktı dosyası yolu
+        if output_path is None:
+            input_file = Path(input_path)
+            output_path = input_file.parent / f"{input_file.stem}_no_bg.png"
+        
+        # Kaydet
+        result.save(output_path, "PNG")
+        
+        print(f"✅ Arka plan kaldırıldı: {output_path}")
+        return str(output_path)
+    
+    def remove_background_image(self, img, preprocess=True, timings=None):
+        """
+        Gelişmiş arka plan kaldırma (bellek içi) - RGBA PIL görüntüsü döner
+        timings (StageTimings) verilirse ön işleme ve model süreleri eklenir.
+        """
         try:
-            print(f"\n🔄 İşleniyor: {os.path.basename(input_path)}")
-            
             # Görüntüyü analiz et
-            analysis = self.analyze_image(input_path)
+            analysis = self.analyze_loaded_image(img)
             if not analysis:
                 return None
             
+            input_img = img
+            
             # Ön işleme
             if preprocess:
-                # Optimal boyut hesapla
-                original_w, original_h = analysis['width'], analysis['height']
-                
-                # rembg için optimal boyutlar (832x832 veya katları)
-                optimal_sizes = [512, 640, 832, 1024]
-                target_size = min(optimal_sizes, key=lambda x: abs(x - max(original_w, original_h)))
-                
-                print(f"🎯 Hedef boyut: {target_size}x{target_size}")
-                
-                processed_img = self.preprocess_image(
-                    input_path, 
-                    target_size=(target_size, target_size), 
-                    maintain_aspect=True
-                )
-                
-                if not processed_img:
-                    # Ön işleme başarısızsa orijinal dosyayı kullan
-                    with open(input_path, 'rb') as f:
-                        input_data = f.read()
-                else:
-                    # Ön işlenmiş görüntüyü byte'a çevir
-                    import io
-                    img_byte_arr = io.BytesIO()
-                    processed_img.save(img_byte_arr, format='PNG')
-                    input_data = img_byte_arr.getvalue()
-            else:
-                with open(input_path, 'rb') as f:
-                    input_data = f.read()
+                with stage_timer('preprocess', self.model_label, timings):
+                    input_img = self.model_input_image(img)
             
-            # Arka planı kaldır
+            # Arka planı kaldır - PIL görüntüsü doğrudan verilir, PNG encode/decode yok
             print("🤖 rembg işlemi başlıyor...")
-            output_data = remove(input_data, session=self.session)
-            
-            # Çıktı dosyası yolu
-            if output_path is None:
-                input_file = Path(input_path)
-                output_path = input_file.parent / f"{input_file.stem}_no_bg.png"
-            
-            # Kaydet
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
-            
-            print(f"✅ Arka plan kaldırıldı: {output_path}")
-            return str(output_path)
+            with stage_timer('inference', self.model_label, timings):
+                return apply_masks(input_img, self.predict_masks(input_img))
             
         except Exception as e:
             print(f"❌ Arka plan kaldırma hatası: {e}")
             return None
     
+    def model_input_image(self, img):
+        """
+        Görüntüyü modele uygun optimal boyuta getir, başarısızsa orijinali döndür
+        """
+        # rembg için optimal boyutlar (832x832 veya katları)
+        optimal_sizes = [512, 640, 832, 1024]
+        target_size = min(optimal_sizes, key=lambda x: abs(x - max(img.size)))
+        
+        print(f"🎯 Hedef boyut: {target_size}x{target_size}")
+        
+        processed_img = self.preprocess_loaded_image(
+            img, 
+            target_size=(target_size, target_size), 
+            maintain_aspect=True
+        )
+        
+        # Ön işleme başarısızsa orijinal görüntüyü kullan
+        return processed_img or img
+    
+    def predict_alpha(self, img, preprocess=True):
+        """
+        Sadece alfa maskesi (bellek içi) - girdiyle aynı boyutta 'L' maske döner
+        Konumlandırma/iyileştirme yapılmaz; maske orijinal fotoğrafla hizalıdır.
+        """
+        try:
+            with stage_timer('preprocess', self.model_label):
+                input_img = self.model_input_image(img) if preprocess else img
+            with stage_timer('inference', self.model_label):
+                alpha = combine_masks(self.predict_masks(input_img))
+            if alpha is not None and alpha.size != img.size:
+                alpha = alpha.resize(img.size, Image.Resampling.BILINEAR)
+            return alpha
+            
+        except Exception as e:
+            print(f"❌ Maske hatası: {e}")
+            return None
+    
+    def predict_masks(self, img):
+        """
+        Model maskelerini al - önce maske önbelleği, sonra mikro-batch zamanlayıcı
+        """
+        if self.mask_cache is not None:
+            return self.mask_cache.get_or_predict(img, self.model_label, self.scheduler.predict)
+        return self.scheduler.predict(img)
+    
     def fix_positioning(self, image_path, output_path=None, center_vertically=True, add_padding=True):
         """
         Görüntü konumlandırmasını düzelt
         """
         try:
-            img = Image.open(image_path).convert("RGBA")
-            width, height = img.size
+            img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ Konumlandırma hatası: {e}")
+            return image_path
+        
+        positioned = self.fix_positioning_image(
+            img,
+            center_vertically=center_vertically,
+            add_padding=add_padding
+        )
+        if positioned is img:
+            return image_path
+        
+        # Çıktı dosyası
+        if output_path is None:
+            input_file = Path(image_path)
+            output_path = input_file.parent / f"{input_file.stem}_positioned.png"
+        
+        positioned.save(output_path, "PNG")
+        print(f"✅ Konumlandırma düzeltildi: {output_path}")
+        
+        return str(output_path)
+    
+    def fix_positioning_image(self, img, center_vertically=True, add_padding=True):
+        """
+        Görüntü konumlandırmasını düzelt (bellek içi)
+        Nesne bulunamazsa veya hata olursa girdi görüntüsünü aynen döner
+        """
+        try:
+            rgba = img.convert("RGBA")
+            width, height = rgba.size
             
             print(f"🔧 Konumlandırma düzeltiliyor: {width}x{height}")
             
             # Alpha kanalından nesne sınırlarını bul
-            alpha = np.array(img)[:,:,3]
+            alpha = np.array(rgba)[:,:,3]
             non_zero_indices = np.where(alpha > 0)
             
             if len(non_zero_indices[0]) == 0:
                 print("⚠️  Şeffaf olmayan piksel bulunamadı")
-                return image_path
+                return img
             
             # Nesne sınırları
             top = np.min(non_zero_indices[0])
@@ -206,34 +340,52 @@ class AdvancedClothingBgRemover:
             
             # Nesneyi yeni konuma yapıştır
             crop_box = (left, top, right + 1, bottom + 1)
-            object_img = img.crop(crop_box)
+            object_img = rgba.crop(crop_box)
             new_canvas.paste(object_img, (paste_x, paste_y), object_img)
             
-            # Çıktı dosyası
-            if output_path is None:
-                input_file = Path(image_path)
-                output_path = input_file.parent / f"{input_file.stem}_positioned.png"
-            
-            new_canvas.save(output_path, "PNG")
-            print(f"✅ Konumlandırma düzeltildi: {output_path}")
             print(f"📏 Yeni boyut: {canvas_size}x{canvas_size}")
             
-            return str(output_path)
+            return new_canvas
             
         except Exception as e:
             print(f"❌ Konumlandırma hatası: {e}")
-            return image_path
+            return img
     
     def enhance_for_ecommerce(self, image_path, output_path=None):
         """
         E-ticaret için görüntüyü iyileştir
         """
         try:
-            img = Image.open(image_path).convert("RGBA")
+            img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ İyileştirme hatası: {e}")
+            return image_path
+        
+        enhanced = self.enhance_for_ecommerce_image(img)
+        if enhanced is img:
+            return image_path
+        
+        # Çıktı dosyası
+        if output_path is None:
+            input_file = Path(image_path)
+            output_path = input_file.parent / f"{input_file.stem}_enhanced.png"
+        
+        enhanced.save(output_path, "PNG")
+        print(f"✅ E-ticaret iyileştirmesi: {output_path}")
+        
+        return str(output_path)
+    
+    def enhance_for_ecommerce_image(self, img):
+        """
+        E-ticaret için görüntüyü iyileştir (bellek içi)
+        """
+        try:
+            rgba = img.convert("RGBA")
+            alpha = rgba.split()[3]
             
             # Kontrast iyileştirmesi (sadece RGB kanalları)
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])  # Alpha maskesi ile
+            rgb_img = Image.new("RGB", rgba.size, (255, 255, 255))
+            rgb_img.paste(rgba, mask=alpha)  # Alpha maskesi ile
             
             # Kontrast
             enhancer = ImageEnhance.Contrast(rgb_img)
@@ -253,21 +405,13 @@ class AdvancedClothingBgRemover:
             
             # Alpha kanalını geri ekle
             final_img = rgb_img.convert("RGBA")
-            final_img.putalpha(img.split()[3])  # Orijinal alpha kanalı
-            
-            # Çıktı dosyası
-            if output_path is None:
-                input_file = Path(image_path)
-                output_path = input_file.parent / f"{input_file.stem}_enhanced.png"
-            
-            final_img.save(output_path, "PNG")
-            print(f"✅ E-ticaret iyileştirmesi: {output_path}")
+            final_img.putalpha(alpha)  # Orijinal alpha kanalı
             
-            return str(output_path)
+            return final_img
             
         except Exception as e:
             print(f"❌ İyileştirme hatası: {e}")
-            return image_path
+            return img
     
     def create_product_variants(self, image_path, output_dir=None):
         """
@@ -278,51 +422,52 @@ class AdvancedClothingBgRemover:
                 output_dir = Path(image_path).parent / "variants"
             else:
                 output_dir = Path(output_dir)
-                
-            output_dir.mkdir(exist_ok=True)
             
-            img = Image.open(image_path).convert("RGBA")
+            img = Image.open(image_path)
             base_name = Path(image_path).stem
             
-            # E-ticaret standart boyutları
-            variants = {
-                "thumbnail": (150, 150),
-                "small": (300, 300),
-                "medium": (600, 600),
-                "large": (1200, 1200),
-                "square": (800, 800)
-            }
-            
-            created_files = []
-            
-            for variant_name, size in variants.items():
-                # Boyutu ayarla (en-boy oranını koru)
-                img_copy = img.copy()
-                img_copy.thumbnail(size, Image.Resampling.LANCZOS)
-                
-                # Kare canvas oluştur
-                canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-                
-                # Merkezle
-                paste_x = (size[0] - img_copy.width) // 2
-                paste_y = (size[1] - img_copy.height) // 2
-                canvas.paste(img_copy, (paste_x, paste_y), img_copy)
-                
-                # Kaydet
-                variant_path = output_dir / f"{base_name}_{variant_name}.png"
-                canvas.save(variant_path, "PNG")
-                created_files.append(str(variant_path))
-                print(f"✅ Varyant oluşturuldu: {variant_name} ({size[0]}x{size[1]})")
-            
-            return created_files
+            return self.save_product_variants(self.render_product_variants(img), output_dir, base_name)
             
         except Exception as e:
             print(f"❌ Varyant oluşturma hatası: {e}")
             return []
     
-    def process_clothing_complete(self, input_path, options=None):
+    def render_product_variants(self, img):
         """
-        Tam kıyafet işleme pipeline'ı
+        Ürün varyantlarını bellek içinde oluştur - {isim: RGBA görüntü} döner
+        """
+        img = img.convert("RGBA")
+        # Her boyut için: en-boy oranını koru, kare canvas'a ortala
+        return {
+            variant_name: render_variant(img, size)
+            for variant_name, size in self.VARIANT_SIZES.items()
+        }
+    
+    def save_product_variants(self, variants, output_dir, base_name):
+        """
+        Bellek içi ürün varyantlarını PNG olarak kaydet
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True)
+        
+        created_files = []
+        for variant_name, canvas in variants.items():
+            size = canvas.size
+            variant_path = output_dir / f"{base_name}_{variant_name}.png"
+            canvas.save(variant_path, "PNG")
+            created_files.append(str(variant_path))
+            print(f"✅ Varyant oluşturuldu: {variant_name} ({size[0]}x{size[1]})")
+        
+        return created_files
+    
+    def process_clothing_image(self, img, options=None, timings=None):
+        """
+        Tam kıyafet işleme pipeline'ı (bellek içi)
+        Aşamalar arasında PIL görüntüsü taşınır, hiçbir ara dosya yazılmaz.
+        
+        Dönüş: {'image': son görüntü, 'variants': {isim: görüntü},
+                'model': kullanılan model, 'stages': çalışan aşamalar,
+                'timings': StageTimings} veya None
         """
         default_options = {
             'preprocess': True,
@@ -336,44 +481,91 @@ class AdvancedClothingBgRemover:
         if options:
             default_options.update(options)
         
-        print(f"\n{'='*60}")
-        print(f"🚀 TAM İŞLEM BAŞLIYOR: {os.path.basename(input_path)}")
-        print(f"{'='*60}")
-        
-        current_file = input_path
+        stages = []
+        if timings is None:
+            timings = StageTimings()
         
         # 1. Arka planı kaldır
-        bg_removed = self.remove_background_advanced(
-            current_file, 
-            preprocess=default_options['preprocess']
+        current = self.remove_background_image(
+            img, 
+            preprocess=default_options['preprocess'],
+            timings=timings
         )
         
-        if not bg_removed:
+        if current is None:
             return None
-            
-        current_file = bg_removed
+        stages.append('no_bg')
         
         # 2. Konumlandırmayı düzelt
         if default_options['fix_positioning']:
-            positioned = self.fix_positioning(
-                current_file,
-                center_vertically=default_options['center_vertically'],
-                add_padding=default_options['add_padding']
-            )
-            current_file = positioned
+            with stage_timer('positioning', self.model_label, timings):
+                positioned = self.fix_positioning_image(
+                    current,
+                    center_vertically=default_options['center_vertically'],
+                    add_padding=default_options['add_padding']
+                )
+            if positioned is not current:
+                stages.append('positioned')
+            current = positioned
         
         # 3. E-ticaret iyileştirmesi
         if default_options['enhance']:
-            enhanced = self.enhance_for_ecommerce(current_file)
-            current_file = enhanced
+            with stage_timer('enhance', self.model_label, timings):
+                enhanced = self.enhance_for_ecommerce_image(current)
+            if enhanced is not current:
+                stages.append('enhanced')
+            current = enhanced
         
         # 4. Varyantlar oluştur
+        variants = {}
         if default_options['create_variants']:
-            variants = self.create_product_variants(current_file)
+            with stage_timer('variants', self.model_label, timings):
+                variants = self.render_product_variants(current)
             print(f"✅ {len(variants)} varyant oluşturuldu")
         
+        return {
+            'image': current,
+            'variants': variants,
+            'model': self.model_label,
+            'stages': stages,
+            'timings': timings
+        }
+    
+    def process_clothing_complete(self, input_path, options=None, output_dir=None, timings=None):
+        """
+        Tam kıyafet işleme pipeline'ı
+        Girdi bir kez okunur, sadece son çıktılar PNG olarak yazılır.
+        output_dir verilmezse çıktılar girdinin yanına yazılır.
+        timings (StageTimings) verilirse aşama süreleri (decode ... encode) eklenir.
+        """
+        print(f"\n{'='*60}")
+        print(f"🚀 TAM İŞLEM BAŞLIYOR: {os.path.basename(input_path)}")
+        print(f"{'='*60}")
+        
+        try:
+            with stage_timer('decode', self.model_label, timings):
+                img = open_image(input_path)
+        except Exception as e:
+            print(f"❌ Görüntü açılamadı: {e}")
+            return None
+        
+        result = self.process_clothing_image(img, options, timings)
+        if result is None:
+            return None
+        
+        # Dosya adı, eski dosya tabanlı pipeline ile aynı kalır
+        input_file = Path(input_path)
+        output_dir = Path(output_dir) if output_dir else input_file.parent
+        stem = input_file.stem + ''.join(f"_{s}" for s in result['stages'])
+        current_file = output_dir / f"{stem}.png"
+        with stage_timer('encode', self.model_label, timings):
+            result['image'].save(current_file, "PNG")
+        
+        if result['variants']:
+            self.save_product_variants(result['variants'], output_dir / "variants", stem)
+        
         print(f"\n🎉 İşlem tamamlandı: {current_file}")
-        return current_file
+        return str(current_file)
 
 
 def main():
@@ -4,7 +4,7 @@ Kıyafet Arka Plan Kaldırıcı - Web API Server
 iOS projesi için REST API endpoint'leri
 """
 
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, request, jsonify, send_file, render_template_string, Response, g
 from flask_cors import CORS
 import os
 import sys
@@ -18,6 +18,13 @@ import base64
 import logging
 import json
 import traceback
+import threading
+import re
+import contextlib
+import shutil
+import hashlib
+import mimetypes
+from collections import OrderedDict
 
 # HTML template'i
 INDEX_HTML = """
@@ -104,8 +111,30 @@ INDEX_HTML = """
             <code>image</code>: Görüntü dosyası (PNG, JPG)<br>
             <code>model</code>: ultra veya advanced (varsayılan: ultra)<br>
             <code>positioning</code>: smart veya center (varsayılan: smart)<br>
-            <code>enhance</code>: true veya false (varsayılan: false)
+            <code>enhance</code>: true veya false (varsayılan: false)<br>
+            <code>model_name</code>: Ultra için modeli sabitle, ör. u2net_cloth_seg (isteğe bağlı)
         </div>
+        <p>Yük altında ultra model, p95 hedefini (<code>SLO_P95_MS</code>) tutturmak için daha düşük
+        çözünürlük veya hafif model (u2netp/silueta) seçebilir; seçim <code>model_used</code>,
+        <code>quality_tier</code> (full, reduced, light, pinned) ve <code>X-Quality-Tier</code> başlığında döner.
+        Kalitenin önemli olduğu isteklerde <code>model_name</code> ile model sabitlenir.</p>
+        <p>Kademeli mod (<code>CASCADE_MODE=1</code>) açıkken önce hafif model çalışır; maske güveni
+        eşiğin altındaysa ağır model çalışır. Sunan kademe yanıtta <code>cascade</code>
+        (<code>tier</code>: light/heavy, <code>confidence</code>, <code>threshold</code>) ve
+        <code>X-Cascade-Tier</code> başlığında döner.</p>
+        <p>Düz beyaz/gri stüdyo fonlu görüntüler (<code>STUDIO_FAST_PATH=1</code>, varsayılan açık) sinir ağı
+        yerine klasik segmentasyonla onlarca ms'de işlenir; bu durumda <code>model_used</code> "studio" olur.
+        Çalışan yol yanıtta <code>segmentation_path</code> (studio/input_alpha/model) ve <code>X-Segmentation-Path</code>
+        başlığında döner.</p>
+        <p>Alfa kanalı zaten anlamlı bir ön plan maskesi olan PNG'ler (ör. daha önce bu API'den dönen kesimler,
+        <code>REUSE_INPUT_ALPHA=1</code>, varsayılan açık) modele gönderilmez; doğrudan konumlandırma,
+        iyileştirme ve varyantlara geçilir. Bu durumda <code>segmentation_path</code> "input_alpha" olur.
+        Tamamen opak alfa kanalı yok sayılır.</p>
+        <p>Seçili model hata verirse sonuç rembg'nin varsayılan u2net modeliyle üretilir; bu durumda
+        <code>model_used</code> "u2net_fallback" olur ve sonuç normal önbellek anahtarına yazılmaz.</p>
+        <p>Aşama süreleri (decode, preprocess, inference, positioning, enhance, encode; duvar saati ve CPU ms)
+        yanıtta <code>parameters.timings</code> ve standart <code>Server-Timing</code> başlığında döner
+        (base64/binary endpoint'i de aynı).</p>
         <div class="example">
             <strong>Örnek:</strong>
             <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/remove-background \
@@ -122,7 +151,8 @@ INDEX_HTML = """
         <div class="param">
             <code>image_base64</code>: Base64 encoded görüntü<br>
             <code>model</code>: ultra veya advanced<br>
-            <code>positioning</code>: smart veya center
+            <code>positioning</code>: smart veya center<br>
+            <code>model_name</code>: Ultra için modeli sabitle (isteğe bağlı)
         </div>
         <div class="example">
             <strong>Örnek:</strong>
@@ -132,6 +162,98 @@ INDEX_HTML = """
         </div>
     </div>
 
+    <div class="endpoint">
+        <h3>Arka Plan Kaldırma (Binary)</h3>
+        <p><span class="method">POST</span> <span class="url">/api/remove-background-base64</span></p>
+        <p>Gövde ham görüntü byte'ları (<code>Content-Type: image/*</code> veya <code>application/octet-stream</code>),
+        parametreler query string'de. Yanıt <code>Accept</code> başlığına göre ham <code>image/png</code>
+        veya <code>image/webp</code>; metadata <code>X-Processing-Time</code>, <code>X-Model-Used</code>,
+        <code>X-Image-Width</code>, <code>X-Image-Height</code> başlıklarında.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl -X POST "https://cloth-segmentation-api.onrender.com/api/remove-background-base64?model=ultra&positioning=smart" \
+-H "Content-Type: image/jpeg" \
+-H "Accept: image/webp" \
+--data-binary @image.jpg -o sonuc.webp</pre>
+        </div>
+    </div>
+
+    <div class="endpoint">
+        <h3>Sadece Maske (Alfa Kanalı)</h3>
+        <p><span class="method">POST</span> <span class="url">/api/mask</span></p>
+        <p>Orijinal fotoğrafı zaten olan istemciler için: konumlandırma/iyileştirme yapılmadan, fotoğrafla
+        hizalı tek kanallı alfa maskesi döner. Girdi multipart <code>image</code>, ham görüntü gövdesi veya
+        JSON <code>image_base64</code>.</p>
+        <div class="param">
+            <code>model</code>: ultra veya advanced<br>
+            <code>model_name</code>: Ultra için modeli sabitle (isteğe bağlı)<br>
+            <code>size</code>: Maskenin uzun kenarı (px, varsayılan orijinal boyut)<br>
+            <code>format</code>: <code>png</code> (8-bit gri PNG, varsayılan) veya <code>rle</code> (JSON, ikili run-length)<br>
+            <code>threshold</code>: RLE ve sınır kutusu için eşik (1-255, varsayılan 128)
+        </div>
+        <p>PNG yanıtında sınır kutusu <code>X-BBox</code> (x,y,genişlik,yükseklik) başlığında; RLE
+        <code>counts</code> satır öncelikli, arka planla başlayan koşu uzunluklarıdır.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl -X POST "https://cloth-segmentation-api.onrender.com/api/mask?size=512" \
+-H "Content-Type: image/jpeg" \
+--data-binary @image.jpg -o maske.png -D -</pre>
+        </div>
+    </div>
+
+    <div class="endpoint">
+        <h3>Varyantlar (Tembel)</h3>
+        <p><span class="method">GET</span> <span class="url">/api/variant/&lt;result_id&gt;/&lt;boyut&gt;</span></p>
+        <p>Yanıtlardaki <code>result_id</code> ile istenen boyut ilk istekte ana sonuçtan üretilir ve
+        önbelleğe alınır; sadece istenen boyutlar CPU harcar. <code>variants=true</code> /
+        <code>create_variants: true</code> ile yanıtta varyant URL'leri listelenir.
+        Ultra: thumbnail, small, medium, large, xl. Advanced: thumbnail, small, medium, large, square.
+        Yanıtlar <code>ETag</code> ve <code>Cache-Control: immutable</code> taşır.</p>
+        <p><code>/api/download</code> ve <code>/api/preview</code> da içerik hash'li <code>ETag</code>,
+        <code>If-None-Match</code> ile 304 ve <code>Range</code> ile kısmi (206) yanıt destekler.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl -o thumb.png https://cloth-segmentation-api.onrender.com/api/variant/RESULT_ID/thumbnail</pre>
+        </div>
+    </div>
+
+    <div class="endpoint">
+        <h3>Asenkron İş (Job) API</h3>
+        <p><span class="method">POST</span> <span class="url">/api/jobs</span></p>
+        <p><span class="method">GET</span> <span class="url">/api/jobs/&lt;job_id&gt;</span></p>
+        <p><span class="method">GET</span> <span class="url">/api/jobs/&lt;job_id&gt;/result</span></p>
+        <p>Parametreler (form veya JSON):</p>
+        <div class="param">
+            <code>image</code> veya <code>image_base64</code>: Görüntü<br>
+            <code>model</code>, <code>positioning</code>, <code>enhance</code>, <code>model_name</code>: Yukarıdaki gibi
+            (işler zaman aşımına tabi olmadığından her zaman tam kalitede işlenir)<br>
+            <code>callback_url</code>: İş bitince JSON POST gönderilecek adres (isteğe bağlı)
+        </div>
+        <p>Sonuç dosyası saklama süresi (<code>STORAGE_PROCESSED_TTL</code>) veya disk sınırı nedeniyle silinen işler
+        <code>expired</code> durumuna geçer ve sonuç isteği 410 döner. Biten işler
+        <code>JOB_RETENTION_SECONDS</code> (varsayılan 7 gün) sonra günlükten silinir.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl -X POST https://cloth-segmentation-api.onrender.com/api/jobs -F "image=@image.jpg"
+# {"job_id": "...", "status": "queued", "status_url": "/api/jobs/..."}
+curl https://cloth-segmentation-api.onrender.com/api/jobs/JOB_ID
+curl -o sonuc.png https://cloth-segmentation-api.onrender.com/api/jobs/JOB_ID/result</pre>
+        </div>
+    </div>
+
+    <div class="endpoint">
+        <h3>Metrikler (Prometheus)</h3>
+        <p><span class="method">GET</span> <span class="url">/metrics</span></p>
+        <p>Prometheus metin formatı: endpoint ve model bazında istek sayıları ve gecikme histogramları,
+        aşama histogramları (decode, preprocess, inference, positioning, enhance, variants, encode),
+        iş kuyruğu derinliği, önbellek isabet oranları, model yükleme süreleri, süreç RSS'i ve
+        SLO kalite kademesi ve kademeli mod seçimleri.</p>
+        <div class="example">
+            <strong>Örnek:</strong>
+            <pre>curl https://cloth-segmentation-api.onrender.com/metrics</pre>
+        </div>
+    </div>
+
     <h2>📱 Swift Örnek Kod</h2>
     <pre>
 let url = URL(string: "https://cloth-segmentation-api.onrender.com/api/remove-background-base64")!
@@ -163,6 +285,19 @@ URLSession.shared.dataTask(with: request) { data, response, error in
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from ultra_clothing_bg_remover import UltraClothingBgRemover
 from advanced_clothing_bg_remover import AdvancedClothingBgRemover
+from job_queue import JobQueue, QueueFullError
+from result_cache import ResultCache
+from mask_cache import MaskCache
+from mask_utils import encode_mask_rle, mask_bbox, resize_mask
+from image_io import open_image
+from variant_utils import render_variant
+from session_pool import current_rss_bytes, get_session_pool
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, observe_stage, stage_timer
+from stage_timings import StageTimings
+from request_log import RequestLog
+from slo_controller import SloController
+from scratch_workspace import ScratchWorkspace, cleanup_stale_workspaces
+from storage_manager import StorageCategory, StorageManager, is_orphaned_cache_file, is_temp_file
 
 # Google Cloud Run için structured logging setup
 def setup_logging():
@@ -190,7 +325,13 @@ def setup_logging():
     return app_logger
 
 app = Flask(__name__)
-CORS(app)  # iOS'tan istek gelebilsin
+# iOS'tan istek gelebilsin - binary moddaki metadata başlıkları da okunabilsin
+CORS(app, expose_headers=['X-Processing-Time', 'X-Model-Used', 'X-Model-Type',
+                          'X-Positioning', 'X-Image-Width', 'X-Image-Height',
+                          'X-Mask-Width', 'X-Mask-Height', 'X-Original-Width',
+                          'X-Original-Height', 'X-BBox', 'X-Cache', 'X-Result-Id',
+                          'X-Quality-Tier', 'X-Cascade-Tier', 'X-Segmentation-Path',
+                          'Server-Timing'])
 
 # Logging setup
 logger = setup_logging()
@@ -201,28 +342,129 @@ UPLOAD_FOLDER = 'uploads'
 PROCESSED_FOLDER = 'processed'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 
+# Asenkron iş kuyruğu ayarları
+JOB_FOLDER = os.path.join(UPLOAD_FOLDER, 'jobs')
+JOB_DB_PATH = os.environ.get('JOB_DB_PATH', 'jobs.db')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 16))
+
+# Sonuç önbelleği ayarları (0 = katman kapalı)
+RESULT_CACHE_DIR = os.path.join(PROCESSED_FOLDER, 'cache')
+RESULT_CACHE_MEMORY_MB = int(os.environ.get('RESULT_CACHE_MEMORY_MB', 64))
+RESULT_CACHE_DISK_MB = int(os.environ.get('RESULT_CACHE_DISK_MB', 1024))
+
+# Sonuç kimlikleri önbellek anahtarlarıdır (sha256 hex)
+RESULT_ID_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# İndirme ayarları
+# İçerik adresli dosyalar (önbellekteki <sha256>.png) değişmez, uzun süre cache'lenir
+IMMUTABLE_MAX_AGE = 31536000
+PROCESSED_MAX_AGE = int(os.environ.get('PROCESSED_MAX_AGE', 3600))
+# Önde nginx varsa (ör. /internal-processed -> processed/ internal location)
+# dosya gövdesi X-Accel-Redirect ile nginx'e bırakılır
+X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '').rstrip('/')
+
+# Maske önbelleği ayarları (0 = kapalı)
+MASK_CACHE_DIR = os.path.join(PROCESSED_FOLDER, 'masks')
+MASK_CACHE_DISK_MB = int(os.environ.get('MASK_CACHE_DISK_MB', 512))
+
+# Mikro-batch çıkarım ayarları (1 = batch kapalı)
+# HTTP istekleri ancak gunicorn thread sayısı > 1 ise birleşir (gunicorn.conf.py
+# threads varsayılan olarak BATCH_MAX_SIZE); iş kuyruğunda JOB_WORKERS kadar iş birleşebilir.
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 1))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 10))
+
+# Model hassasiyeti: fp32 veya int8 (quantize_models.py ile üretilip raporda kabul edilmiş olmalı)
+MODEL_PRECISION = os.environ.get('MODEL_PRECISION', 'fp32')
+
+# Model seçiminde gecikme bütçesi (ms) - model_benchmark.py profiliyle kullanılır
+MODEL_LATENCY_BUDGET_MS = float(os.environ.get('MODEL_LATENCY_BUDGET_MS', UltraClothingBgRemover.DEFAULT_LATENCY_BUDGET_MS))
+
+# Gecikme SLO'su: ultra istekleri yük altında p95 hedefini tutturmak için daha düşük
+# çözünürlüğe (SLO_REDUCED_MAX_DIM) veya hafif modele geçer (0 = kapalı, her zaman tam kalite)
+SLO_P95_MS = float(os.environ.get('SLO_P95_MS', 60000))
+SLO_REDUCED_MAX_DIM = int(os.environ.get('SLO_REDUCED_MAX_DIM', 1024))
+
+# Kademeli mod: ultra önce hafif modeli çalıştırır, maske güveni eşiğin altındaysa seçili modeli.
+# Eşik verilmezse model_benchmark.py --cascade ile ölçülmüş profil değeri kullanılır.
+CASCADE_MODE = os.environ.get('CASCADE_MODE', '0') == '1'
+CASCADE_CONFIDENCE_THRESHOLD = (float(os.environ['CASCADE_CONFIDENCE_THRESHOLD'])
+                                if os.environ.get('CASCADE_CONFIDENCE_THRESHOLD') else None)
+
+# Stüdyo hızlı yolu: düz fonlu görüntülerde ultra model yerine klasik segmentasyon (studio_segmenter.py)
+STUDIO_FAST_PATH = os.environ.get('STUDIO_FAST_PATH', '1') == '1'
+
+# Alfa kanalı zaten ön plan maskesi olan girdilerde (ör. kendi çıktılarımız) model atlanır
+REUSE_INPUT_ALPHA = os.environ.get('REUSE_INPUT_ALPHA', '1') == '1'
+
+# Depolama yaşam döngüsü (saniye / MB)
+STORAGE_UPLOAD_TTL = int(os.environ.get('STORAGE_UPLOAD_TTL', 3600))
+STORAGE_JOB_UPLOAD_TTL = int(os.environ.get('STORAGE_JOB_UPLOAD_TTL', 86400))
+STORAGE_PROCESSED_TTL = int(os.environ.get('STORAGE_PROCESSED_TTL', 86400))
+STORAGE_ORPHAN_TTL = int(os.environ.get('STORAGE_ORPHAN_TTL', 3600))
+STORAGE_MAX_MB = int(os.environ.get('STORAGE_MAX_MB', 2048))
+STORAGE_SWEEP_INTERVAL = int(os.environ.get('STORAGE_SWEEP_INTERVAL', 300))
+# Biten işlerin günlükte saklanma süresi; sonucu daha önce silinen işler 'expired' görünür
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', 7 * 86400))
+
+# İstek zarfı günlüğü (JSONL) - replay_requests.py ile tekrar oynatılır; boşsa kapalı.
+# REQUEST_LOG_PAYLOAD_DIR verilirse görüntüler de hash adıyla saklanır.
+REQUEST_LOG_PATH = os.environ.get('REQUEST_LOG_PATH', '')
+REQUEST_LOG_PAYLOAD_DIR = os.environ.get('REQUEST_LOG_PAYLOAD_DIR', '')
+
 # Klasörleri oluştur
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROCESSED_FOLDER, exist_ok=True)
+os.makedirs(JOB_FOLDER, exist_ok=True)
+
+# İçerik adresli sonuç önbelleği
+result_cache = ResultCache(
+    RESULT_CACHE_DIR,
+    max_memory_bytes=RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+    max_disk_bytes=RESULT_CACHE_DISK_MB * 1024 * 1024
+)
+
+# Ham model maskesi önbelleği - seçenek değişikliklerinde model tekrar çalışmaz
+mask_cache = MaskCache(MASK_CACHE_DIR, MASK_CACHE_DISK_MB * 1024 * 1024) if MASK_CACHE_DISK_MB > 0 else None
+
+# İstek günlüğü
+request_log = RequestLog(REQUEST_LOG_PATH, REQUEST_LOG_PAYLOAD_DIR or None) if REQUEST_LOG_PATH else None
 
 # Global remover'lar (lazy loading)
 ultra_remover = None
 advanced_remover = None
+# Ultra remover yüklenince kurulur (kademeler seçilen modele bağlı)
+slo_controller = None
+# İş worker'ları ve HTTP thread'leri aynı anda ilk yüklemeyi tetikleyebilir
+remover_lock = threading.Lock()
 
 def get_ultra_remover():
     """
     Ultra remover'ı lazy loading ile al
     """
-    global ultra_remover
-    if ultra_remover is None:
-        try:
-            logger.info("🤖 Ultra AI modeli yükleniyor...")
-            ultra_remover = UltraClothingBgRemover()
-            logger.info(f"✅ Ultra AI modeli hazır! Model: {ultra_remover.best_model}")
-        except Exception as e:
-            logger.error(f"❌ Ultra AI modeli yüklenemedi: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise Exception("Ultra model yüklenmedi")
+    global ultra_remover, slo_controller
+    with remover_lock:
+        if ultra_remover is None:
+            try:
+                logger.info("🤖 Ultra AI modeli yükleniyor...")
+                ultra_remover = UltraClothingBgRemover(
+                    batch_size=BATCH_MAX_SIZE,
+                    batch_wait_ms=BATCH_MAX_WAIT_MS,
+                    mask_cache=mask_cache,
+                    precision=MODEL_PRECISION,
+                    latency_budget_ms=MODEL_LATENCY_BUDGET_MS,
+                    cascade=CASCADE_MODE,
+                    cascade_threshold=CASCADE_CONFIDENCE_THRESHOLD,
+                    studio_fast_path=STUDIO_FAST_PATH,
+                    reuse_input_alpha=REUSE_INPUT_ALPHA
+                )
+                logger.info(f"✅ Ultra AI modeli hazır! Model: {ultra_remover.best_model}")
+                if SLO_P95_MS > 0:
+                    slo_controller = SloController(slo_tiers(ultra_remover), SLO_P95_MS, job_queue.depth)
+            except Exception as e:
+                logger.error(f"❌ Ultra AI modeli yüklenemedi: {str(e)}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                raise Exception("Ultra model yüklenmedi")
     return ultra_remover
 
 def get_advanced_remover():
@@ -230,17 +472,76 @@ def get_advanced_remover():
     Advanced remover'ı lazy loading ile al
     """
     global advanced_remover
-    if advanced_remover is None:
-        try:
-            logger.info("🤖 Advanced AI modeli yükleniyor...")
-            advanced_remover = AdvancedClothingBgRemover('u2net_cloth_seg')
-            logger.info(f"✅ Advanced AI modeli hazır! Model: {advanced_remover.model_name}")
-        except Exception as e:
-            logger.error(f"❌ Advanced AI modeli yüklenemedi: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise Exception("Advanced model yüklenmedi")
+    with remover_lock:
+        if advanced_remover is None:
+            try:
+                logger.info("🤖 Advanced AI modeli yükleniyor...")
+                advanced_remover = AdvancedClothingBgRemover(
+                    'u2net_cloth_seg',
+                    batch_size=BATCH_MAX_SIZE,
+                    batch_wait_ms=BATCH_MAX_WAIT_MS,
+                    mask_cache=mask_cache,
+                    precision=MODEL_PRECISION
+                )
+                logger.info(f"✅ Advanced AI modeli hazır! Model: {advanced_remover.model_name}")
+            except Exception as e:
+                logger.error(f"❌ Advanced AI modeli yüklenemedi: {str(e)}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                raise Exception("Advanced model yüklenmedi")
     return advanced_remover
 
+FULL_TIER = {'name': 'full', 'model_name': None, 'max_dim': None}
+
+def slo_tiers(remover):
+    """
+    Ultra kalite kademeleri, en kaliteliden en hafife
+    """
+    tiers = [
+        FULL_TIER,
+        {'name': 'reduced', 'model_name': None, 'max_dim': SLO_REDUCED_MAX_DIM}
+    ]
+    if remover.light_model:
+        tiers.append({'name': 'light', 'model_name': remover.light_model, 'max_dim': SLO_REDUCED_MAX_DIM})
+    return tiers
+
+def pinned_model_error(model_type, model_name):
+    """
+    İstemcinin sabitlediği model geçerli mi? Hata mesajı veya None
+    """
+    if not model_name:
+        return None
+    if model_type != 'ultra':
+        return 'model_name sadece ultra model ile kullanılabilir'
+    if model_name not in get_ultra_remover().premium_models:
+        return f"Bilinmeyen model_name: {model_name}"
+    return None
+
+def plan_inference(model_type, model_name=None, adaptive=True):
+    """
+    Ultra için model/çözünürlük planı - advanced için None
+    Sabitlenmiş model her zaman tam çözünürlükte çalışır; adaptive=False ise
+    (ör. zaman aşımı olmayan işler) SLO denetleyicisine sorulmaz.
+    """
+    if model_type != 'ultra':
+        return None
+    if model_name:
+        return {'name': 'pinned', 'model_name': model_name, 'max_dim': None}
+    get_ultra_remover()
+    if not adaptive or slo_controller is None:
+        return dict(FULL_TIER)
+    return slo_controller.choose()
+
+def is_degraded(plan):
+    return plan is not None and plan['name'] not in ('full', 'pinned')
+
+def track_inference(plan):
+    """
+    İşlemi SLO denetleyicisine say (eşzamanlılık + kademe süresi)
+    """
+    if slo_controller is None or plan is None:
+        return contextlib.nullcontext()
+    return slo_controller.track(plan)
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -254,6 +555,578 @@ def generate_unique_filename(original_filename):
     extension = original_filename.rsplit('.', 1)[1].lower()
     return f"{timestamp}_{unique_id}.{extension}"
 
+def run_removal(filepath, model_type, positioning, enhance, output_dir=None, timings=None, plan=None):
+    """
+    Seçilen model ile pipeline'ı çalıştır
+    Varyantlar burada üretilmez; /api/variant ilk istekte ana sonuçtan üretir.
+    Çıktılar output_dir'e (isteğin çalışma alanı) yazılır, aşama süreleri timings'e eklenir.
+    plan (plan_inference) ultra için model ve çözünürlüğü belirler.
+    Dönüş: (result_path, used_model, kademeli mod bilgisi veya None)
+    """
+    if model_type == 'ultra':
+        plan = plan or FULL_TIER
+        options = {
+            'ai_positioning': True,
+            'enhance': enhance,
+            'create_variants': False,
+            'positioning_mode': positioning,
+            'model_name': plan['model_name'],
+            'max_dim': plan['max_dim']
+        }
+        remover = get_ultra_remover()
+        report = {}
+        with track_inference(plan):
+            result_path = remover.ultra_process(filepath, options, output_dir=output_dir, timings=timings,
+                                                report=report)
+        used_model = report.get('model') or remover.label_for(plan['model_name'])
+        cascade = report.get('cascade')
+        
+    else:
+        # Advanced model kullan
+        options = {
+            'preprocess': True,
+            'fix_positioning': True,
+            'center_vertically': positioning == 'center',
+            'enhance': enhance,
+            'create_variants': False,
+            'add_padding': True
+        }
+        remover = get_advanced_remover()
+        result_path = remover.process_clothing_complete(filepath, options, output_dir=output_dir, timings=timings)
+        used_model = remover.model_label
+        cascade = None
+    
+    return result_path, used_model, cascade
+
+def run_removal_image(img, model_type, positioning, enhance, timings=None, plan=None):
+    """
+    Seçilen model ile bellek içi pipeline'ı çalıştır (varyantsız)
+    Dönüş: {'image', 'variants', 'model', 'stages', 'timings'} veya None
+    """
+    if model_type == 'ultra':
+        plan = plan or FULL_TIER
+        options = {
+            'ai_positioning': True,
+            'enhance': enhance,
+            'create_variants': False,
+            'positioning_mode': positioning,
+            'model_name': plan['model_name'],
+            'max_dim': plan['max_dim']
+        }
+        remover = get_ultra_remover()
+        with track_inference(plan):
+            return remover.ultra_process_image(img, options, timings)
+    
+    options = {
+        'preprocess': True,
+        'fix_positioning': True,
+        'center_vertically': positioning == 'center',
+        'enhance': enhance,
+        'create_variants': False,
+        'add_padding': True
+    }
+    return get_advanced_remover().process_clothing_image(img, options, timings)
+
+def run_alpha(img, model_type, plan=None):
+    """
+    Seçilen model ile sadece alfa maskesini üret
+    Dönüş: ('L' maske, kullanılan model, kademeli mod bilgisi veya None) - maske üretilemezse maske None
+    """
+    if model_type == 'ultra':
+        plan = plan or FULL_TIER
+        remover = get_ultra_remover()
+        report = {}
+        with track_inference(plan):
+            alpha = remover.predict_alpha(img, plan['model_name'], plan['max_dim'], report=report)
+        return alpha, report.get('model') or remover.label_for(plan['model_name']), report.get('cascade')
+    
+    remover = get_advanced_remover()
+    return remover.predict_alpha(img), remover.model_label, None
+
+def is_binary_request():
+    """
+    İstek gövdesi ham görüntü byte'ları mı?
+    """
+    mimetype = request.mimetype or ''
+    return mimetype.startswith('image/') or mimetype == 'application/octet-stream'
+
+def negotiate_output_mimetype(binary_input):
+    """
+    Accept başlığına göre yanıt tipini seç
+    Binary istekte varsayılan image/png, JSON istekte varsayılan JSON.
+    """
+    if binary_input:
+        offers = ['image/png', 'image/webp', 'application/json']
+    else:
+        offers = ['application/json', 'image/png', 'image/webp']
+    return request.accept_mimetypes.best_match(offers, default=offers[0])
+
+def encode_image(img, mimetype):
+    """
+    Görüntüyü istenen formatta byte'lara çevir
+    """
+    buffer = io.BytesIO()
+    if mimetype == 'image/webp':
+        img.save(buffer, format='WEBP', quality=90, method=4)
+    else:
+        img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def process_upload(filepath, model_type, positioning, enhance, workspace=None, timings=None, plan=None):
+    """
+    Yüklenen dosyayı işle, sonucu processed klasörüne taşı
+    Ara dosyalar isteğin çalışma alanında kalır ve iş bitince silinir.
+    Dönüş: result_info veya işlem başarısızsa None
+    """
+    if workspace is None:
+        with ScratchWorkspace() as workspace:
+            return process_upload(filepath, model_type, positioning, enhance, workspace, timings, plan)
+    
+    try:
+        start_time = time.time()
+        
+        result_path, used_model, cascade = run_removal(filepath, model_type, positioning, enhance, workspace.path,
+                                                       timings, plan)
+        
+        process_time = time.time() - start_time
+        
+        if not result_path or not os.path.exists(result_path):
+            return None
+        
+        # Sonuç dosyasını processed klasörüne taşı (çalışma alanı tmpfs olabilir)
+        result_filename = os.path.basename(result_path)
+        final_path = os.path.join(PROCESSED_FOLDER, result_filename)
+        shutil.move(result_path, final_path)
+        
+    finally:
+        # Orijinal dosyayı sil
+        if os.path.exists(filepath):
+            os.remove(filepath)
+    
+    return {
+        'filename': result_filename,
+        'size_bytes': os.path.getsize(final_path),
+        'processing_time': round(process_time, 2),
+        'model_used': used_model,
+        'quality_tier': plan['name'] if plan else None,
+        'cascade': cascade,
+        'download_url': f'/api/download/{result_filename}'
+    }
+
+def served_cache_key(cache_key, used_model):
+    """
+    Sonucun saklanacağı önbellek anahtarı
+    Yedek (u2net fallback) sonuç istenen modelin anahtarına yazılmaz: aynı istek
+    tekrar geldiğinde model yeniden denenir. result_id ve varyantlar çalışsın diye
+    sonuç türetilmiş ayrı bir anahtarla saklanır.
+    """
+    if used_model != UltraClothingBgRemover.FALLBACK_LABEL:
+        return cache_key
+    return hashlib.sha256(f"{cache_key}|{used_model}".encode('utf-8')).hexdigest()
+
+def segmentation_path(used_model):
+    """
+    Maskeyi üreten yol: 'studio' (klasik segmentasyon), 'input_alpha' (girdinin
+    kendi alfa kanalı) veya 'model' (sinir ağı)
+    """
+    if used_model in (UltraClothingBgRemover.STUDIO_LABEL, UltraClothingBgRemover.INPUT_ALPHA_LABEL):
+        return used_model
+    return 'model'
+
+def add_cascade_header(response, cascade):
+    """
+    Kademeli modda sunan kademeyi başlığa ekle
+    """
+    if cascade:
+        response.headers['X-Cascade-Tier'] = cascade['tier']
+    return response
+
+def add_timing_headers(response, timings):
+    """
+    Aşama sürelerini Server-Timing başlığı olarak ekle
+    Timing-Allow-Origin olmadan tarayıcılar farklı origin'den gelen değerleri gizler.
+    """
+    response.headers['Server-Timing'] = timings.server_timing()
+    response.headers['Timing-Allow-Origin'] = '*'
+    return response
+
+def cache_options(model_type, positioning, enhance, model_name=None, tier=None):
+    """
+    Önbellek anahtarı için normalize edilmiş seçenekler
+    Varyantlar ana sonuçtan tembel üretildiği için anahtarın parçası değildir.
+    Yük altında düşük kademede üretilen sonuçlar ayrı anahtarla (tier) saklanır;
+    tam kalite anahtarı bu sonuçlarla hiç eşleşmez.
+    """
+    options = {
+        'model': str(model_type),
+        'precision': MODEL_PRECISION,
+        'positioning': str(positioning),
+        'enhance': bool(enhance)
+    }
+    if CASCADE_MODE and model_type == 'ultra':
+        options['cascade'] = True
+    if STUDIO_FAST_PATH and model_type == 'ultra':
+        options['studio_fast_path'] = True
+    if REUSE_INPUT_ALPHA and model_type == 'ultra':
+        options['reuse_input_alpha'] = True
+    if model_name:
+        options['model_name'] = str(model_name)
+    if tier:
+        options['tier'] = str(tier)
+    return options
+
+def variant_sizes(model_type):
+    """
+    Model tipinin sunduğu varyant boyutları {isim: [genişlik, yükseklik]}
+    """
+    if model_type == 'ultra':
+        sizes = UltraClothingBgRemover.VARIANT_SIZES
+    else:
+        sizes = AdvancedClothingBgRemover.VARIANT_SIZES
+    return {name: list(size) for name, size in sizes.items()}
+
+def variant_links(result_id, model_type):
+    """
+    Tembel varyant URL'leri - her boyut ilk istendiğinde üretilir
+    """
+    return [
+        {
+            'name': name,
+            'width': size[0],
+            'height': size[1],
+            'download_url': f'/api/variant/{result_id}/{name}'
+        }
+        for name, size in variant_sizes(model_type).items()
+    ]
+
+def store_upload_result(cache_key, result_info, model_type):
+    """
+    processed klasörüne taşınan sonucu önbelleğe ekle
+    Önbellek anahtarı aynı zamanda sonucun kimliğidir (result_id).
+    """
+    try:
+        with open(os.path.join(PROCESSED_FOLDER, result_info['filename']), 'rb') as f:
+            result_data = f.read()
+        
+        result_cache.put(cache_key, {
+            'result': result_data,
+            'variants': {},
+            'model_used': result_info['model_used'],
+            'quality_tier': result_info.get('quality_tier'),
+            'cascade': result_info.get('cascade'),
+            'variant_sizes': variant_sizes(model_type)
+        })
+    except Exception as e:
+        logger.warning(f"⚠️ Sonuç önbelleğe eklenemedi: {e}")
+
+def cached_upload_result(cache_key, entry, elapsed):
+    """
+    Önbellek girdisinden /api/remove-background sonuç bilgisini oluştur
+    Dosya adları içerik adreslidir ve doğrudan indirilebilir.
+    """
+    files = result_cache.materialize(cache_key, entry)
+    
+    return {
+        'filename': files['result'],
+        'size_bytes': len(entry['result']),
+        'processing_time': round(elapsed, 2),
+        'model_used': entry['model_used'],
+        'quality_tier': entry.get('quality_tier'),
+        'cascade': entry.get('cascade'),
+        'download_url': f"/api/download/{files['result']}"
+    }
+
+# Dosya yolu -> (boyut, inode, etag); dosyalar her istekte yeniden hash'lenmesin
+_etag_cache = OrderedDict()
+_etag_lock = threading.Lock()
+
+def is_content_addressed(file_path):
+    """
+    Dosya adı içeriğinden türetilmiş mi? (önbellekteki <sha256>[_varyant].png)
+    """
+    stem = Path(file_path).stem.split('_', 1)[0]
+    return os.path.dirname(file_path) == RESULT_CACHE_DIR and bool(RESULT_ID_PATTERN.fullmatch(stem))
+
+def file_etag(file_path):
+    """
+    İçerik hash'ine dayalı ETag
+    İçerik adresli dosyalarda adın kendisi, diğerlerinde sha256 (boyut + inode ile cache'lenir).
+    """
+    if is_content_addressed(file_path):
+        return Path(file_path).stem
+    
+    # Sonuçlar yerinde değiştirilmez (os.replace yeni inode üretir); mtime LRU
+    # için güncellendiğinden anahtar boyut + inode'dur
+    stat = os.stat(file_path)
+    with _etag_lock:
+        cached = _etag_cache.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_ino:
+            _etag_cache.move_to_end(file_path)
+            return cached[2]
+    
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()
+    
+    with _etag_lock:
+        _etag_cache[file_path] = (stat.st_size, stat.st_ino, etag)
+        while len(_etag_cache) > 4096:
+            _etag_cache.popitem(last=False)
+    return etag
+
+def serve_processed_file(file_path, as_attachment=False):
+    """
+    Dosyayı ETag, koşullu GET (304), byte aralığı (206) ve cache başlıklarıyla sun
+    Gövde işletim sisteminin sendfile yoluyla (WSGI file_wrapper) veya
+    X_ACCEL_REDIRECT_PREFIX ayarlıysa nginx tarafından gönderilir.
+    """
+    etag = file_etag(file_path)
+    if is_content_addressed(file_path):
+        cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = f"public, max-age={PROCESSED_MAX_AGE}"
+        # LRU tahliye için kullanım zamanı
+        StorageManager.touch(file_path)
+    
+    if X_ACCEL_REDIRECT_PREFIX:
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(mimetype=mimetypes.guess_type(file_path)[0] or 'application/octet-stream')
+            relative_path = os.path.relpath(file_path, PROCESSED_FOLDER).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = f"{X_ACCEL_REDIRECT_PREFIX}/{relative_path}"
+            if as_attachment:
+                response.headers['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
+        response.set_etag(etag)
+    else:
+        # conditional=True: If-None-Match -> 304, Range -> 206
+        response = send_file(file_path, as_attachment=as_attachment, conditional=True, etag=etag)
+    
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def resolve_processed_file(filename):
+    """
+    İndirilebilir dosyanın yolunu bul - processed/ veya sonuç önbelleği
+    """
+    safe_name = secure_filename(filename)
+    for folder in (PROCESSED_FOLDER, RESULT_CACHE_DIR):
+        file_path = os.path.join(folder, safe_name)
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+def process_job(payload):
+    """
+    İş kuyruğu worker'ı için işleyici - sonuç dict'i döner
+    """
+    model_name = payload.get('model_name')
+    with open(payload['filepath'], 'rb') as f:
+        cache_key = result_cache.make_key(
+            f.read(),
+            cache_options(payload['model'], payload['positioning'], payload['enhance'], model_name)
+        )
+    
+    # İşler HTTP zaman aşımına tabi değil - her zaman tam kalite (veya sabitlenmiş model)
+    result_info = process_upload(
+        payload['filepath'],
+        payload['model'],
+        payload['positioning'],
+        payload['enhance'],
+        plan=plan_inference(payload['model'], model_name, adaptive=False)
+    )
+    if result_info is None:
+        raise Exception('İşlem başarısız oldu')
+    
+    note_served(result_info['model_used'], result_info['cascade'])
+    cache_key = served_cache_key(cache_key, result_info['model_used'])
+    store_upload_result(cache_key, result_info, payload['model'])
+    result_info['result_id'] = cache_key
+    if payload['create_variants']:
+        result_info['variants'] = variant_links(cache_key, payload['model'])
+    return result_info
+
+# İş kuyruğu - günlükte bekleyen işler worker açılışında kurtarılır
+job_queue = JobQueue(
+    process_job,
+    db_path=JOB_DB_PATH,
+    max_queue=JOB_QUEUE_SIZE,
+    workers=JOB_WORKERS
+)
+job_queue.start()
+
+def on_storage_delete(category, path):
+    """
+    processed/ altından silinen sonuç dosyasını gösteren işleri 'expired' yap
+    """
+    if category == 'processed':
+        job_queue.expire_result(os.path.basename(path))
+
+# Depolama yöneticisi - önbellek klasörlerinin boyutunu kendi sınıfları yönetir,
+# burada sadece yarım kalmış/sahipsiz dosyaları temizlenir
+storage_manager = StorageManager(
+    [
+        # İşlenen yüklemeler hemen silinir; kalanlar çökmüş isteklerin ara dosyalarıdır
+        StorageCategory('uploads', UPLOAD_FOLDER, STORAGE_UPLOAD_TTL, recursive=True, exclude_dirs=('jobs',)),
+        # Kuyrukta bekleyen işlerin girdileri boyut sınırıyla silinmemeli
+        StorageCategory('job_uploads', JOB_FOLDER, STORAGE_JOB_UPLOAD_TTL, evictable=False),
+        StorageCategory('processed', PROCESSED_FOLDER, STORAGE_PROCESSED_TTL),
+        StorageCategory('result_cache', RESULT_CACHE_DIR, STORAGE_ORPHAN_TTL, evictable=False,
+                        match=is_orphaned_cache_file),
+        StorageCategory('mask_cache', MASK_CACHE_DIR, STORAGE_ORPHAN_TTL, evictable=False,
+                        match=is_temp_file),
+    ],
+    max_total_bytes=STORAGE_MAX_MB * 1024 * 1024,
+    sweep_interval=STORAGE_SWEEP_INTERVAL,
+    on_delete=on_storage_delete,
+    after_sweep=lambda: job_queue.prune(JOB_RETENTION_SECONDS)
+)
+storage_manager.start()
+
+# Öldürülen worker'lardan kalan çalışma alanları (istek zaman aşımından eski olanlar)
+cleanup_stale_workspaces(max_age_seconds=STORAGE_ORPHAN_TTL)
+
+# Metrikler - /metrics endpoint'i Prometheus metin formatında sunar
+REQUESTS_TOTAL = REGISTRY.counter(
+    'clothing_http_requests_total',
+    'HTTP istek sayısı',
+    ('endpoint', 'method', 'status', 'model')
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'clothing_http_request_duration_seconds',
+    'HTTP istek süreleri (saniye)',
+    ('endpoint', 'method', 'model')
+)
+REGISTRY.gauge('clothing_job_queue_depth', 'Kuyrukta bekleyen iş sayısı', collect=job_queue.depth)
+REGISTRY.gauge(
+    'clothing_cache_hit_ratio',
+    'Önbellek isabet oranı',
+    ('cache',),
+    collect=lambda: {
+        ('result',): result_cache.stats()['hit_ratio'],
+        **({('mask',): mask_cache.stats()['hit_ratio']} if mask_cache else {})
+    }
+)
+REGISTRY.gauge(
+    'clothing_model_load_seconds',
+    'Yüklü model session\'larının yükleme süresi (saniye)',
+    ('model',),
+    collect=lambda: {
+        (name,): session['load_seconds'] for name, session in get_session_pool().stats()['sessions'].items()
+    }
+)
+REGISTRY.gauge(
+    'clothing_model_memory_bytes',
+    'Yüklü model session\'larının tahmini bellek kullanımı (byte)',
+    ('model',),
+    collect=lambda: {
+        (name,): session['memory_bytes'] for name, session in get_session_pool().stats()['sessions'].items()
+    }
+)
+REGISTRY.gauge('process_resident_memory_bytes', 'Süreç RSS (byte)', collect=current_rss_bytes)
+QUALITY_TIER_TOTAL = REGISTRY.counter(
+    'clothing_quality_tier_total',
+    'Kalite kademesine göre işlenen istek sayısı',
+    ('tier',)
+)
+REGISTRY.gauge(
+    'clothing_slo_tier_p95_seconds',
+    'SLO denetleyicisinin kademe bazında son p95 süresi (saniye)',
+    ('tier',),
+    collect=lambda: {
+        (tier['name'],): tier['p95_ms'] / 1000
+        for tier in (slo_controller.stats()['tiers'] if slo_controller else [])
+        if tier['p95_ms'] is not None
+    }
+)
+
+CASCADE_TOTAL = REGISTRY.counter(
+    'clothing_cascade_total',
+    'Kademeli modda sunan kademeye göre istek sayısı',
+    ('tier',)
+)
+SEGMENTATION_PATH_TOTAL = REGISTRY.counter(
+    'clothing_segmentation_path_total',
+    'Maskeyi üreten yola (studio / input_alpha / model) göre istek sayısı',
+    ('path',)
+)
+
+def note_plan(plan):
+    """
+    Kullanılan kalite kademesini say
+    """
+    if plan is not None:
+        QUALITY_TIER_TOTAL.inc(tier=plan['name'])
+
+def note_served(used_model, cascade):
+    """
+    Maskeyi üreten yolu ve kademeli modda sunan kademeyi say (önbellek isabetleri sayılmaz)
+    """
+    SEGMENTATION_PATH_TOTAL.inc(path=segmentation_path(used_model))
+    if cascade:
+        CASCADE_TOTAL.inc(tier=cascade['tier'])
+
+def note_model(model):
+    """
+    İsteğin metriklerini kullanılan modelle etiketle
+    """
+    g.metrics_model = model
+
+def note_request(kind, image_bytes, options, timings=None):
+    """
+    İstek günlüğü açıksa isteğin zarfını hazırla - yanıttan sonra yazılır
+    """
+    if request_log is None:
+        return
+    g.request_envelope = request_log.envelope(kind, image_bytes, options)
+    g.request_timings = timings
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.request_time = time.time()
+
+@app.after_request
+def record_request_metrics(response):
+    start = getattr(g, 'request_start', None)
+    if start is None:
+        return response
+    
+    # Ham yol yerine route kalıbı - etiket sayısı sınırlı kalsın
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    model = getattr(g, 'metrics_model', '')
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method, model=model)
+    REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=response.status_code, model=model)
+    return response
+
+@app.after_request
+def add_segmentation_path_header(response):
+    model = getattr(g, 'metrics_model', None)
+    if model:
+        response.headers['X-Segmentation-Path'] = segmentation_path(model)
+    return response
+
+@app.after_request
+def write_request_envelope(response):
+    envelope = getattr(g, 'request_envelope', None)
+    if envelope is None:
+        return response
+    
+    timings = getattr(g, 'request_timings', None)
+    envelope.update({
+        'ts': round(g.request_time, 3),
+        'endpoint': request.url_rule.rule if request.url_rule else request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - g.request_start) * 1000, 1),
+        'cache': response.headers.get('X-Cache'),
+        'model_used': getattr(g, 'metrics_model', None),
+        'timings': timings.as_dict() if timings is not None else None
+    })
+    request_log.write(envelope)
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
@@ -280,23 +1153,42 @@ def api_status():
         'endpoints': [
             'POST /api/remove-background',
             'POST /api/remove-background-base64',
+            'POST /api/mask',
+            'GET /api/variant/<result_id>/<size>',
+            'POST /api/jobs',
+            'GET /api/jobs/<job_id>',
+            'GET /api/jobs/<job_id>/result',
             'GET /api/status',
-            'GET /api/models'
-        ]
+            'GET /api/models',
+            'GET /metrics'
+        ],
+        'job_queue_depth': job_queue.depth(),
+        'result_cache': result_cache.stats(),
+        'mask_cache': mask_cache.stats() if mask_cache else None,
+        'session_pool': get_session_pool().stats(),
+        'storage': storage_manager.stats(),
+        'slo': slo_controller.stats() if slo_controller else None
     }
     
     try:
-        status['ultra_model'] = get_ultra_remover().best_model
+        status['ultra_model'] = get_ultra_remover().model_label
     except:
         status['ultra_model'] = 'not_loaded'
     
     try:
-        status['advanced_model'] = get_advanced_remover().model_name
+        status['advanced_model'] = get_advanced_remover().model_label
     except:
         status['advanced_model'] = 'not_loaded'
     
     return jsonify(status)
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrikleri (text exposition format)
+    """
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/models', methods=['GET'])
 def get_available_models():
     """
@@ -328,6 +1220,7 @@ def remove_background():
     """
     Ana arka plan kaldırma endpoint'i
     """
+    timings = StageTimings()
     try:
         # Request validation
         if 'image' not in request.files:
@@ -354,106 +1247,103 @@ def remove_background():
         positioning = request.form.get('positioning', 'smart')  # smart veya center
         create_variants = request.form.get('variants', 'true').lower() == 'true'
         enhance = request.form.get('enhance', 'false').lower() == 'true'  # Şeffaf PNG için false
+        model_name = request.form.get('model_name') or None  # Ultra için sabitlenmiş model
         
-        # Dosyayı kaydet
-        filename = generate_unique_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        model_error = pinned_model_error(model_type, model_name)
+        if model_error:
+            return jsonify({
+                'success': False,
+                'error': model_error
+            }), 400
         
-        print(f"📁 Dosya kaydedildi: {filename}")
-        print(f"⚙️  Parametreler: model={model_type}, positioning={positioning}")
+        # Önbellek - anahtar çözülmüş girdi byte'ları + normalize seçenekler
+        image_bytes = file.read()
+        note_request('form', image_bytes, {
+            'model': model_type,
+            'model_name': model_name,
+            'positioning': positioning,
+            'enhance': enhance,
+            'variants': create_variants
+        }, timings)
+        cache_key = result_cache.make_key(
+            image_bytes,
+            cache_options(model_type, positioning, enhance, model_name)
+        )
         
         start_time = time.time()
+        with timings.measure('cache'):
+            entry = result_cache.get(cache_key)
         
-        # Model seçimi ve işlem
-        if model_type == 'ultra':
-            options = {
-                'ai_positioning': True,
-                'enhance': enhance,
-                'create_variants': create_variants,
-                'positioning_mode': positioning
-            }
-            remover = get_ultra_remover()
-            result_path = remover.ultra_process(filepath, options)
-            used_model = remover.best_model
-            
+        if entry is not None:
+            cache_status = 'hit'
+            result_info = cached_upload_result(cache_key, entry, time.time() - start_time)
+            print(f"⚡ Önbellekten döndü: {cache_key[:12]}")
         else:
-            # Advanced model kullan
-            options = {
-                'preprocess': True,
-                'fix_positioning': True,
-                'center_vertically': positioning == 'center',
-                'enhance': enhance,
-                'create_variants': create_variants,
-                'add_padding': True
-            }
-            remover = get_advanced_remover()
-            result_path = remover.process_clothing_complete(filepath, options)
-            used_model = remover.model_name
-        
-        process_time = time.time() - start_time
-        
-        if not result_path or not os.path.exists(result_path):
-            return jsonify({
-                'success': False,
-                'error': 'İşlem başarısız oldu'
-            }), 500
+            cache_status = 'miss'
+            
+            # Yük altında düşük kademe seçilirse sonuç ayrı anahtarla saklanır
+            plan = plan_inference(model_type, model_name)
+            note_plan(plan)
+            if is_degraded(plan):
+                cache_key = result_cache.make_key(
+                    image_bytes,
+                    cache_options(model_type, positioning, enhance, model_name, plan['name'])
+                )
+            
+            # Girdi ve ara dosyalar isteğe özel çalışma alanında; başarı/hata fark etmeksizin silinir
+            with ScratchWorkspace() as workspace:
+                filename = generate_unique_filename(file.filename)
+                filepath = workspace.file(filename)
+                with open(filepath, 'wb') as f:
+                    f.write(image_bytes)
+                
+                print(f"📁 Dosya kaydedildi: {filename}")
+                print(f"⚙️  Parametreler: model={model_type}, positioning={positioning}")
+                
+                result_info = process_upload(filepath, model_type, positioning, enhance, workspace, timings, plan)
+            
+            if result_info is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'İşlem başarısız oldu'
+                }), 500
+            
+            note_served(result_info['model_used'], result_info['cascade'])
+            cache_key = served_cache_key(cache_key, result_info['model_used'])
+            store_upload_result(cache_key, result_info, model_type)
         
-        # Sonuç dosyasını processed klasörüne taşı
-        result_filename = os.path.basename(result_path)
-        final_path = os.path.join(PROCESSED_FOLDER, result_filename)
+        result_info['result_id'] = cache_key
+        # Varyantlar tembel - sadece istenen boyutlar CPU harcar
+        variants_info = variant_links(cache_key, model_type) if create_variants else []
         
-        if os.path.exists(result_path):
-            os.rename(result_path, final_path)
-        
-        # Varyantları kontrol et
-        variants_info = []
-        variants_dir = Path(result_path).parent / "variants"
-        ultra_variants_dir = Path(result_path).parent / "ultra_variants"
-        
-        for var_dir in [variants_dir, ultra_variants_dir]:
-            if var_dir.exists():
-                base_name = Path(filepath).stem
-                variant_files = list(var_dir.glob(f"*{base_name}*.png"))
-                for variant_file in variant_files:
-                    # Varyantı da processed'a taşı
-                    var_final_path = os.path.join(PROCESSED_FOLDER, variant_file.name)
-                    os.rename(str(variant_file), var_final_path)
-                    
-                    file_size = os.path.getsize(var_final_path)
-                    variants_info.append({
-                        'filename': variant_file.name,
-                        'size_bytes': file_size,
-                        'download_url': f'/api/download/{variant_file.name}'
-                    })
-        
-        # Orijinal dosyayı sil
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        process_time = result_info['processing_time']
+        used_model = result_info['model_used']
+        result_info['segmentation_path'] = segmentation_path(used_model)
+        note_model(used_model)
         
         # Başarılı response
-        file_size = os.path.getsize(final_path)
-        
         response_data = {
             'success': True,
-            'result': {
-                'filename': result_filename,
-                'size_bytes': file_size,
-                'processing_time': round(process_time, 2),
-                'model_used': used_model,
-                'download_url': f'/api/download/{result_filename}'
-            },
+            'result': result_info,
             'variants': variants_info,
+            'cache': cache_status,
             'parameters': {
                 'model_type': model_type,
+                'model_name': model_name,
                 'positioning': positioning,
                 'enhance': enhance,
-                'create_variants': create_variants
+                'create_variants': create_variants,
+                'timings': timings.as_dict()
             }
         }
         
-        print(f"✅ İşlem başarılı: {process_time:.2f}s, Model: {used_model}")
-        return jsonify(response_data)
+        print(f"✅ İşlem başarılı: {process_time:.2f}s, Model: {used_model}, Önbellek: {cache_status}")
+        response = jsonify(response_data)
+        response.headers['X-Cache'] = cache_status.upper()
+        if result_info.get('quality_tier'):
+            response.headers['X-Quality-Tier'] = result_info['quality_tier']
+        add_cascade_header(response, result_info.get('cascade'))
+        return add_timing_headers(response, timings)
         
     except Exception as e:
         print(f"❌ API hatası: {str(e)}")
@@ -468,9 +1358,9 @@ def download_file(filename):
     İşlenmiş dosyaları indir
     """
     try:
-        file_path = os.path.join(PROCESSED_FOLDER, secure_filename(filename))
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+        file_path = resolve_processed_file(filename)
+        if file_path:
+            return serve_processed_file(file_path, as_attachment=True)
         else:
             return jsonify({
                 'success': False,
@@ -488,9 +1378,9 @@ def preview_file(filename):
     İşlenmiş dosyaları preview olarak göster
     """
     try:
-        file_path = os.path.join(PROCESSED_FOLDER, secure_filename(filename))
-        if os.path.exists(file_path):
-            return send_file(file_path)
+        file_path = resolve_processed_file(filename)
+        if file_path:
+            return serve_processed_file(file_path)
         else:
             return jsonify({
                 'success': False,
@@ -502,149 +1392,610 @@ def preview_file(filename):
             'error': str(e)
         }), 500
 
+@app.route('/api/variant/<result_id>/<size>', methods=['GET'])
+def get_variant(result_id, size):
+    """
+    Varyantı ilk istendiğinde ana sonuçtan üret, sonrakilerde önbellekten sun
+    result_id içerik adreslidir; aynı kimlik + boyut her zaman aynı byte'ları verir.
+    """
+    try:
+        etag = f"{result_id}-{size}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+            return response
+        
+        entry = result_cache.get(result_id) if RESULT_ID_PATTERN.fullmatch(result_id) else None
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': 'Sonuç bulunamadı veya önbellekten silinmiş'
+            }), 404
+        
+        sizes = entry.get('variant_sizes') or {}
+        if size not in sizes:
+            return jsonify({
+                'success': False,
+                'error': f'Bilinmeyen varyant: {size}',
+                'available': sorted(sizes)
+            }), 404
+        
+        data = entry['variants'].get(size)
+        if data is not None:
+            cache_status = 'hit'
+        else:
+            cache_status = 'miss'
+            start_time = time.time()
+            with stage_timer('decode', entry['model_used']):
+                master = Image.open(io.BytesIO(entry['result']))
+                master.load()
+            with stage_timer('variants', entry['model_used']):
+                variant = render_variant(master, sizes[size])
+            with stage_timer('encode', entry['model_used']):
+                data = encode_image(variant, 'image/png')
+            result_cache.put_variant(result_id, size, data)
+            logger.info(f"🖼️ Varyant üretildi: {result_id[:12]}/{size} ({time.time() - start_time:.2f}s)")
+        
+        response = Response(data, mimetype='image/png')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        response.headers['X-Cache'] = cache_status.upper()
+        return response
+        
+    except Exception as e:
+        logger.error(f"❌ Varyant hatası: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/remove-background-base64', methods=['POST'])
 def remove_background_base64():
     """
     Base64 formatında görüntü işleme (iOS için alternatif)
+    
+    Binary mod: Content-Type image/* veya application/octet-stream ise gövde
+    ham görüntü byte'larıdır, parametreler query string'den okunur. Yanıt
+    Accept başlığına göre ham image/png, image/webp veya JSON olur;
+    metadata X-* başlıklarında döner.
     """
     logger.info("📱 Base64 API endpoint çağrıldı")
+    timings = StageTimings()
     try:
-        data = request.get_json()
-        logger.info(f"Request data keys: {list(data.keys()) if data else 'None'}")
+        binary_input = is_binary_request()
+        
+        if binary_input:
+            image_data = request.get_data(cache=False)
+            params = request.args
+            logger.info(f"📦 Binary girdi: {len(image_data)} bytes ({request.mimetype})")
+            
+            if not image_data:
+                return jsonify({
+                    'success': False,
+                    'error': 'Görüntü verisi boş'
+                }), 400
+            
+            model_type = params.get('model', 'ultra')
+            model_name = params.get('model_name') or None
+            positioning = params.get('positioning', 'smart')
+            enhance = params.get('enhance', 'false').lower() == 'true'
+            create_variants = params.get('create_variants', 'false').lower() == 'true'
+        else:
+            data = request.get_json()
+            logger.info(f"Request data keys: {list(data.keys()) if data else 'None'}")
+            
+            if not data or 'image_base64' not in data:
+                logger.warning("❌ image_base64 parametresi eksik")
+                return jsonify({
+                    'success': False,
+                    'error': 'image_base64 parametresi gerekli'
+                }), 400
+            
+            # Base64'ü decode et
+            image_base64 = data['image_base64']
+            
+            # Data URL prefix'i varsa temizle
+            if image_base64.startswith('data:'):
+                # data:image/jpeg;base64,/9j/... formatından sadece base64 kısmını al
+                image_base64 = image_base64[image_base64.index(',') + 1:]
+            
+            logger.info(f"Base64 string uzunluğu: {len(image_base64)} karakter")
+            
+            try:
+                with timings.measure('decode'):
+                    image_data = base64.b64decode(image_base64)
+                logger.info(f"✅ Base64 decode başarılı, boyut: {len(image_data)} bytes")
+            except Exception as decode_error:
+                logger.error(f"❌ Base64 decode hatası: {str(decode_error)}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Base64 decode hatası: {str(decode_error)}'
+                }), 400
+            del image_base64, data['image_base64']
+            
+            # Parametreler
+            model_type = data.get('model', 'ultra')
+            model_name = data.get('model_name') or None
+            positioning = data.get('positioning', 'smart')
+            enhance = data.get('enhance', False)  # Şeffaf PNG için false
+            create_variants = data.get('create_variants', False)
         
-        if 'image_base64' not in data:
-            logger.warning("❌ image_base64 parametresi eksik")
+        model_error = pinned_model_error(model_type, model_name)
+        if model_error:
             return jsonify({
                 'success': False,
-                'error': 'image_base64 parametresi gerekli'
+                'error': model_error
             }), 400
         
-        # Base64'ü decode et
-        image_base64 = data['image_base64']
+        output_mimetype = negotiate_output_mimetype(binary_input)
+        note_request('binary' if binary_input else 'base64', image_data, {
+            'model': model_type,
+            'model_name': model_name,
+            'positioning': positioning,
+            'enhance': enhance,
+            'create_variants': create_variants,
+            'accept': output_mimetype
+        }, timings)
         
-        # Data URL prefix'i varsa temizle
-        if image_base64.startswith('data:'):
-            # data:image/jpeg;base64,/9j/... formatından sadece base64 kısmını al
-            image_base64 = image_base64.split(',', 1)[1]
+        logger.info(f"⚙️ İşlem parametreleri: model={model_type}, positioning={positioning}, enhance={enhance}, çıktı={output_mimetype}")
         
-        logger.info(f"Base64 string uzunluğu: {len(image_base64)} karakter")
+        start_time = time.time()
         
-        try:
-            image_data = base64.b64decode(image_base64)
-            logger.info(f"✅ Base64 decode başarılı, boyut: {len(image_data)} bytes")
-        except Exception as decode_error:
-            logger.error(f"❌ Base64 decode hatası: {str(decode_error)}")
-            return jsonify({
-                'success': False,
-                'error': f'Base64 decode hatası: {str(decode_error)}'
-            }), 400
+        # Önbellek - aynı görüntü + aynı seçenekler modeli hiç çalıştırmaz
+        cache_key = result_cache.make_key(
+            image_data,
+            cache_options(model_type, positioning, enhance, model_name)
+        )
+        with timings.measure('cache'):
+            entry = result_cache.get(cache_key)
+        
+        if entry is not None:
+            cache_status = 'hit'
+            logger.info(f"⚡ Önbellekten döndü: {cache_key[:12]}")
+        else:
+            cache_status = 'miss'
+            
+            # Yük altında düşük kademe seçilirse sonuç ayrı anahtarla saklanır
+            plan = plan_inference(model_type, model_name)
+            note_plan(plan)
+            if is_degraded(plan):
+                cache_key = result_cache.make_key(
+                    image_data,
+                    cache_options(model_type, positioning, enhance, model_name, plan['name'])
+                )
+            
+            try:
+                with timings.measure('decode'):
+                    img = open_image(image_data)
+            except Exception as image_error:
+                logger.error(f"❌ Görüntü okunamadı: {str(image_error)}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Görüntü okunamadı: {str(image_error)}'
+                }), 400
+            del image_data
+            
+            # İşlem - tamamen bellek içinde, geçici dosya yok
+            try:
+                logger.info(f"🚀 {model_type} model ile işlem başlatılıyor...")
+                result = run_removal_image(img, model_type, positioning, enhance, timings, plan)
+            except Exception as model_error:
+                logger.error(f"❌ Model işlem hatası: {str(model_error)}")
+                logger.error(f"Model traceback: {traceback.format_exc()}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Model işlem hatası: {str(model_error)}'
+                }), 500
+            
+            if result is None:
+                logger.error("❌ İşlem sonucu bulunamadı")
+                return jsonify({
+                    'success': False,
+                    'error': 'İşlem başarısız'
+                }), 500
+            
+            # Model etiketi ancak işlemden sonra belli olur
+            observe_stage('decode', timings.wall_seconds('decode'), result['model'])
+            with stage_timer('encode', result['model'], timings):
+                result_png = encode_image(result['image'], 'image/png')
+            
+            entry = {
+                'result': result_png,
+                'variants': {},
+                'model_used': result['model'],
+                'quality_tier': plan['name'] if plan else None,
+                'cascade': result.get('cascade'),
+                'variant_sizes': variant_sizes(model_type)
+            }
+            cache_key = served_cache_key(cache_key, entry['model_used'])
+            result_cache.put(cache_key, entry)
+            note_served(entry['model_used'], entry['cascade'])
         
-        # Geçici dosya oluştur
-        filename = f"temp_{int(time.time())}.png"
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
+        process_time = time.time() - start_time
+        used_model = entry['model_used']
+        quality_tier = entry.get('quality_tier')
+        cascade = entry.get('cascade')
+        note_model(used_model)
         
-        logger.info(f"💾 Geçici dosya oluşturuluyor: {filepath}")
+        if output_mimetype != 'application/json':
+            result_img = Image.open(io.BytesIO(entry['result']))
+            if output_mimetype == 'image/png':
+                result_data = entry['result']
+            else:
+                with stage_timer('encode', used_model, timings):
+                    result_data = encode_image(result_img, output_mimetype)
+            logger.info(f"✅ Binary işlem başarılı: {process_time:.2f}s, {len(result_data)} bytes, model: {used_model}")
+            
+            response = Response(result_data, mimetype=output_mimetype)
+            response.headers['X-Processing-Time'] = f"{process_time:.2f}"
+            response.headers['X-Model-Used'] = used_model
+            response.headers['X-Model-Type'] = model_type
+            response.headers['X-Positioning'] = positioning
+            response.headers['X-Image-Width'] = str(result_img.width)
+            response.headers['X-Image-Height'] = str(result_img.height)
+            response.headers['X-Cache'] = cache_status.upper()
+            response.headers['X-Result-Id'] = cache_key
+            response.headers['Vary'] = 'Accept'
+            if quality_tier:
+                response.headers['X-Quality-Tier'] = quality_tier
+            add_cascade_header(response, cascade)
+            return add_timing_headers(response, timings)
         
-        with open(filepath, 'wb') as f:
-            f.write(image_data)
+        # Sonucu base64'e çevir
+        with stage_timer('encode', used_model, timings):
+            result_base64 = base64.b64encode(entry['result']).decode('utf-8')
             
-        logger.info(f"✅ Dosya yazıldı: {os.path.getsize(filepath)} bytes")
+        logger.info(f"✅ Base64 encode tamamlandı, sonuç boyutu: {len(entry['result'])} bytes")
         
-        # Parametreler
-        model_type = data.get('model', 'ultra')
-        positioning = data.get('positioning', 'smart')
-        enhance = data.get('enhance', False)  # Şeffaf PNG için false
-        create_variants = data.get('create_variants', False)
+        response_data = {
+            'success': True,
+            'result_base64': result_base64,
+            'result_id': cache_key,
+            'processing_time': round(process_time, 2),
+            'model_used': used_model,
+            'segmentation_path': segmentation_path(used_model),
+            'quality_tier': quality_tier,
+            'cascade': cascade,
+            'cache': cache_status,
+            'parameters': {
+                'model_type': model_type,
+                'model_name': model_name,
+                'positioning': positioning,
+                'timings': timings.as_dict()
+            }
+        }
         
-        logger.info(f"⚙️ İşlem parametreleri: model={model_type}, positioning={positioning}, enhance={enhance}")
+        if create_variants:
+            # Varyantlar tembel - istemci sadece ihtiyaç duyduğu boyutları indirir
+            response_data['variants'] = variant_links(cache_key, model_type)
         
-        start_time = time.time()
+        logger.info(f"✅ Base64 işlem başarılı: {process_time:.2f}s, model: {used_model}, önbellek: {cache_status}")
+        response = jsonify(response_data)
+        response.headers['X-Cache'] = cache_status.upper()
+        if quality_tier:
+            response.headers['X-Quality-Tier'] = quality_tier
+        add_cascade_header(response, cascade)
+        return add_timing_headers(response, timings)
         
-        # İşlem
+    except Exception as e:
+        logger.error(f"❌ Base64 API genel hatası: {str(e)}")
+        logger.error(f"Genel traceback: {traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/mask', methods=['POST'])
+def remove_background_mask():
+    """
+    Sadece alfa maskesi - istemci orijinal fotoğrafla kendisi birleştirir
+    
+    Girdi multipart 'image', ham görüntü gövdesi veya JSON image_base64.
+    format=png ham 8-bit gri PNG döner (sınır kutusu X-BBox başlığında),
+    format=rle JSON içinde run-length kodlu ikili maske döner.
+    """
+    try:
+        if 'image' in request.files:
+            image_data = request.files['image'].read()
+            params = request.form
+        elif is_binary_request():
+            image_data = request.get_data(cache=False)
+            params = request.args
+        else:
+            data = request.get_json(silent=True) or {}
+            image_base64 = data.get('image_base64', '')
+            if image_base64.startswith('data:'):
+                image_base64 = image_base64[image_base64.index(',') + 1:]
+            try:
+                image_data = base64.b64decode(image_base64)
+            except Exception as decode_error:
+                return jsonify({
+                    'success': False,
+                    'error': f'Base64 decode hatası: {str(decode_error)}'
+                }), 400
+            params = data
+        
+        if not image_data:
+            return jsonify({
+                'success': False,
+                'error': 'image, image_base64 veya ham görüntü gövdesi gerekli'
+            }), 400
+        
+        model_type = params.get('model', 'ultra')
+        model_name = params.get('model_name') or None
+        mask_format = str(params.get('format', 'png')).lower()
         try:
-            if model_type == 'ultra':
-                logger.info("🚀 Ultra model ile işlem başlatılıyor...")
-                options = {
-                    'ai_positioning': True,
-                    'enhance': enhance,
-                    'create_variants': create_variants,
-                    'positioning_mode': positioning
-                }
-                remover = get_ultra_remover()
-                logger.info(f"✅ Ultra remover hazır, model: {remover.best_model}")
-                result_path = remover.ultra_process(filepath, options)
-                used_model = remover.best_model
-                logger.info(f"📁 Ultra işlem tamamlandı: {result_path}")
-            else:
-                logger.info("🚀 Advanced model ile işlem başlatılıyor...")
-                options = {
-                    'preprocess': True,
-                    'fix_positioning': True,
-                    'center_vertically': positioning == 'center',
-                    'enhance': enhance,
-                    'create_variants': create_variants,
-                    'add_padding': True
-                }
-                remover = get_advanced_remover()
-                logger.info(f"✅ Advanced remover hazır, model: {remover.model_name}")
-                result_path = remover.process_clothing_complete(filepath, options)
-                used_model = remover.model_name
-                logger.info(f"📁 Advanced işlem tamamlandı: {result_path}")
-                
-        except Exception as model_error:
-            logger.error(f"❌ Model işlem hatası: {str(model_error)}")
-            logger.error(f"Model traceback: {traceback.format_exc()}")
+            size = int(params['size']) if params.get('size') else None
+            threshold = int(params.get('threshold', 128))
+        except (TypeError, ValueError):
             return jsonify({
                 'success': False,
-                'error': f'Model işlem hatası: {str(model_error)}'
-            }), 500
+                'error': 'size ve threshold tam sayı olmalı'
+            }), 400
         
-        process_time = time.time() - start_time
+        if mask_format not in ('png', 'rle'):
+            return jsonify({
+                'success': False,
+                'error': 'format png veya rle olmalı'
+            }), 400
+        if size is not None and not 16 <= size <= 4096:
+            return jsonify({
+                'success': False,
+                'error': 'size 16-4096 arasında olmalı'
+            }), 400
+        if not 1 <= threshold <= 255:
+            return jsonify({
+                'success': False,
+                'error': 'threshold 1-255 arasında olmalı'
+            }), 400
+        model_error = pinned_model_error(model_type, model_name)
+        if model_error:
+            return jsonify({
+                'success': False,
+                'error': model_error
+            }), 400
         
-        if not result_path or not os.path.exists(result_path):
-            logger.error(f"❌ İşlem sonucu bulunamadı: {result_path}")
+        note_request('mask', image_data, {
+            'model': model_type,
+            'model_name': model_name,
+            'format': mask_format,
+            'size': size,
+            'threshold': threshold
+        })
+        
+        try:
+            decode_start = time.perf_counter()
+            # Kaldırma endpoint'leriyle aynı çözme - maske kesimle hizalı, maske önbelleği ortak
+            img = open_image(image_data)
+            decode_seconds = time.perf_counter() - decode_start
+        except Exception as image_error:
             return jsonify({
                 'success': False,
-                'error': 'İşlem başarısız'
+                'error': f'Görüntü okunamadı: {str(image_error)}'
+            }), 400
+        del image_data
+        
+        start_time = time.time()
+        plan = plan_inference(model_type, model_name)
+        note_plan(plan)
+        alpha, used_model, cascade = run_alpha(img, model_type, plan)
+        quality_tier = plan['name'] if plan else None
+        note_model(used_model)
+        note_served(used_model, cascade)
+        observe_stage('decode', decode_seconds, used_model)
+        if alpha is None:
+            return jsonify({
+                'success': False,
+                'error': 'Maske üretilemedi'
             }), 500
         
-        logger.info(f"📄 Sonuç dosyası okunuyor: {result_path}")
+        alpha = resize_mask(alpha, size)
+        bbox = mask_bbox(alpha, threshold)
+        process_time = time.time() - start_time
+        logger.info(f"✅ Maske üretildi: {alpha.width}x{alpha.height}, {mask_format}, {process_time:.2f}s, model: {used_model}")
         
-        # Sonucu base64'e çevir
-        with open(result_path, 'rb') as f:
-            result_data = f.read()
-            result_base64 = base64.b64encode(result_data).decode('utf-8')
+        if mask_format == 'rle':
+            return jsonify({
+                'success': True,
+                'mask_rle': encode_mask_rle(alpha, threshold),
+                'bbox': bbox,
+                'width': alpha.width,
+                'height': alpha.height,
+                'original_width': img.width,
+                'original_height': img.height,
+                'model_used': used_model,
+                'segmentation_path': segmentation_path(used_model),
+                'quality_tier': quality_tier,
+                'cascade': cascade,
+                'processing_time': round(process_time, 2)
+            })
+        
+        buffer = io.BytesIO()
+        with stage_timer('encode', used_model):
+            alpha.save(buffer, format='PNG')
+        response = Response(buffer.getvalue(), mimetype='image/png')
+        response.headers['X-Processing-Time'] = f"{process_time:.2f}"
+        response.headers['X-Model-Used'] = used_model
+        response.headers['X-Mask-Width'] = str(alpha.width)
+        response.headers['X-Mask-Height'] = str(alpha.height)
+        response.headers['X-Original-Width'] = str(img.width)
+        response.headers['X-Original-Height'] = str(img.height)
+        if bbox:
+            response.headers['X-BBox'] = f"{bbox['x']},{bbox['y']},{bbox['width']},{bbox['height']}"
+        if quality_tier:
+            response.headers['X-Quality-Tier'] = quality_tier
+        add_cascade_header(response, cascade)
+        return response
+        
+    except Exception as e:
+        logger.error(f"❌ Maske API hatası: {str(e)}")
+        logger.error(f"Maske traceback: {traceback.format_exc()}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Asenkron iş gönder - iş kimliği hemen döner
+    Multipart (image dosyası) veya JSON (image_base64) kabul eder
+    """
+    try:
+        if 'image' in request.files:
+            file = request.files['image']
+            if file.filename == '' or not allowed_file(file.filename):
+                return jsonify({
+                    'success': False,
+                    'error': 'Desteklenmeyen dosya formatı'
+                }), 400
+            
+            params = request.form
+            filepath = os.path.join(JOB_FOLDER, generate_unique_filename(file.filename))
+            file.save(filepath)
             
-        logger.info(f"✅ Base64 encode tamamlandı, sonuç boyutu: {len(result_data)} bytes")
+            model_type = params.get('model', 'ultra')
+            model_name = params.get('model_name') or None
+            positioning = params.get('positioning', 'smart')
+            enhance = params.get('enhance', 'false').lower() == 'true'
+            create_variants = params.get('variants', 'false').lower() == 'true'
+            callback_url = params.get('callback_url')
+        else:
+            data = request.get_json(silent=True) or {}
+            if 'image_base64' not in data:
+                return jsonify({
+                    'success': False,
+                    'error': 'image dosyası veya image_base64 parametresi gerekli'
+                }), 400
+            
+            image_base64 = data['image_base64']
+            if image_base64.startswith('data:'):
+                image_base64 = image_base64.split(',', 1)[1]
+            
+            try:
+                image_data = base64.b64decode(image_base64)
+            except Exception as decode_error:
+                return jsonify({
+                    'success': False,
+                    'error': f'Base64 decode hatası: {str(decode_error)}'
+                }), 400
+            
+            filepath = os.path.join(JOB_FOLDER, generate_unique_filename('image.png'))
+            with open(filepath, 'wb') as f:
+                f.write(image_data)
+            
+            model_type = data.get('model', 'ultra')
+            model_name = data.get('model_name') or None
+            positioning = data.get('positioning', 'smart')
+            enhance = bool(data.get('enhance', False))
+            create_variants = bool(data.get('create_variants', False))
+            callback_url = data.get('callback_url')
         
-        # Geçici dosyaları temizle
-        for temp_file in [filepath, result_path]:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                logger.info(f"🗑️ Geçici dosya silindi: {temp_file}")
+        model_error = pinned_model_error(model_type, model_name)
+        if model_error:
+            os.remove(filepath)
+            return jsonify({
+                'success': False,
+                'error': model_error
+            }), 400
         
-        response_data = {
-            'success': True,
-            'result_base64': result_base64,
-            'processing_time': round(process_time, 2),
-            'model_used': used_model,
-            'parameters': {
-                'model_type': model_type,
-                'positioning': positioning
-            }
+        payload = {
+            'filepath': filepath,
+            'model': model_type,
+            'model_name': model_name,
+            'positioning': positioning,
+            'enhance': enhance,
+            'create_variants': create_variants
         }
         
-        logger.info(f"✅ Base64 işlem başarılı: {process_time:.2f}s, model: {used_model}")
-        return jsonify(response_data)
+        try:
+            job_id = job_queue.submit(payload, callback_url=callback_url)
+        except QueueFullError as e:
+            os.remove(filepath)
+            logger.warning(f"⚠️ {str(e)}")
+            response = jsonify({
+                'success': False,
+                'error': str(e)
+            })
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': JobQueue.QUEUED,
+            'status_url': f'/api/jobs/{job_id}',
+            'result_url': f'/api/jobs/{job_id}/result'
+        }), 202
         
     except Exception as e:
-        logger.error(f"❌ Base64 API genel hatası: {str(e)}")
-        logger.error(f"Genel traceback: {traceback.format_exc()}")
+        logger.error(f"❌ İş gönderme hatası: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    İş durumunu sorgula
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'İş bulunamadı'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Tamamlanan işin sonuç PNG'sini döndür
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'İş bulunamadı'
+        }), 404
+    
+    if job['status'] == JobQueue.FAILED:
+        return jsonify({
+            'success': False,
+            'status': job['status'],
+            'error': job.get('error')
+        }), 500
+    
+    if job['status'] == JobQueue.EXPIRED:
+        return jsonify({
+            'success': False,
+            'status': job['status'],
+            'error': 'Sonuç dosyasının saklama süresi doldu'
+        }), 410
+    
+    if job['status'] != JobQueue.DONE:
+        response = jsonify({
+            'success': False,
+            'status': job['status']
+        })
+        response.headers['Retry-After'] = '2'
+        return response, 202
+    
+    file_path = os.path.join(PROCESSED_FOLDER, job['result']['filename'])
+    if not os.path.exists(file_path):
+        return jsonify({
+            'success': False,
+            'error': 'Dosya bulunamadı'
+        }), 404
+    
+    return serve_processed_file(file_path)
+
 @app.route('/', methods=['GET'])
 def index():
     """
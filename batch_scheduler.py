@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Mikro-Batch Çıkarım Zamanlayıcısı
+Kısa bir pencere içinde gelen istekleri tek bir batch ONNX çalıştırmasında toplar
+"""
+
+import logging
+import copy
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+# Tek kanallı (1 x H x W) maske üreten, batch'lenebilir rembg modelleri.
+# Tüm girdiler modelin doğal boyutuna getirildiği için aynı modelin
+# istekleri tek bir kovaya (bucket) düşer
+BATCHABLE_MODELS = ('u2net', 'u2netp', 'u2net_human_seg', 'silueta', 'isnet-general-use')
+
+
+class _SpecCaptured(Exception):
+    pass
+
+
+def session_input_spec(session):
+    """
+    Session'ın predict() içinde normalize()'a verdiği girdi boyutu ve
+    normalizasyonu ({'size', 'mean', 'std'}), okunamazsa None
+
+    Değerler kurulu rembg sürümünden okunur (ör. DIS 2.0.67'den beri 0.5
+    ortalama kullanır). Paylaşılan session değiştirilmez; kopyası üzerinde
+    normalize() yakalanır ve model çalıştırılmadan çıkılır.
+    """
+    captured = {}
+
+    def capture(img, mean, std, size, *args, **kwargs):
+        captured.update(size=tuple(size), mean=tuple(mean), std=tuple(std))
+        raise _SpecCaptured()
+
+    probe = copy.copy(session)
+    probe.normalize = capture
+    try:
+        probe.predict(Image.new('RGB', (8, 8)))
+    except _SpecCaptured:
+        return captured
+    except Exception as e:
+        logger.warning(f"⚠️ Session girdi ayarları okunamadı: {e}")
+    return None
+
+
+class BatchScheduler:
+    """
+    Session önünde çalışan mikro-batch zamanlayıcı
+
+    predict() çağıran thread'i bloklar; dispatcher thread en fazla
+    max_batch_size isteği ya da max_wait_ms süresini doldurana kadar
+    bekler, sonra tek bir ONNX çalıştırması yapar ve her isteğe kendi
+    maskelerini döndürür. Batch desteği olmayan modellerde (ör.
+    u2net_cloth_seg çok sınıflı çıktı) session.predict doğrudan kullanılır.
+    """
+
+    def __init__(self, get_session, model_name, max_batch_size=4, max_wait_ms=10):
+        # get_session() -> session; havuz tahliyesine izin vermek için
+        # session referansı saklanmaz, her çalıştırmada yeniden alınır
+        self.get_session = get_session
+        self.model_name = model_name
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        # İlk batch'te session'dan okunur (session_input_spec)
+        self.spec = None
+
+        self._queue = queue.Queue()
+        self._thread = None
+
+        if self.batchable:
+            self._thread = threading.Thread(target=self._dispatch_loop, name=f"batch-{model_name}", daemon=True)
+            self._thread.start()
+            logger.info(f"✅ Mikro-batch aktif: {model_name} (max {self.max_batch_size}, {max_wait_ms} ms)")
+        else:
+            logger.info(f"ℹ️ {model_name} batch desteklemiyor, tekil çıkarım kullanılacak")
+
+    @property
+    def batchable(self):
+        return self.model_name in BATCHABLE_MODELS and self.max_batch_size > 1
+
+    def predict(self, img):
+        """
+        Görüntü için maske listesi döndür (session.predict ile aynı biçim)
+        """
+        if not self.batchable:
+            return self.get_session().predict(img)
+
+        future = Future()
+        self._queue.put((img, future))
+        return future.result()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                masks = self._run_batch([img for img, _ in batch])
+                for (_, future), item_masks in zip(batch, masks):
+                    future.set_result(item_masks)
+            except Exception as e:
+                logger.error(f"❌ Batch çıkarım hatası: {e}")
+                logger.error(f"Batch traceback: {traceback.format_exc()}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, images):
+        session = self.get_session()
+        if self.spec is None:
+            self.spec = session_input_spec(session)
+        if self.spec is None:
+            return [session.predict(img) for img in images]
+
+        inner = session.inner_session
+        input_name = inner.get_inputs()[0].name
+        inputs = [
+            session.normalize(img, self.spec['mean'], self.spec['std'], self.spec['size'])[input_name]
+            for img in images
+        ]
+
+        # Sabit batch boyutu 1 olan modeller için tek tek çalıştır
+        batch_dim = inner.get_inputs()[0].shape[0]
+        if len(inputs) > 1 and batch_dim == 1:
+            preds = [inner.run(None, {input_name: x})[0] for x in inputs]
+            preds = np.concatenate(preds, axis=0)
+        else:
+            preds = inner.run(None, {input_name: np.concatenate(inputs, axis=0)})[0]
+
+        logger.info(f"🧮 Batch çıkarım: {len(images)} görüntü ({self.model_name})")
+
+        results = []
+        for img, pred in zip(images, preds[:, 0, :, :]):
+            ma, mi = np.max(pred), np.min(pred)
+            pred = (pred - mi) / max(ma - mi, 1e-8)
+            mask = Image.fromarray((pred * 255).astype("uint8"), mode="L")
+            results.append([mask.resize(img.size, Image.Resampling.LANCZOS)])
+
+        return results
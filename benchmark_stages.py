@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Aşama Mikro-Benchmark'ı
+Model çalıştırmadan görüntü işleme aşamalarını (ön işleme, konumlandırma,
+iyileştirme, varyantlar, gölge, stüdyo segmentasyonu, PNG encode) deterministik sentetik kıyafet
+görüntülerinde ölçer; ops/sn ve tepe bellek değerlerini JSON olarak raporlar.
+Aynı parametrelerle alınan iki rapor, farklı implementasyonları karşılaştırmak
+için doğrudan kıyaslanabilir.
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from PIL import Image
+
+from advanced_clothing_bg_remover import AdvancedClothingBgRemover
+from clothing_bg_remover import ClothingBgRemover
+from onnx_tuning import available_cpus
+from session_pool import current_rss_bytes
+from studio_segmenter import studio_alpha
+from synthetic_images import make_garment_image
+from ultra_clothing_bg_remover import UltraClothingBgRemover
+
+DEFAULT_SIZES = [512, 1024, 2048, 4096]
+
+
+def stage_removers():
+    """
+    Model yüklemeden remover örnekleri - ölçülen aşamalar session kullanmaz
+    """
+    return {
+        'ultra': UltraClothingBgRemover.__new__(UltraClothingBgRemover),
+        'advanced': AdvancedClothingBgRemover.__new__(AdvancedClothingBgRemover),
+        'basic': ClothingBgRemover.__new__(ClothingBgRemover)
+    }
+
+
+def make_inputs(size, seed):
+    """
+    Aşama girdileri: ham fotoğraf (RGB) ve arka planı kaldırılmış kesim (RGBA)
+    """
+    photo, mask = make_garment_image(size, seed, 'studio')
+    cutout = photo.convert("RGBA")
+    cutout.putalpha(mask)
+    return {'photo': photo, 'cutout': cutout}
+
+
+def encode_png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def build_stages(removers, inputs, workdir):
+    """
+    Aşama adı -> argümansız çağrılabilir
+    add_shadow dosya tabanlı olduğundan kesim bir kez diske yazılır ve
+    ölçüme dosya okuma/yazma da dahildir.
+    """
+    ultra = removers['ultra']
+    advanced = removers['advanced']
+    basic = removers['basic']
+    photo = inputs['photo']
+    cutout = inputs['cutout']
+
+    shadow_input = os.path.join(workdir, 'cutout.png')
+    shadow_output = os.path.join(workdir, 'cutout_with_shadow.png')
+    cutout.save(shadow_input, "PNG")
+
+    return {
+        'intelligent_preprocessing': lambda: ultra.intelligent_preprocessing_image(photo),
+        'preprocess_image': lambda: advanced.preprocess_loaded_image(photo, target_size=(1024, 1024)),
+        'ai_positioning': lambda: ultra.ai_positioning_image(cutout, mode='smart'),
+        'fix_positioning': lambda: advanced.fix_positioning_image(cutout, center_vertically=False),
+        'enhance_for_ecommerce': lambda: ultra.enhance_for_ecommerce_image(cutout),
+        'enhance_for_ecommerce_advanced': lambda: advanced.enhance_for_ecommerce_image(cutout),
+        'create_variants': lambda: ultra.render_variants(cutout),
+        'create_product_variants': lambda: advanced.render_product_variants(cutout),
+        'add_shadow': lambda: basic.add_shadow(shadow_input, shadow_output),
+        'studio_segment': lambda: studio_alpha(photo),
+        'png_encode': lambda: encode_png(cutout)
+    }
+
+
+class RssSampler:
+    """
+    Arka planda RSS örnekleyerek tepe değeri bulur (PIL/OpenCV tamponları
+    tracemalloc'a görünmez)
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+
+def measure_memory(func):
+    """
+    Tek çağrının tepe belleği: Python/numpy tahsisleri (tracemalloc) ve RSS artışı
+    Zamanlama ölçümünden ayrı çalışır; tracemalloc yükü süreleri bozmasın.
+    """
+    gc.collect()
+    baseline_rss = current_rss_bytes()
+    tracemalloc.start()
+    try:
+        with RssSampler() as sampler:
+            func()
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    peak_rss_delta = None
+    if baseline_rss is not None and sampler.peak is not None:
+        peak_rss_delta = max(0, sampler.peak - baseline_rss)
+    return peak_traced, peak_rss_delta
+
+
+def benchmark(func, min_runs=3, min_seconds=1.0, warmup=1):
+    """
+    func'ı en az min_runs kez ve en az min_seconds boyunca çalıştır
+    Dönüş: çağrı başına süreler (saniye)
+    """
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    started = time.perf_counter()
+    while len(durations) < min_runs or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_benchmarks(sizes=None, stages=None, seed=0, min_runs=3, min_seconds=1.0, progress=None):
+    """
+    Tüm aşama x boyut kombinasyonlarını ölç
+    Dönüş: JSON'a yazılabilir rapor dict'i
+    """
+    sizes = sizes or DEFAULT_SIZES
+    removers = stage_removers()
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix='stage-bench-') as workdir:
+        for size in sizes:
+            inputs = make_inputs(size, seed)
+            stage_funcs = build_stages(removers, inputs, workdir)
+            unknown = set(stages or []) - set(stage_funcs)
+            if unknown:
+                raise ValueError(f"Bilinmeyen aşama: {', '.join(sorted(unknown))}")
+
+            for name, func in stage_funcs.items():
+                if stages and name not in stages:
+                    continue
+
+                # Aşamaların print çıktıları ölçümü ve raporu kirletmesin
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    durations = benchmark(func, min_runs=min_runs, min_seconds=min_seconds)
+                    peak_traced, peak_rss_delta = measure_memory(func)
+
+                total = sum(durations)
+                result = {
+                    'stage': name,
+                    'size': size,
+                    'width': inputs['photo'].width,
+                    'height': inputs['photo'].height,
+                    'runs': len(durations),
+                    'ops_per_sec': round(len(durations) / total, 3) if total else None,
+                    'mean_ms': round(statistics.mean(durations) * 1000, 3),
+                    'median_ms': round(statistics.median(durations) * 1000, 3),
+                    'min_ms': round(min(durations) * 1000, 3),
+                    'stdev_ms': round(statistics.stdev(durations) * 1000, 3) if len(durations) > 1 else 0.0,
+                    'peak_traced_bytes': peak_traced,
+                    'peak_rss_delta_bytes': peak_rss_delta
+                }
+                results.append(result)
+                if progress:
+                    progress(result)
+
+    return {
+        'benchmark': 'stages',
+        'generated_at': time.time(),
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpus': available_cpus(),
+            'pillow': Image.__version__
+        },
+        'config': {
+            'sizes': sizes,
+            'stages': stages,
+            'seed': seed,
+            'min_runs': min_runs,
+            'min_seconds': min_seconds
+        },
+        'results': results
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("""
+⏱️  Aşama Mikro-Benchmark'ı
+
+Kullanım:
+  python benchmark_stages.py [--sizes 512,1024,2048,4096] [--stages ai_positioning,png_encode]
+                             [--runs 3] [--min-time 1.0] [--seed 0] [--output rapor.json]
+
+Aşamalar: intelligent_preprocessing, preprocess_image, ai_positioning, fix_positioning,
+          enhance_for_ecommerce, enhance_for_ecommerce_advanced, create_variants,
+          create_product_variants, add_shadow, studio_segment, png_encode
+--output verilmezse JSON rapor stdout'a yazılır.
+        """)
+        return 0
+
+    sizes = None
+    stages = None
+    min_runs = 3
+    min_seconds = 1.0
+    seed = 0
+    output = None
+    while args:
+        arg = args.pop(0)
+        if arg == '--sizes':
+            sizes = [int(size) for size in args.pop(0).split(',')]
+        elif arg == '--stages':
+            stages = args.pop(0).split(',')
+        elif arg == '--runs':
+            min_runs = int(args.pop(0))
+        elif arg == '--min-time':
+            min_seconds = float(args.pop(0))
+        elif arg == '--seed':
+            seed = int(args.pop(0))
+        elif arg == '--output':
+            output = args.pop(0)
+        else:
+            print(f"❌ Bilinmeyen argüman: {arg}", file=sys.stderr)
+            return 2
+
+    def progress(result):
+        print(f"⏱️  {result['stage']:<32} {result['size']:>5}px  {result['ops_per_sec']:>9} ops/sn  "
+              f"{result['median_ms']:>10} ms  tepe {result['peak_traced_bytes'] / (1024 * 1024):.1f} MB",
+              file=sys.stderr)
+
+    report = run_benchmarks(sizes, stages, seed, min_runs, min_seconds, progress)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Rapor yazıldı: {output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,12 @@ import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
 workers = 1  # Model memory usage için tek worker
-worker_class = "sync"
+# gthread: aynı worker'da eşzamanlı HTTP istekleri BatchScheduler'da tek
+# batch'te birleşebilsin diye thread sayısı BATCH_MAX_SIZE kadar (varsayılan 1 =
+# sync ile aynı davranış). Her thread kendi görüntü/aktivasyon tamponlarını
+# tuttuğundan tepe bellek eşzamanlı istek sayısıyla artar.
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', os.environ.get('BATCH_MAX_SIZE', 1)))
 worker_connections = 1000
 timeout = 300  # 5 minute timeout for image processing
 keepalive = 5
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Görüntü okuma yardımcısı
+Tüm endpoint'ler (form, base64/binary, maske, iş kuyruğu) girdiyi aynı şekilde
+açar: EXIF yönü uygulanır ve pikseller hemen yüklenir. Böylece aynı yükleme
+her yolda aynı piksellere çözülür (maske önbelleği paylaşılır, maske ve kesim
+hizalı kalır).
+"""
+
+import io
+
+from PIL import Image, ImageOps
+
+
+def open_image(source):
+    """
+    Dosya yolu, dosya nesnesi veya byte'lardan görüntüyü aç
+    EXIF yönü uygulanmış, yüklenmiş PIL görüntüsü döner.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    img = Image.open(source)
+    # İstemcinin gösterdiği (telefonun döndürdüğü) yön
+    img = ImageOps.exif_transpose(img)
+    img.load()
+    return img
@@ -72,6 +72,100 @@ def test_ios_api():
         print(f"❌ Bağlantı hatası: {e}")
         return False
 
+def test_ios_api_binary():
+    """
+    Binary mod testi - ham görüntü byte'ları gönder, ham PNG al
+    """
+    api_url = "http://localhost:5001/api/remove-background-base64?model=ultra&positioning=smart"
+    
+    with open("test2.png", "rb") as image_file:
+        image_bytes = image_file.read()
+    
+    print("📱 iOS Binary API Test Başlıyor...")
+    print(f"📦 Gövde boyutu: {len(image_bytes)} bytes")
+    
+    try:
+        response = requests.post(
+            api_url,
+            data=image_bytes,
+            headers={
+                'Content-Type': 'image/png',
+                'Accept': 'image/png'
+            },
+            timeout=30
+        )
+        
+        if response.status_code == 200:
+            print("✅ Binary API Test Başarılı!")
+            print(f"⏱️  İşlem süresi: {response.headers.get('X-Processing-Time')} saniye")
+            print(f"🤖 Kullanılan model: {response.headers.get('X-Model-Used')}")
+            print(f"📦 Yanıt boyutu: {len(response.content)} bytes")
+            
+            with open("test_sonuc_binary.png", "wb") as f:
+                f.write(response.content)
+            print("💾 Sonuç kaydedildi: test_sonuc_binary.png")
+            
+            return True
+            
+        else:
+            print(f"❌ API Hatası: {response.status_code}")
+            print(f"Hata: {response.text}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Bağlantı hatası: {e}")
+        return False
+
+def test_ios_api_mask():
+    """
+    Maske testi - sadece alfa maskesi (PNG) ve RLE
+    """
+    api_url = "http://localhost:5001/api/mask?model=ultra&size=512"
+    
+    with open("test2.png", "rb") as image_file:
+        image_bytes = image_file.read()
+    
+    print("📱 iOS Maske API Test Başlıyor...")
+    
+    try:
+        response = requests.post(
+            api_url,
+            data=image_bytes,
+            headers={'Content-Type': 'image/png'},
+            timeout=30
+        )
+        
+        if response.status_code != 200:
+            print(f"❌ API Hatası: {response.status_code}")
+            print(f"Hata: {response.text}")
+            return False
+        
+        print("✅ Maske API Test Başarılı!")
+        print(f"📐 Maske: {response.headers.get('X-Mask-Width')}x{response.headers.get('X-Mask-Height')}, "
+              f"sınır kutusu: {response.headers.get('X-BBox')}")
+        print(f"📦 PNG yanıt boyutu: {len(response.content)} bytes")
+        
+        with open("test_sonuc_maske.png", "wb") as f:
+            f.write(response.content)
+        print("💾 Maske kaydedildi: test_sonuc_maske.png")
+        
+        response = requests.post(
+            api_url + "&format=rle",
+            data=image_bytes,
+            headers={'Content-Type': 'image/png'},
+            timeout=30
+        )
+        if response.status_code == 200:
+            result = response.json()
+            print(f"📦 RLE yanıt boyutu: {len(response.content)} bytes, "
+                  f"{len(result['mask_rle']['counts'])} koşu, bbox: {result['bbox']}")
+        
+        return True
+            
+    except Exception as e:
+        print(f"❌ Bağlantı hatası: {e}")
+        return False
+
 def generate_ios_swift_example():
     """
     iOS Swift kullanım örneği oluştur
@@ -253,6 +347,16 @@ if __name__ == "__main__":
     else:
         print("\n❌ API test başarısız!")
     
+    if test_ios_api_binary():
+        print("\n🎉 Binary API test başarılı!")
+    else:
+        print("\n❌ Binary API test başarısız!")
+    
+    if test_ios_api_mask():
+        print("\n🎉 Maske API test başarılı!")
+    else:
+        print("\n❌ Maske API test başarısız!")
+    
     # 2. iOS Swift örneği oluştur
     print("\n📱 iOS Swift örneği oluşturuluyor...")
     generate_ios_swift_example()
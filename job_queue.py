@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Asenkron İş Kuyruğu
+Sınırlı bellek içi kuyruk + worker havuzu, SQLite günlüğü ile kalıcı
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import urllib.request
+import uuid
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Kuyruk dolu olduğunda yeni iş kabul edilmez"""
+
+
+class JobQueue:
+    """
+    Submit/poll/result iş kuyruğu
+
+    İşler SQLite günlüğüne yazılır; worker yeniden başlatıldığında
+    'queued' ve yarıda kalmış 'running' işler tekrar kuyruğa alınır.
+    Sonuç dosyası silinen işler 'expired' olarak işaretlenir (expire_result),
+    biten işler saklama süresinden sonra günlükten silinir (prune).
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    EXPIRED = 'expired'
+
+    def __init__(self, handler, db_path='jobs.db', max_queue=16, workers=1, callback_timeout=10):
+        # handler(payload) -> sonuç dict'i; hata durumunda exception fırlatır
+        self.handler = handler
+        self.db_path = db_path
+        self.max_queue = max_queue
+        self.workers = workers
+        self.callback_timeout = callback_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._db_lock = threading.Lock()
+        self._threads = []
+        self._started = False
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    callback_url TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+
+    def start(self):
+        """
+        Worker thread'lerini başlat ve günlükteki yarım işleri kurtar
+        """
+        if self._started:
+            return
+        self._started = True
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        # Kurtarılan işler kuyruk kapasitesini aşabilir, bu yüzden
+        # bloklayan put ile ayrı bir thread'den beslenir
+        pending = self._pending_job_ids()
+        if pending:
+            logger.info(f"♻️ Günlükten {len(pending)} iş kurtarıldı")
+            threading.Thread(target=self._requeue, args=(pending,), name="job-recovery", daemon=True).start()
+
+        logger.info(f"✅ İş kuyruğu hazır: {self.workers} worker, kapasite {self.max_queue}")
+
+    def _pending_job_ids(self):
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (self.QUEUED, self.RUNNING)
+            )
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                (self.QUEUED,)
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def _requeue(self, job_ids):
+        for job_id in job_ids:
+            self._queue.put(job_id)
+
+    def submit(self, payload, callback_url=None):
+        """
+        Yeni iş ekle ve iş kimliğini hemen döndür
+        Kuyruk doluysa QueueFullError fırlatır.
+        """
+        job_id = uuid.uuid4().hex
+
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, payload, callback_url, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, self.QUEUED, json.dumps(payload), callback_url, time.time())
+            )
+
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            raise QueueFullError(f"İş kuyruğu dolu ({self.max_queue})")
+
+        logger.info(f"📥 İş kuyruğa alındı: {job_id}")
+        return job_id
+
+    def get(self, job_id):
+        """
+        İş durumunu dict olarak döndür, bulunamazsa None
+        """
+        with self._db_lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_dict(row)
+
+    def expire_result(self, filename):
+        """
+        Sonuç dosyası (result['filename']) silinen tamamlanmış işleri 'expired' yap
+        Dönüş: işaretlenen iş sayısı
+        """
+        # LIKE sadece aday eleme içindir ('_' joker); kesin eşleşme JSON'dan kontrol edilir
+        pattern = '%' + filename.replace('%', '') + '%'
+        with self._db_lock, self._db:
+            rows = self._db.execute(
+                "SELECT id, result FROM jobs WHERE status = ? AND result LIKE ?",
+                (self.DONE, pattern)
+            ).fetchall()
+            expired = [row['id'] for row in rows if json.loads(row['result']).get('filename') == filename]
+            self._db.executemany(
+                "UPDATE jobs SET status = ? WHERE id = ?",
+                [(self.EXPIRED, job_id) for job_id in expired]
+            )
+        if expired:
+            logger.info(f"⌛ Sonucu silinen {len(expired)} iş süresi doldu olarak işaretlendi: {filename}")
+        return len(expired)
+
+    def prune(self, max_age_seconds):
+        """
+        Bitişinden bu yana max_age_seconds geçmiş (done/failed/expired) işleri günlükten sil
+        Bekleyen ve çalışan işlere dokunulmaz. Dönüş: silinen iş sayısı
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._db_lock, self._db:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                (self.DONE, self.FAILED, self.EXPIRED, cutoff)
+            ).rowcount
+        if deleted:
+            logger.info(f"🧹 İş günlüğünden {deleted} eski iş silindi")
+        return deleted
+
+    def depth(self):
+        """Kuyrukta bekleyen iş sayısı"""
+        return self._queue.qsize()
+
+    def _row_to_dict(self, row):
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+        if row['result']:
+            job['result'] = json.loads(row['result'])
+        if row['error']:
+            job['error'] = row['error']
+        return job
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"❌ İş worker hatası ({job_id}): {e}")
+                logger.error(f"Worker traceback: {traceback.format_exc()}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id):
+        with self._db_lock, self._db:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row['status'] != self.QUEUED:
+                return
+            self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (self.RUNNING, time.time(), job_id)
+            )
+
+        logger.info(f"⚙️ İş başladı: {job_id}")
+        payload = json.loads(row['payload'])
+
+        try:
+            result = self.handler(payload)
+            status, result_json, error = self.DONE, json.dumps(result), None
+            logger.info(f"✅ İş tamamlandı: {job_id}")
+        except Exception as e:
+            status, result_json, error = self.FAILED, None, str(e)
+            logger.error(f"❌ İş başarısız ({job_id}): {e}")
+            logger.error(f"Job traceback: {traceback.format_exc()}")
+
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result_json, error, time.time(), job_id)
+            )
+
+        if row['callback_url']:
+            self._notify(row['callback_url'], self.get(job_id))
+
+    def _notify(self, callback_url, job):
+        """
+        İş bitince callback URL'ine JSON POST gönder
+        """
+        try:
+            body = json.dumps(job).encode('utf-8')
+            req = urllib.request.Request(
+                callback_url,
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                method='POST'
+            )
+            with urllib.request.urlopen(req, timeout=self.callback_timeout) as response:
+                logger.info(f"📣 Callback gönderildi: {callback_url} ({response.status})")
+        except Exception as e:
+            logger.warning(f"⚠️ Callback gönderilemedi ({callback_url}): {e}")
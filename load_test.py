@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+HTTP Yük Testi
+Yerelde çalışan api_server'a (gunicorn veya geliştirme sunucusu)
+/api/remove-background ve /api/remove-background-base64 istekleri gönderir.
+Kapalı döngü (sabit eşzamanlılık) veya açık döngü (sabit geliş hızı)
+adımlarında p50/p95/p99 gecikme, throughput, hata oranı ve /metrics'ten
+okunan sunucu RSS zaman serisini JSON olarak raporlar.
+Birden fazla adım verilince (--concurrency 1,2,4 veya --rate 0.5,1,2)
+doygunluk noktası adım adım görülebilir.
+"""
+
+import base64
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+DEFAULT_URL = 'http://localhost:8000'
+ENDPOINTS = ('form', 'base64', 'binary', 'mask')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+
+
+def percentile(values, pct):
+    """
+    Sıralı değerlerde doğrusal interpolasyonlu yüzdelik
+    """
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def load_corpus(path=None):
+    """
+    Görüntü corpus'u: klasördeki dosyalar veya sentetik kıyafet görüntüleri
+    Dönüş: [(isim, PIL görüntüsü), ...]
+    """
+    if path:
+        corpus = []
+        for filename in sorted(os.listdir(path)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                img = Image.open(os.path.join(path, filename))
+                img.load()
+                corpus.append((filename, img))
+        if not corpus:
+            raise ValueError(f"Klasörde görüntü bulunamadı: {path}")
+        return corpus
+
+    from synthetic_images import make_corpus
+    return [(name, img) for name, img, _ in make_corpus((1024, 2048), (0, 1), ('studio', 'textured'))]
+
+
+def encode_jpeg(img):
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format='JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def unique_variant(img, index):
+    """
+    Sunucu önbelleklerini (sonuç + maske) atlatmak için piksel içeriği benzersiz kopya
+    Köşeye sayaçtan türetilen küçük bir renk bloğu çizilir; boyutlandırmadan sonra da kalır.
+    """
+    copy = img.convert("RGB")
+    color = (index & 255, (index >> 8) & 255, (index >> 16) & 255)
+    block = max(4, max(copy.size) // 256)
+    copy.paste(color, (0, 0, block, block))
+    return copy
+
+
+def build_payloads(corpus, total, cache_bust):
+    """
+    İstek başına gönderilecek JPEG byte'ları
+    Önbellek atlatılırken tüm varyantlar ölçüm başlamadan üretilir; istemci
+    tarafı encode maliyeti aynı makinedeki sunucuyla yarışmasın.
+    """
+    if not cache_bust:
+        encoded = [encode_jpeg(img) for _, img in corpus]
+        return [encoded[i % len(encoded)] for i in range(total)]
+
+    salt = random.randrange(1 << 16) << 8
+    return [encode_jpeg(unique_variant(corpus[i % len(corpus)][1], salt + i)) for i in range(total)]
+
+
+def build_request(base_url, endpoint, image_bytes, params):
+    """
+    Endpoint tipine göre urllib isteği oluştur
+    form: multipart /api/remove-background, base64: JSON, binary / mask: ham gövde
+    + query string (/api/remove-background-base64 / /api/mask)
+    """
+    if endpoint == 'form':
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in params.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+            )
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="load.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'.encode('utf-8') + image_bytes + b'\r\n'
+        )
+        parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+        return urllib.request.Request(
+            f"{base_url}/api/remove-background",
+            data=b''.join(parts),
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+            method='POST'
+        )
+
+    if endpoint == 'base64':
+        # JSON gövdede bayraklar bool olarak gönderilir
+        payload = {name: {'true': True, 'false': False}.get(value, value) for name, value in params.items()}
+        payload['image_base64'] = base64.b64encode(image_bytes).decode('ascii')
+        return urllib.request.Request(
+            f"{base_url}/api/remove-background-base64",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+
+    params = dict(params)
+    accept = params.pop('accept', 'image/png')
+    query = urllib.parse.urlencode(params)
+    path = '/api/mask' if endpoint == 'mask' else '/api/remove-background-base64'
+    return urllib.request.Request(
+        f"{base_url}{path}?{query}",
+        data=image_bytes,
+        headers={'Content-Type': 'image/jpeg', 'Accept': accept},
+        method='POST'
+    )
+
+
+def send(request, timeout):
+    """
+    İsteği gönder, yanıtı tamamen oku
+    Dönüş: {'status', 'bytes', 'cache', 'error'}
+    """
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return {'status': response.status, 'bytes': len(body),
+                    'cache': response.headers.get('X-Cache'), 'error': None}
+    except urllib.error.HTTPError as e:
+        e.read()
+        return {'status': e.code, 'bytes': 0, 'cache': None, 'error': f"HTTP {e.code}"}
+    except Exception as e:
+        return {'status': None, 'bytes': 0, 'cache': None, 'error': type(e).__name__}
+
+
+def read_server_metrics(base_url, timeout=5):
+    """
+    /metrics'ten RSS ve kuyruk derinliği; ulaşılamazsa None değerler
+    """
+    values = {'rss_bytes': None, 'job_queue_depth': None}
+    names = {'process_resident_memory_bytes': 'rss_bytes', 'clothing_job_queue_depth': 'job_queue_depth'}
+    try:
+        with urllib.request.urlopen(f"{base_url}/metrics", timeout=timeout) as response:
+            text = response.read().decode('utf-8')
+    except Exception:
+        return values
+
+    for line in text.splitlines():
+        if line.startswith('#') or ' ' not in line:
+            continue
+        name, value = line.rsplit(' ', 1)
+        if name in names:
+            values[names[name]] = float(value)
+    return values
+
+
+class MetricsSampler:
+    """
+    Yük sırasında sunucu metriklerini periyodik örnekle
+    """
+
+    def __init__(self, base_url, interval=1.0):
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.is_set():
+            sample = read_server_metrics(self.base_url)
+            sample['t'] = round(time.perf_counter() - self._started, 2)
+            self.samples.append(sample)
+            self._stop.wait(self.interval)
+
+
+def run_step(base_url, payloads, endpoints, params, concurrency, rate=None, duration=None,
+             timeout=300, sample_interval=1.0):
+    """
+    Tek yük adımı
+    rate None ise kapalı döngü: concurrency istemci art arda istek gönderir.
+    rate verilirse açık döngü: istekler Poisson süreciyle rate/sn hızında gelir;
+    gecikme planlanan geliş zamanından ölçülür (coordinated omission olmasın).
+    payloads bitince veya duration dolunca yeni istek başlatılmaz.
+    """
+    records = []
+    records_lock = threading.Lock()
+    next_index = [0]
+
+    def take_index():
+        with records_lock:
+            if next_index[0] >= len(payloads):
+                return None
+            if duration is not None and time.perf_counter() - started >= duration:
+                return None
+            index = next_index[0]
+            next_index[0] += 1
+            return index
+
+    def execute(index, scheduled_at):
+        endpoint = endpoints[index % len(endpoints)]
+        request = build_request(base_url, endpoint, payloads[index], params)
+        sent_at = time.perf_counter()
+        outcome = send(request, timeout)
+        finished_at = time.perf_counter()
+        outcome.update({
+            'endpoint': endpoint,
+            'latency': finished_at - (scheduled_at if scheduled_at is not None else sent_at),
+            'finished_at': finished_at - started
+        })
+        with records_lock:
+            records.append(outcome)
+
+    def closed_loop_client():
+        while True:
+            index = take_index()
+            if index is None:
+                return
+            execute(index, None)
+
+    sampler = MetricsSampler(base_url, sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate is None:
+            for _ in range(concurrency):
+                executor.submit(closed_loop_client)
+        else:
+            next_arrival = started
+            while True:
+                index = take_index()
+                if index is None:
+                    break
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(execute, index, next_arrival)
+                next_arrival += random.expovariate(rate)
+
+    elapsed = time.perf_counter() - started
+    samples = sampler.stop()
+    return summarize(records, elapsed, samples, concurrency, rate)
+
+
+def summarize(records, elapsed, samples, concurrency, rate):
+    ok = [record for record in records if record['status'] == 200]
+    latencies = sorted(record['latency'] for record in ok)
+
+    errors = {}
+    for record in records:
+        if record['status'] != 200:
+            errors[record['error']] = errors.get(record['error'], 0) + 1
+
+    def latency_ms(values):
+        return {
+            'p50': round(percentile(values, 50) * 1000, 1) if values else None,
+            'p95': round(percentile(values, 95) * 1000, 1) if values else None,
+            'p99': round(percentile(values, 99) * 1000, 1) if values else None,
+            'max': round(values[-1] * 1000, 1) if values else None,
+            'mean': round(sum(values) / len(values) * 1000, 1) if values else None
+        }
+
+    per_endpoint = {}
+    for endpoint in sorted({record['endpoint'] for record in records}):
+        endpoint_records = [record for record in records if record['endpoint'] == endpoint]
+        endpoint_ok = sorted(record['latency'] for record in endpoint_records if record['status'] == 200)
+        per_endpoint[endpoint] = {
+            'requests': len(endpoint_records),
+            'errors': len(endpoint_records) - len(endpoint_ok),
+            'latency_ms': latency_ms(endpoint_ok)
+        }
+
+    rss_values = [sample['rss_bytes'] for sample in samples if sample['rss_bytes'] is not None]
+    return {
+        'concurrency': concurrency,
+        'rate': rate,
+        'mode': 'closed' if rate is None else 'open',
+        'duration_seconds': round(elapsed, 2),
+        'requests': len(records),
+        'succeeded': len(ok),
+        'errors': errors,
+        'error_rate': round(1 - len(ok) / len(records), 4) if records else None,
+        'throughput_rps': round(len(ok) / elapsed, 3) if elapsed else None,
+        'cache_hits': sum(1 for record in ok if record['cache'] == 'HIT'),
+        'latency_ms': latency_ms(latencies),
+        'endpoints': per_endpoint,
+        'server': {
+            'peak_rss_bytes': max(rss_values) if rss_values else None,
+            'samples': samples
+        }
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("""
+🔥 HTTP Yük Testi
+
+Kullanım:
+  python load_test.py [--url http://localhost:8000] [--endpoint form,base64,binary,mask]
+                      [--concurrency 1,2,4] [--rate 0.5,1] [--requests 20] [--duration 60]
+                      [--images klasör] [--model ultra] [--positioning smart] [--enhance]
+                      [--allow-cache] [--timeout 300] [--sample-interval 1] [--output rapor.json]
+
+--concurrency listesi kapalı döngü adımlarıdır; --rate verilirse her hız açık döngü
+adımıdır ve eşzamanlılık listedeki en büyük değerle sınırlanır.
+Varsayılan olarak her istek benzersiz piksel içeriği taşır (önbellek atlatılır);
+--allow-cache ile corpus görüntüleri aynen tekrar gönderilir.
+Sunucu RSS'i /metrics'ten okunur.
+        """)
+        return 0
+
+    base_url = DEFAULT_URL
+    endpoints = ['form']
+    concurrencies = [1]
+    rates = None
+    total = 20
+    duration = None
+    images = None
+    params = {'model': 'ultra', 'positioning': 'smart', 'enhance': 'false', 'variants': 'false'}
+    cache_bust = True
+    timeout = 300
+    sample_interval = 1.0
+    output = None
+    while args:
+        arg = args.pop(0)
+        if arg == '--url':
+            base_url = args.pop(0).rstrip('/')
+        elif arg == '--endpoint':
+            endpoints = args.pop(0).split(',')
+        elif arg == '--concurrency':
+            concurrencies = [int(value) for value in args.pop(0).split(',')]
+        elif arg == '--rate':
+            rates = [float(value) for value in args.pop(0).split(',')]
+        elif arg == '--requests':
+            total = int(args.pop(0))
+        elif arg == '--duration':
+            duration = float(args.pop(0))
+        elif arg == '--images':
+            images = args.pop(0)
+        elif arg == '--model':
+            params['model'] = args.pop(0)
+        elif arg == '--positioning':
+            params['positioning'] = args.pop(0)
+        elif arg == '--enhance':
+            params['enhance'] = 'true'
+        elif arg == '--allow-cache':
+            cache_bust = False
+        elif arg == '--timeout':
+            timeout = float(args.pop(0))
+        elif arg == '--sample-interval':
+            sample_interval = float(args.pop(0))
+        elif arg == '--output':
+            output = args.pop(0)
+        else:
+            print(f"❌ Bilinmeyen argüman: {arg}", file=sys.stderr)
+            return 2
+
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        print(f"❌ Bilinmeyen endpoint: {', '.join(sorted(unknown))} (seçenekler: {', '.join(ENDPOINTS)})",
+              file=sys.stderr)
+        return 2
+
+    if rates:
+        steps = [(max(concurrencies), rate) for rate in rates]
+    else:
+        steps = [(concurrency, None) for concurrency in concurrencies]
+
+    print("🖼️  Corpus hazırlanıyor...", file=sys.stderr)
+    corpus = load_corpus(images)
+    baseline = read_server_metrics(base_url)
+    if baseline['rss_bytes'] is None:
+        print(f"⚠️  {base_url}/metrics okunamadı - RSS raporlanmayacak", file=sys.stderr)
+
+    report = {
+        'benchmark': 'load',
+        'generated_at': time.time(),
+        'config': {
+            'url': base_url,
+            'endpoints': endpoints,
+            'params': params,
+            'requests_per_step': total,
+            'duration_per_step': duration,
+            'cache_bust': cache_bust,
+            'corpus': [name for name, _ in corpus]
+        },
+        'baseline_rss_bytes': baseline['rss_bytes'],
+        'steps': []
+    }
+
+    for concurrency, rate in steps:
+        payloads = build_payloads(corpus, total, cache_bust)
+        label = f"hız {rate}/sn" if rate is not None else f"eşzamanlılık {concurrency}"
+        print(f"🔥 Adım: {label}, {total} istek...", file=sys.stderr)
+
+        step = run_step(base_url, payloads, endpoints, params, concurrency, rate, duration,
+                        timeout, sample_interval)
+        report['steps'].append(step)
+
+        latency = step['latency_ms']
+        peak_rss = step['server']['peak_rss_bytes']
+        print(f"📊 {label}: {step['throughput_rps']} istek/sn, p50 {latency['p50']} ms, "
+              f"p95 {latency['p95']} ms, p99 {latency['p99']} ms, hata %{(step['error_rate'] or 0) * 100:.1f}"
+              + (f", tepe RSS {peak_rss / (1024 * 1024):.0f} MB" if peak_rss else ''),
+              file=sys.stderr)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Rapor yazıldı: {output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Maske Önbelleği
+Modelin ürettiği ham alpha maskelerini girdi içeriği + model adına göre saklar.
+Konumlandırma / iyileştirme / varyant seçenekleri değiştiğinde model tekrar
+çalışmaz, sadece son işlem aşamaları yeniden oynatılır.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+class MaskCache:
+    """
+    Disk üzerinde, bellek eşlemeli (memory-mapped) maske önbelleği
+
+    Maskeler tek kanallı uint8 (n, H, W) .npy dizileri olarak saklanır;
+    RGBA PNG'nin yaklaşık dörtte biri boyutundadır ve np.load(mmap_mode='r')
+    ile kopyalamadan açılır. Sıkıştırılmış .npz bellek eşlenemediği için
+    tercih edilmedi.
+    """
+
+    def __init__(self, cache_dir, max_disk_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        # key -> dosya boyutu, en eski kullanılan başta
+        self._index = OrderedDict()
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(img, model_name):
+        """
+        Modelin gördüğü görüntünün piksel içeriği + model adından anahtar üret
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{model_name}|{img.mode}|{img.size[0]}x{img.size[1]}|".encode('utf-8'))
+        digest.update(img.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, key):
+        """
+        Maske listesini (PIL 'L' görüntüleri) döndür, yoksa None
+        """
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+
+        try:
+            stack = np.load(self._path(key), mmap_mode='r', allow_pickle=False)
+            masks = [Image.fromarray(np.ascontiguousarray(stack[i]), mode="L") for i in range(stack.shape[0])]
+        except Exception as e:
+            logger.warning(f"⚠️ Maske önbelleği okunamadı ({key[:12]}): {e}")
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return masks
+
+    def put(self, key, masks):
+        """
+        Maskeleri tek bir (n, H, W) uint8 dizisi olarak kaydet
+        """
+        if not masks:
+            return
+
+        try:
+            stack = np.stack([np.asarray(mask.convert("L"), dtype=np.uint8) for mask in masks])
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, stack, allow_pickle=False)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            logger.warning(f"⚠️ Maske önbelleğe yazılamadı ({key[:12]}): {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            self._forget(key)
+            self._index[key] = size
+            self._total_bytes += size
+            while self._total_bytes > self.max_disk_bytes and len(self._index) > 1:
+                old_key = next(iter(self._index))
+                self._forget(old_key)
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def get_or_predict(self, img, model_name, predict):
+        """
+        Önbellekte varsa maskeleri döndür, yoksa predict(img) ile üret ve sakla
+        """
+        key = self.make_key(img, model_name)
+        masks = self.get(key)
+        if masks is not None:
+            logger.info(f"⚡ Maske önbellekten: {key[:12]} ({model_name})")
+            return masks
+
+        masks = predict(img)
+        self.put(key, masks)
+        return masks
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'entries': len(self._index),
+                'disk_bytes': self._total_bytes
+            }
+
+    def _forget(self, key):
+        # Kilit tutulurken çağrılır
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _load_index(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.npy'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                entries.append((os.path.getmtime(path), filename[:-4], os.path.getsize(path)))
+            except OSError:
+                continue
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
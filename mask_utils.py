@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Maske yardımcıları
+Model maskelerini görüntüye rembg.remove ile aynı şekilde uygular; maske-only
+yanıtlar için birleştirme, boyutlandırma, sınır kutusu ve RLE kodlama;
+model karşılaştırması için IoU ve sınır F-skoru; kademeli çıkarım için
+doğru maske gerektirmeyen güven skoru; zaten kesilmiş girdilerin alfa kontrolü
+"""
+
+import cv2
+import numpy as np
+from PIL import Image, ImageChops, ImageFilter
+
+
+def apply_masks(img, masks):
+    """
+    Maskeleri görüntüye uygula ve RGBA kesim döndür
+    Birden fazla maske (ör. u2net_cloth_seg üst/alt/tam) rembg.remove'daki
+    gibi dikey olarak birleştirilir.
+    """
+    cutouts = []
+    for mask in masks:
+        empty = Image.new("RGBA", img.size, 0)
+        cutouts.append(Image.composite(img, empty, mask))
+
+    if not cutouts:
+        return img.convert("RGBA")
+
+    result = cutouts[0]
+    for cutout in cutouts[1:]:
+        combined = Image.new("RGBA", (result.width, result.height + cutout.height))
+        combined.paste(result, (0, 0))
+        combined.paste(cutout, (0, result.height))
+        result = combined
+
+    return result
+
+
+def combine_masks(masks):
+    """
+    Maskeleri tek alfa kanalında birleştir (piksel bazında maksimum)
+    u2net_cloth_seg gibi çok sınıflı modellerde üst/alt/tam maskelerin birleşimi.
+    """
+    if not masks:
+        return None
+
+    alpha = masks[0].convert("L")
+    for mask in masks[1:]:
+        alpha = ImageChops.lighter(alpha, mask.convert("L"))
+    return alpha
+
+
+def resize_mask(mask, long_edge=None):
+    """
+    Maskeyi uzun kenarı long_edge olacak şekilde en-boy oranını koruyarak boyutlandır
+    """
+    if not long_edge or max(mask.size) == long_edge:
+        return mask
+
+    scale = long_edge / max(mask.size)
+    size = (max(1, round(mask.width * scale)), max(1, round(mask.height * scale)))
+    return mask.resize(size, Image.Resampling.BILINEAR)
+
+
+def mask_bbox(mask, threshold=128):
+    """
+    Eşiğin üstündeki piksellerin sınır kutusu {'x', 'y', 'width', 'height'}, boşsa None
+    """
+    box = mask.point(lambda value: 255 if value >= threshold else 0).getbbox()
+    if box is None:
+        return None
+    left, top, right, bottom = box
+    return {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+
+
+def encode_mask_rle(mask, threshold=128):
+    """
+    İkili maskeyi satır öncelikli (row-major) run-length olarak kodla
+
+    counts sırayla arka plan / ön plan koşu uzunluklarıdır ve her zaman arka
+    planla başlar (maske ön planla başlıyorsa ilk değer 0 olur).
+    """
+    flat = (np.asarray(mask.convert("L")) >= threshold).ravel()
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(bounds).tolist()
+    if flat.size and flat[0]:
+        counts.insert(0, 0)
+
+    return {
+        'size': [mask.width, mask.height],
+        'order': 'row-major',
+        'threshold': threshold,
+        'counts': counts
+    }
+
+
+def mask_iou(mask_a, mask_b, threshold=128):
+    """
+    İki maskenin eşikteki kesişim / birleşim oranı (ikisi de boşsa 1.0)
+    """
+    a = np.asarray(mask_a) >= threshold
+    b = np.asarray(mask_b) >= threshold
+    union = np.logical_or(a, b).sum()
+    if union == 0:
+        return 1.0
+    return float(np.logical_and(a, b).sum() / union)
+
+
+def _mask_boundary(mask, threshold):
+    binary = mask.convert("L").point(lambda value: 255 if value >= threshold else 0)
+    eroded = binary.filter(ImageFilter.MinFilter(3))
+    return ImageChops.difference(binary, eroded)
+
+
+def boundary_f_score(predicted, truth, threshold=128, tolerance=None):
+    """
+    Sınır F-skoru: tahmin ve doğru maskenin kenar pikselleri, tolerans
+    (varsayılan köşegenin %0.75'i) içinde eşleşiyorsa doğru sayılır.
+    IoU'nun büyük iç alanlarda gizlediği kenar hatalarını ölçer.
+    """
+    if predicted.size != truth.size:
+        predicted = predicted.resize(truth.size, Image.Resampling.BILINEAR)
+
+    if tolerance is None:
+        tolerance = max(1, round(0.0075 * (truth.width ** 2 + truth.height ** 2) ** 0.5))
+    window = 2 * tolerance + 1
+
+    predicted_edge = _mask_boundary(predicted, threshold)
+    truth_edge = _mask_boundary(truth, threshold)
+
+    predicted_pixels = np.asarray(predicted_edge) > 0
+    truth_pixels = np.asarray(truth_edge) > 0
+    if not predicted_pixels.any() and not truth_pixels.any():
+        return 1.0
+    if not predicted_pixels.any() or not truth_pixels.any():
+        return 0.0
+
+    truth_near = np.asarray(truth_edge.filter(ImageFilter.MaxFilter(window))) > 0
+    predicted_near = np.asarray(predicted_edge.filter(ImageFilter.MaxFilter(window))) > 0
+
+    precision = np.logical_and(predicted_pixels, truth_near).sum() / predicted_pixels.sum()
+    recall = np.logical_and(truth_pixels, predicted_near).sum() / truth_pixels.sum()
+    if precision + recall == 0:
+        return 0.0
+    return float(2 * precision * recall / (precision + recall))
+
+
+def mask_confidence(mask, low=32, high=224, size=320):
+    """
+    Doğru maske olmadan maskenin güvenilirliği
+    Ölçekten bağımsız olsun diye uzun kenarı size px'e indirilmiş maskede ölçülür
+    (hafif modellerin kendi çıktı çözünürlüğü).
+
+    uncertain_fraction: nesne alanına göre kararsız alfa (low-high arası) oranı
+    edge_sharpness: nesne sınırındaki ortalama gradyanın keskin kenara oranı (0-1)
+    largest_component_share: en büyük bağlı parçanın ön plandaki payı (parçalanma)
+    score: üçünün çarpımı (0-1); boş maske 0 alır
+    """
+    mask = mask.convert("L")
+    if size and max(mask.size) > size:
+        mask = resize_mask(mask, size)
+    alpha = np.asarray(mask)
+    foreground = (alpha >= 128).astype(np.uint8)
+    foreground_pixels = int(foreground.sum())
+    if foreground_pixels == 0:
+        return {'score': 0.0, 'uncertain_fraction': 1.0, 'edge_sharpness': 0.0,
+                'largest_component_share': 0.0, 'components': 0}
+
+    uncertain = int(np.count_nonzero((alpha > low) & (alpha < high)))
+    uncertain_fraction = min(1.0, uncertain / foreground_pixels)
+
+    # Sobel 3x3 ile 0->255 basamak kenarın gradyanı 4 * 255
+    grad_x = cv2.Sobel(alpha, cv2.CV_32F, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(alpha, cv2.CV_32F, 0, 1, ksize=3)
+    boundary = cv2.morphologyEx(foreground, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8)) > 0
+    edge_sharpness = min(1.0, float(np.hypot(grad_x, grad_y)[boundary].mean()) / 1020) if boundary.any() else 0.0
+
+    components, _, stats, _ = cv2.connectedComponentsWithStats(foreground, connectivity=8)
+    # 0. etiket arka plan
+    largest_component_share = float(stats[1:, cv2.CC_STAT_AREA].max()) / foreground_pixels
+
+    return {
+        'score': (1 - uncertain_fraction) * edge_sharpness * largest_component_share,
+        'uncertain_fraction': uncertain_fraction,
+        'edge_sharpness': edge_sharpness,
+        'largest_component_share': largest_component_share,
+        'components': components - 1
+    }
+
+
+def usable_alpha(img, min_foreground=0.02, max_foreground=0.95, size=320):
+    """
+    Girdinin alfa kanalı anlamlı bir ön plan maskesiyse 'L' maske, değilse None
+    Alfa kanalı olmayan, tamamen opak (veya neredeyse tamamen opak / saydam)
+    görüntüler reddedilir; ön plan oranı uzun kenarı size px'e indirilmiş maskede ölçülür.
+    """
+    if img.mode == "P" and "transparency" in img.info:
+        img = img.convert("RGBA")
+    if "A" not in img.getbands():
+        return None
+
+    alpha = img.getchannel("A")
+    lowest, _ = alpha.getextrema()
+    if lowest == 255:
+        return None
+
+    small = resize_mask(alpha, size) if size and max(alpha.size) > size else alpha
+    foreground = float(np.mean(np.asarray(small) >= 128))
+    if not min_foreground <= foreground <= max_foreground:
+        return None
+    return alpha
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrikleri
+Harici bağımlılık olmadan Counter / Gauge / Histogram ve Prometheus metin
+formatında (text exposition 0.0.4) çıktı. Değerler süreç içinde tutulur;
+gunicorn tek worker ile çalıştığı için /metrics tüm istekleri görür.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Saniye cinsinden varsayılan kovalar - ms'lik aşamalardan dakikalık işlere kadar
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        if math.isnan(value):
+            return 'NaN'
+        return repr(value)
+    return str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etiketler {self.labelnames} olmalı, verilen {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        return []
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    Anlık değer
+    collect verilirse değer her okunuşta hesaplanır: collect() tek bir sayı
+    (etiketsiz) veya {etiket değerleri tuple'ı: sayı} döner.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), collect=None):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+        self._values = {}
+
+    def set(self, value, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        if self.collect is not None:
+            try:
+                collected = self.collect()
+            except Exception:
+                return []
+            if collected is None:
+                return []
+            items = sorted(collected.items()) if isinstance(collected, dict) else [((), collected)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+            if value is not None
+        ]
+
+
+class Histogram(_Metric):
+    """Kümülatif kovalı dağılım (_bucket / _sum / _count)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etiketler -> [kova sayıları..., toplam, adet]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+
+        lines = []
+        bucket_names = self.labelnames + ('le',)
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, key + (_format_value(float(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_names, key + ('+Inf',))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    """Kayıtlı metrikler, eklenme sırasıyla render edilir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=(), collect=None):
+        return self.register(Gauge(name, help_text, labelnames, collect))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Pipeline aşamaları - decode/encode API'de, diğerleri remover'larda ölçülür
+STAGES = ('decode', 'preprocess', 'inference', 'positioning', 'enhance', 'variants', 'encode')
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'clothing_stage_duration_seconds',
+    'Pipeline aşama süreleri (saniye)',
+    ('stage', 'model')
+)
+
+
+def observe_stage(stage, seconds, model=''):
+    STAGE_SECONDS.observe(seconds, stage=stage, model=model)
+
+
+@contextmanager
+def stage_timer(stage, model='', timings=None):
+    """
+    Bloğun süresini aşama histogramına yaz
+    timings (StageTimings) verilirse isteğin kendi dökümüne de eklenir.
+
+        with stage_timer('inference', model='u2net', timings=timings):
+            ...
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        wall_seconds = time.perf_counter() - wall_start
+        STAGE_SECONDS.observe(wall_seconds, stage=stage, model=model)
+        if timings is not None:
+            timings.add(stage, wall_seconds, time.process_time() - cpu_start)
+
+
+class StageClock:
+    """
+    stage_timer gibi, ama histogramın model etiketi blok bittikten sonra belli
+    olur (ör. ön işleme sonrası stüdyo yolu mu model mi çalıştığı)
+
+        with StageClock('preprocess', timings) as clock:
+            ...
+        clock.observe(served_model)
+    """
+
+    def __init__(self, stage, timings=None):
+        self.stage = stage
+        self.timings = timings
+        self.wall_seconds = None
+
+    def __enter__(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        if self.timings is not None:
+            self.timings.add(self.stage, self.wall_seconds, time.process_time() - self._cpu_start)
+        return False
+
+    def observe(self, model=''):
+        if self.wall_seconds is not None:
+            STAGE_SECONDS.observe(self.wall_seconds, stage=self.stage, model=model)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Model Kalite/Gecikme Matrisi
+Kurulu her modeli etiketli kıyafet corpus'unda (doğru maskeli) çalıştırır;
+maske IoU'su, sınır F-skoru, CPU gecikmesi ve tepe RSS'i ölçer ve sonucu bu
+makine şekli için model profiline yazar. UltraClothingBgRemover model
+seçiminde elle girilmiş skorlar yerine bu ölçümleri kullanır.
+
+--cascade ile kademeli mod için hafif modelin güven eşiği aynı corpus'ta
+kalibre edilir: ağır modele göre IoU kaybı sınırı aşmadan hafif modelin en
+çok isteği sunduğu eşik profile yazılır.
+"""
+
+import gc
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+from benchmark_stages import RssSampler
+from mask_utils import boundary_f_score, combine_masks, mask_confidence, mask_iou
+from model_discovery import known_model_names, local_files_ok, model_profile_path, read_model_profile
+from onnx_tuning import create_session, machine_shape, profile_key
+from session_pool import current_rss_bytes
+from synthetic_images import make_corpus
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Kademeli mod kalibrasyonu: ağır modele göre kabul edilen ortalama IoU kaybı
+DEFAULT_MAX_IOU_LOSS = 0.01
+
+# Güven skoru en fazla 1.0 - bu eşikte hafif model hiç sunmaz
+NEVER_LIGHT_THRESHOLD = 1.01
+
+
+def installed_models():
+    """
+    Dosyaları yerelde olan ve rembg'nin tanıdığı modeller
+    """
+    known = known_model_names() or set()
+    return sorted(model_name for model_name in known if local_files_ok(model_name))
+
+
+def load_labeled_corpus(directory):
+    """
+    Etiketli corpus klasörü: images/<ad>.<uzantı> ve masks/<ad>.png (aynı ad)
+    Dönüş: [(isim, RGB görüntü, 'L' maske), ...]
+    """
+    images_dir = os.path.join(directory, 'images')
+    masks_dir = os.path.join(directory, 'masks')
+    masks = {os.path.splitext(name)[0]: os.path.join(masks_dir, name) for name in os.listdir(masks_dir)}
+
+    corpus = []
+    for name in sorted(os.listdir(images_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        if stem not in masks:
+            print(f"⚠️ {name} için maske yok, atlandı", file=sys.stderr)
+            continue
+        img = Image.open(os.path.join(images_dir, name)).convert("RGB")
+        truth = Image.open(masks[stem]).convert("L")
+        corpus.append((stem, img, truth))
+    return corpus
+
+
+def evaluate_model(model_name, corpus, runs=3):
+    """
+    Modeli corpus'ta ölç: ortalama IoU ve sınır F-skoru, medyan gecikme, tepe RSS
+    """
+    gc.collect()
+    baseline_rss = current_rss_bytes()
+
+    with RssSampler(interval=0.01) as sampler:
+        session = create_session(model_name)
+        # Isınma - ilk çalıştırmanın bellek ayırma maliyeti gecikmeye girmesin
+        session.predict(corpus[0][1])
+
+        ious, boundary_fs, latencies = [], [], []
+        for name, img, truth in corpus:
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                masks = session.predict(img)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            predicted = combine_masks(masks)
+            if predicted.size != truth.size:
+                predicted = predicted.resize(truth.size, Image.Resampling.BILINEAR)
+            ious.append(mask_iou(predicted, truth))
+            boundary_fs.append(boundary_f_score(predicted, truth))
+            latencies.append(statistics.median(timings))
+            print(f"   {name}: IoU {ious[-1]:.4f}, sınır F {boundary_fs[-1]:.4f}, {latencies[-1]:.0f} ms",
+                  file=sys.stderr)
+
+    del session
+    gc.collect()
+
+    return {
+        'images': len(corpus),
+        'iou': round(statistics.mean(ious), 4),
+        'min_iou': round(min(ious), 4),
+        'boundary_f': round(statistics.mean(boundary_fs), 4),
+        'latency_ms': round(statistics.median(latencies), 1),
+        'max_latency_ms': round(max(latencies), 1),
+        'peak_rss_bytes': sampler.peak,
+        'peak_rss_delta_bytes': (max(0, sampler.peak - baseline_rss)
+                                 if baseline_rss is not None and sampler.peak is not None else None)
+    }
+
+
+def predict_corpus(model_name, corpus):
+    """
+    Her görüntü için (birleşik maske, gecikme ms) - ısınma çalıştırması ölçülmez
+    """
+    session = create_session(model_name)
+    session.predict(corpus[0][1])
+
+    predictions = []
+    for _, img, truth in corpus:
+        start = time.perf_counter()
+        mask = combine_masks(session.predict(img))
+        latency_ms = (time.perf_counter() - start) * 1000
+        if mask.size != truth.size:
+            mask = mask.resize(truth.size, Image.Resampling.BILINEAR)
+        predictions.append((mask, latency_ms))
+    return predictions
+
+
+def calibrate_cascade(light_model, heavy_model, corpus, max_iou_loss=DEFAULT_MAX_IOU_LOSS):
+    """
+    Kademeli mod güven eşiğini ölç
+    Her aday eşik için hafif modelin sunduğu pay, kademeli çıktının ortalama
+    IoU'su ve ortalama gecikmesi hesaplanır; IoU'su ağır modelden en fazla
+    max_iou_loss düşük olan en küçük eşik (en çok hafif sunum) seçilir.
+    """
+    light = predict_corpus(light_model, corpus)
+    heavy = predict_corpus(heavy_model, corpus)
+
+    samples = []
+    for (name, _, truth), (light_mask, light_ms), (heavy_mask, heavy_ms) in zip(corpus, light, heavy):
+        samples.append({
+            'name': name,
+            'confidence': mask_confidence(light_mask)['score'],
+            'light_iou': mask_iou(light_mask, truth),
+            'heavy_iou': mask_iou(heavy_mask, truth),
+            'light_ms': light_ms,
+            'heavy_ms': heavy_ms
+        })
+        print(f"   {name}: güven {samples[-1]['confidence']:.3f}, IoU hafif {samples[-1]['light_iou']:.4f} "
+              f"/ ağır {samples[-1]['heavy_iou']:.4f}", file=sys.stderr)
+
+    heavy_iou = statistics.mean(sample['heavy_iou'] for sample in samples)
+    heavy_latency = statistics.mean(sample['heavy_ms'] for sample in samples)
+
+    points = []
+    for threshold in sorted({sample['confidence'] for sample in samples}) + [NEVER_LIGHT_THRESHOLD]:
+        # Aşağı yuvarla - yuvarlanmış eşik de aynı örnekleri hafife bıraksın
+        threshold = math.floor(threshold * 10000) / 10000
+        served_light = [sample['confidence'] >= threshold for sample in samples]
+        points.append({
+            'threshold': threshold,
+            'light_share': round(sum(served_light) / len(samples), 4),
+            'iou': round(statistics.mean(
+                sample['light_iou'] if is_light else sample['heavy_iou']
+                for sample, is_light in zip(samples, served_light)
+            ), 4),
+            # Ağıra düşen istekler hafif modeli de çalıştırmış olur
+            'latency_ms': round(statistics.mean(
+                sample['light_ms'] + (0 if is_light else sample['heavy_ms'])
+                for sample, is_light in zip(samples, served_light)
+            ), 1)
+        })
+
+    chosen = next(point for point in points if point['iou'] >= heavy_iou - max_iou_loss)
+    return {
+        'light_model': light_model,
+        'heavy_model': heavy_model,
+        'threshold': chosen['threshold'],
+        'light_share': chosen['light_share'],
+        'iou': chosen['iou'],
+        'latency_ms': chosen['latency_ms'],
+        'heavy_iou': round(heavy_iou, 4),
+        'heavy_latency_ms': round(heavy_latency, 1),
+        'max_iou_loss': max_iou_loss,
+        'images': len(samples),
+        'points': points
+    }
+
+
+def save_model_profile(profile, path=None):
+    path = path or model_profile_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("""
+📐 Model Kalite/Gecikme Matrisi
+
+Kullanım:
+  python model_benchmark.py [--corpus klasör] [--runs 3] [--sizes 512,1024] [model ...]
+  python model_benchmark.py --cascade [--max-iou-loss 0.01] [--corpus klasör] [hafif ağır]
+
+Model verilmezse yerelde dosyası olan tüm modeller ölçülür.
+--corpus klasöründe images/ ve masks/ alt klasörleri aynı dosya adlarıyla eşleşir;
+verilmezse doğru maskeli sentetik kıyafet corpus'u kullanılır.
+Profil: ~/.u2net/model_profile.json (MODEL_PROFILE ile değiştirilebilir)
+Model seçimi MODEL_LATENCY_BUDGET_MS bütçesiyle bu profili kullanır.
+--cascade modelleri verilmezse sunucunun seçtiği model ve ilk yerel hafif model kullanılır;
+ölçülen eşik CASCADE_MODE=1 iken CASCADE_CONFIDENCE_THRESHOLD verilmemişse kullanılır.
+        """)
+        return 0
+
+    corpus_dir = None
+    runs = 3
+    sizes = (512, 1024)
+    cascade = False
+    max_iou_loss = DEFAULT_MAX_IOU_LOSS
+    models = []
+    while args:
+        arg = args.pop(0)
+        if arg == '--cascade':
+            cascade = True
+        elif arg == '--max-iou-loss':
+            max_iou_loss = float(args.pop(0))
+        elif arg == '--corpus':
+            corpus_dir = args.pop(0)
+        elif arg == '--runs':
+            runs = int(args.pop(0))
+        elif arg == '--sizes':
+            sizes = tuple(int(size) for size in args.pop(0).split(','))
+        elif arg.startswith('--'):
+            print(f"❌ Bilinmeyen argüman: {arg}", file=sys.stderr)
+            return 2
+        else:
+            models.append(arg)
+
+    corpus = load_labeled_corpus(corpus_dir) if corpus_dir else make_corpus(sizes=sizes, seeds=(0, 1, 2))
+    if not corpus:
+        print("❌ Corpus boş", file=sys.stderr)
+        return 1
+
+    shape = machine_shape()
+    profile = read_model_profile()
+
+    if cascade:
+        return run_cascade_calibration(models, corpus, corpus_dir, max_iou_loss, profile, shape)
+
+    models = models or installed_models()
+    if not models:
+        print("❌ Ölçülecek model yok (önce preload_models.py)", file=sys.stderr)
+        return 1
+
+    profile.setdefault('models', {})
+
+    failures = 0
+    for model_name in models:
+        print(f"📐 {model_name} ölçülüyor ({len(corpus)} görüntü, {shape})...", file=sys.stderr)
+        try:
+            result = evaluate_model(model_name, corpus, runs=runs)
+        except Exception as e:
+            print(f"❌ {model_name} ölçülemedi: {str(e)}", file=sys.stderr)
+            failures += 1
+            continue
+
+        result['corpus'] = corpus_dir or 'synthetic'
+        result['measured_at'] = time.time()
+        profile['models'][profile_key(model_name, shape)] = result
+        print(f"📊 {model_name}: IoU {result['iou']:.4f}, sınır F {result['boundary_f']:.4f}, "
+              f"{result['latency_ms']} ms, tepe RSS {(result['peak_rss_bytes'] or 0) / (1024 * 1024):.0f} MB",
+              file=sys.stderr)
+
+    save_model_profile(profile)
+    print(f"💾 Profil yazıldı: {model_profile_path()}", file=sys.stderr)
+
+    return 1 if failures == len(models) else 0
+
+
+def run_cascade_calibration(models, corpus, corpus_dir, max_iou_loss, profile, shape):
+    if len(models) == 2:
+        light_model, heavy_model = models
+    elif not models:
+        from ultra_clothing_bg_remover import UltraClothingBgRemover
+        remover = UltraClothingBgRemover()
+        light_model, heavy_model = remover.light_model, remover.best_model
+    else:
+        print("❌ --cascade için hafif ve ağır model birlikte verilmeli", file=sys.stderr)
+        return 2
+
+    if not light_model or light_model == heavy_model:
+        print("❌ Hafif model yok (ör. u2netp için preload_models.py)", file=sys.stderr)
+        return 1
+
+    print(f"🪜 Kademeli mod kalibrasyonu: {light_model} -> {heavy_model} ({len(corpus)} görüntü, {shape})...",
+          file=sys.stderr)
+    try:
+        result = calibrate_cascade(light_model, heavy_model, corpus, max_iou_loss)
+    except Exception as e:
+        print(f"❌ Kalibrasyon başarısız: {str(e)}", file=sys.stderr)
+        return 1
+
+    result['corpus'] = corpus_dir or 'synthetic'
+    result['measured_at'] = time.time()
+    profile.setdefault('cascade', {})[profile_key(f"{light_model}>{heavy_model}", shape)] = result
+    print(f"📊 Eşik {result['threshold']}: hafif pay %{result['light_share'] * 100:.0f}, "
+          f"IoU {result['iou']:.4f} (ağır {result['heavy_iou']:.4f}), "
+          f"{result['latency_ms']} ms (ağır {result['heavy_latency_ms']} ms)", file=sys.stderr)
+
+    save_model_profile(profile)
+    print(f"💾 Profil yazıldı: {model_profile_path()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
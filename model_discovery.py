@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Hızlı Model Keşfi
+Adayları yüklemeden önce yerel model dosyalarını ve bütünlük bilgisini kontrol
+eder, sadece kazananı yükler ve seçimi diske yazar; sonraki soğuk açılışlar
+keşfi tamamen atlar.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import traceback
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+# Bu boyutun altındaki .onnx dosyaları yarım indirilmiş sayılır
+MIN_MODEL_BYTES = 1024 * 1024
+
+# Dosya adı model adından farklı olan modeller
+MODEL_FILES = {
+    'sam': ['vit_b-encoder-quant.onnx', 'vit_b-decoder-quant.onnx'],
+}
+
+# Desteklenen hassasiyetler; int8 dosyaları quantize_models.py üretir
+PRECISIONS = ('fp32', 'int8')
+QUANTIZED_SUFFIX = '.int8.onnx'
+
+# Bu süreçte sha256'sı doğrulanmış dosyalar: yol -> (boyut, mtime)
+_verified_files = {}
+
+
+def model_home():
+    """
+    rembg model klasörü (U2NET_HOME / XDG_DATA_HOME / ~/.u2net)
+    """
+    return os.path.expanduser(
+        os.getenv("U2NET_HOME", os.path.join(os.getenv("XDG_DATA_HOME", "~"), ".u2net"))
+    )
+
+
+def model_files(model_name, precision='fp32'):
+    """
+    Modelin yerel .onnx dosya yolları
+    """
+    names = MODEL_FILES.get(model_name, [f"{model_name}.onnx"])
+    if precision == 'int8':
+        names = [name[:-len('.onnx')] + QUANTIZED_SUFFIX for name in names]
+    return [os.path.join(model_home(), name) for name in names]
+
+
+def session_key(model_name, precision='fp32'):
+    """
+    Havuz/önbellek anahtarı - fp32 için model adı, diğerleri için 'model@int8'
+    """
+    return model_name if precision == 'fp32' else f"{model_name}@{precision}"
+
+
+def known_model_names():
+    """
+    Kurulu rembg sürümünün tanıdığı modeller, öğrenilemezse None
+    """
+    try:
+        from rembg.sessions import sessions_names
+        return set(sessions_names)
+    except Exception:
+        return None
+
+
+def default_cache_path():
+    return os.environ.get('MODEL_SELECTION_CACHE', os.path.join(model_home(), 'model_selection.json'))
+
+
+def file_fingerprint(path, with_hash=False):
+    """
+    Dosyanın boyut + mtime (ve istenirse sha256) bilgisi
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def local_files_ok(model_name, precision='fp32'):
+    """
+    Modelin tüm dosyaları yerelde ve makul boyutta mı?
+    """
+    for path in model_files(model_name, precision):
+        try:
+            if os.path.getsize(path) < MIN_MODEL_BYTES:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def quantization_report_path():
+    return os.environ.get('QUANTIZATION_REPORT', os.path.join(model_home(), 'quantization_report.json'))
+
+
+def read_quantization_report(path=None):
+    try:
+        with open(path or quantization_report_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def model_profile_path():
+    return os.environ.get('MODEL_PROFILE', os.path.join(model_home(), 'model_profile.json'))
+
+
+def read_model_profile(path=None):
+    """
+    model_benchmark.py'nin ölçtüğü kalite/gecikme profili
+    Biçim: {'models': {'<model>@<makine şekli>': {'iou', 'boundary_f', 'latency_ms', ...}}}
+    """
+    try:
+        with open(path or model_profile_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def measured_score(entry, latency_budget_ms=None):
+    """
+    Ölçülmüş profil girdisinden 0-100 arası skor
+
+    Kalite, IoU ile sınır F-skorunun ortalamasıdır. Gecikme bütçesini aşan
+    modellerin skoru aşım oranında düşer; bütçe içindekiler sadece kaliteyle sıralanır.
+    """
+    quality = (entry['iou'] + entry['boundary_f']) / 2
+    speed_factor = 1.0
+    if latency_budget_ms and entry.get('latency_ms'):
+        speed_factor = min(1.0, latency_budget_ms / entry['latency_ms'])
+    return quality * 100 * speed_factor
+
+
+def resolve_precision(model_name, precision):
+    """
+    İstenen hassasiyet bu model için kullanılabilir mi? Değilse 'fp32'
+
+    int8 için nicelenmiş dosya yerelde olmalı ve quantize_models.py raporunda
+    kalite kaybı kabul edilmiş (accepted) olmalı.
+    """
+    if precision in (None, 'fp32'):
+        return 'fp32'
+    if precision not in PRECISIONS:
+        logger.warning(f"⚠️ Bilinmeyen hassasiyet '{precision}', fp32 kullanılıyor")
+        return 'fp32'
+
+    if not local_files_ok(model_name, precision):
+        logger.info(f"ℹ️ {model_name} için {precision} dosyası yok, fp32 kullanılıyor")
+        return 'fp32'
+
+    entry = read_quantization_report().get('models', {}).get(model_name, {}).get(precision)
+    if not entry or not entry.get('accepted'):
+        logger.warning(f"⚠️ {model_name} {precision} ölçülmemiş veya kalite kaybı kabul edilemez, fp32 kullanılıyor")
+        return 'fp32'
+
+    return precision
+
+
+def read_cached_selection(candidates, cache_path):
+    """
+    Diskteki seçim geçerliyse model adını döndür
+    Aday listesi değişmişse veya model dosyaları değişmişse (fingerprint_matches) geçersizdir.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except Exception:
+        return None
+
+    if cached.get('candidates') != list(candidates):
+        return None
+
+    model_name = cached.get('model')
+    files = cached.get('files', {})
+    try:
+        for path in model_files(model_name):
+            if not fingerprint_matches(path, files[path]):
+                return None
+    except Exception:
+        return None
+
+    return model_name
+
+
+def fingerprint_matches(path, expected):
+    """
+    Dosya kayıtlı parmak iziyle eşleşiyor mu?
+    Boyut farklıysa hash'e gerek kalmadan eşleşmez. sha256 kayıtlıysa dosya
+    süreç başına bir kez (ve boyut/mtime her değiştiğinde) hash'lenir; aynı
+    boyutta değiştirilip mtime'ı geri alınmış dosyalar da böylece yakalanır.
+    """
+    current = file_fingerprint(path)
+    if current['size'] != expected['size']:
+        return False
+    if 'sha256' not in expected:
+        return current['mtime'] == expected['mtime']
+    if _verified_files.get(path) == (current['size'], current['mtime']):
+        return True
+
+    if file_fingerprint(path, with_hash=True)['sha256'] != expected['sha256']:
+        logger.warning(f"⚠️ Model dosyası değişmiş (sha256 uyuşmuyor): {path}")
+        return False
+    _verified_files[path] = (current['size'], current['mtime'])
+    return True
+
+
+def write_cached_selection(model_name, candidates, cache_path):
+    try:
+        selection = {
+            'model': model_name,
+            'candidates': list(candidates),
+            'files': {path: file_fingerprint(path, with_hash=True) for path in model_files(model_name)},
+            'selected_at': time.time()
+        }
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(selection, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"⚠️ Model seçimi kaydedilemedi: {e}")
+
+
+def select_model(candidates, load, cache_path=None):
+    """
+    Öncelik sırasındaki adaylardan çalışan ilk modeli seç
+
+    load(model_name) modeli yükler, başarısızsa exception fırlatır.
+    Sıra: diskteki seçim -> yerelde dosyası olan adaylar -> indirme gerektirenler.
+    Hiçbiri yüklenemezse None döner.
+    """
+    cache_path = cache_path or default_cache_path()
+    candidates = list(candidates)
+
+    cached_model = read_cached_selection(candidates, cache_path)
+    if cached_model:
+        try:
+            load(cached_model)
+            logger.info(f"⚡ Önbellekteki model seçimi kullanıldı: {cached_model}")
+            return cached_model
+        except Exception as e:
+            logger.warning(f"⚠️ Önbellekteki model yüklenemedi ({cached_model}): {e}")
+
+    known = known_model_names()
+    usable = [m for m in candidates if known is None or m in known]
+    for model_name in candidates:
+        if model_name not in usable:
+            logger.info(f"⏭️ {model_name} bu rembg sürümünde yok, atlandı")
+
+    local = [m for m in usable if local_files_ok(m)]
+    remote = [m for m in usable if m not in local]
+    logger.info(f"🔍 Yerel modeller: {local or '-'}, indirme gerektiren: {remote or '-'}")
+
+    for model_name in local + remote:
+        try:
+            logger.info(f"🧪 Yükleniyor: {model_name}")
+            load(model_name)
+        except Exception as e:
+            logger.warning(f"❌ {model_name} yüklenemedi: {e}")
+            logger.debug(traceback.format_exc())
+            continue
+
+        write_cached_selection(model_name, candidates, cache_path)
+        return model_name
+
+    return None
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime Ayarları ve Otomatik Ayarlayıcı
+Thread sayıları, graf optimizasyon seviyesi ve çalıştırma modu ortam
+değişkenleri veya makine şekline göre ölçülmüş profil üzerinden ayarlanır.
+"""
+
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+import onnxruntime as ort
+from rembg import new_session
+
+from model_discovery import model_files, model_home, session_key
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+GRAPH_OPT_LEVELS = {
+    'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+    'parallel': ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def available_cpus():
+    """
+    Kullanılabilir CPU sayısı - cgroup kotası (Cloud Run) ve affinity dikkate alınır
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max', 'r') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except Exception:
+        pass
+
+    return cpus
+
+
+def machine_shape():
+    """Profil anahtarı için makine şekli, ör. '2cpu'"""
+    return f"{available_cpus()}cpu"
+
+
+def default_profile_path():
+    return os.environ.get('ORT_TUNING_PROFILE', os.path.join(model_home(), 'onnx_tuning.json'))
+
+
+def load_profile(path=None):
+    try:
+        with open(path or default_profile_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_profile(profile, path=None):
+    path = path or default_profile_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def profile_key(model_name, shape=None):
+    return f"{model_name}@{shape or machine_shape()}"
+
+
+def env_overrides():
+    """
+    ORT_INTRA_OP_THREADS, ORT_INTER_OP_THREADS, ORT_GRAPH_OPT_LEVEL,
+    ORT_EXECUTION_MODE ortam değişkenleri
+    """
+    overrides = {}
+    if os.environ.get('ORT_INTRA_OP_THREADS'):
+        overrides['intra_op_threads'] = int(os.environ['ORT_INTRA_OP_THREADS'])
+    if os.environ.get('ORT_INTER_OP_THREADS'):
+        overrides['inter_op_threads'] = int(os.environ['ORT_INTER_OP_THREADS'])
+    if os.environ.get('ORT_GRAPH_OPT_LEVEL'):
+        overrides['graph_opt_level'] = os.environ['ORT_GRAPH_OPT_LEVEL']
+    if os.environ.get('ORT_EXECUTION_MODE'):
+        overrides['execution_mode'] = os.environ['ORT_EXECUTION_MODE']
+    return overrides
+
+
+def session_config(model_name):
+    """
+    Model için geçerli ayarlar: ortam değişkenleri > ölçülmüş profil > rembg varsayılanı
+    """
+    config = dict(load_profile().get(profile_key(model_name), {}).get('config', {}))
+    config.update(env_overrides())
+    return config
+
+
+def build_session_options(config):
+    """
+    Ayar dict'inden ort.SessionOptions üret
+    """
+    sess_opts = ort.SessionOptions()
+
+    # rembg'nin OMP_NUM_THREADS davranışı korunur
+    if "OMP_NUM_THREADS" in os.environ:
+        threads = int(os.environ["OMP_NUM_THREADS"])
+        sess_opts.inter_op_num_threads = threads
+        sess_opts.intra_op_num_threads = threads
+
+    if config.get('intra_op_threads') is not None:
+        sess_opts.intra_op_num_threads = int(config['intra_op_threads'])
+    if config.get('inter_op_threads') is not None:
+        sess_opts.inter_op_num_threads = int(config['inter_op_threads'])
+    if config.get('graph_opt_level') in GRAPH_OPT_LEVELS:
+        sess_opts.graph_optimization_level = GRAPH_OPT_LEVELS[config['graph_opt_level']]
+    if config.get('execution_mode') in EXECUTION_MODES:
+        sess_opts.execution_mode = EXECUTION_MODES[config['execution_mode']]
+
+    return sess_opts
+
+
+def find_session_class(model_name):
+    """
+    Model adına karşılık gelen rembg session sınıfı, bulunamazsa None
+    """
+    try:
+        from rembg.sessions import sessions_class
+    except ImportError:
+        return None
+
+    for session_class in sessions_class:
+        if session_class.name() == model_name:
+            return session_class
+
+    raise ValueError(f"Bilinmeyen model: {model_name}")
+
+
+def create_session(model_name, config=None, precision='fp32'):
+    """
+    Ayarlı rembg session'ı oluştur
+    ORT_AUTOTUNE=1 ise ve makine şekli için profil yoksa önce ayarlayıcı çalışır.
+    precision='int8' ise quantize_models.py'nin ürettiği model dosyası yüklenir.
+    """
+    key = session_key(model_name, precision)
+    if config is None:
+        if os.environ.get('ORT_AUTOTUNE') == '1' and profile_key(key) not in load_profile():
+            autotune(model_name, precision=precision)
+        config = session_config(key)
+
+    if precision != 'fp32':
+        return create_quantized_session(model_name, precision, config)
+
+    if not config:
+        return new_session(model_name)
+
+    session_class = find_session_class(model_name)
+    if session_class is None:
+        logger.warning("⚠️ rembg sürümü session ayarlarını desteklemiyor, varsayılan kullanılıyor")
+        return new_session(model_name)
+
+    logger.info(f"⚙️ ONNX ayarları ({model_name}): {config}")
+    return session_class(model_name, build_session_options(config))
+
+
+def create_quantized_session(model_name, precision, config):
+    """
+    Nicelenmiş model dosyasıyla rembg session'ı oluştur
+    FP32 modeli hiç yüklenmez; session sınıfının predict/normalize mantığı aynen kullanılır.
+    """
+    session_class = find_session_class(model_name)
+    if session_class is None:
+        raise RuntimeError("rembg sürümü nicelenmiş session'ları desteklemiyor")
+
+    paths = model_files(model_name, precision)
+    if len(paths) != 1:
+        raise ValueError(f"{model_name} için {precision} desteklenmiyor")
+
+    logger.info(f"⚙️ {precision} session ({model_name}): {config or 'varsayılan'}")
+    quantized_class = quantized_session_class(session_class, model_name, precision, paths[0])
+    # INT8 çekirdekleri CPU için; GPU'da FP32 modeli kullanılmalı
+    return quantized_class(model_name, build_session_options(config), providers=['CPUExecutionProvider'])
+
+
+def quantized_session_class(session_class, model_name, precision, path):
+    """
+    Modelin session sınıfından türeyen, indirme yerine yerel nicelenmiş
+    dosyayı döndüren alt sınıf
+    """
+
+    class QuantizedSession(session_class):
+        @classmethod
+        def download_models(cls, *args, **kwargs):
+            return path
+
+        @classmethod
+        def name(cls, *args, **kwargs):
+            return session_key(model_name, precision)
+
+    QuantizedSession.__name__ = f"{session_class.__name__}{precision.capitalize()}"
+    return QuantizedSession
+
+
+def candidate_configs(cpus=None):
+    """
+    Denenecek ayar kombinasyonları
+    """
+    cpus = cpus or available_cpus()
+    intra_options = sorted({1, max(1, cpus // 2), cpus})
+    inter_options = sorted({1, min(2, cpus)})
+
+    configs = []
+    for intra, inter, mode, graph in itertools.product(
+            intra_options, inter_options, ('sequential', 'parallel'), ('extended', 'all')):
+        # Sıralı modda inter-op thread sayısının etkisi yok
+        if mode == 'sequential' and inter != 1:
+            continue
+        configs.append({
+            'intra_op_threads': intra,
+            'inter_op_threads': inter,
+            'execution_mode': mode,
+            'graph_opt_level': graph
+        })
+    return configs
+
+
+def benchmark_config(model_name, config, img, runs=5, warmup=1, precision='fp32'):
+    """
+    Bir ayarın medyan çıkarım süresini (ms) ölç
+    """
+    session = create_session(model_name, config, precision)
+    for _ in range(warmup):
+        session.predict(img)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        session.predict(img)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def autotune(model_name, runs=5, profile_path=None, shape=None, precision='fp32'):
+    """
+    Ayar adaylarını sentetik kıyafet görüntüsünde ölç, en hızlısını profile yaz
+    """
+    from synthetic_images import make_garment_image
+
+    shape = shape or machine_shape()
+    cpus = int(shape.rstrip('cpu'))
+    img, _ = make_garment_image(1024, seed=0)
+
+    key = session_key(model_name, precision)
+    logger.info(f"⏱️ ONNX ayarlayıcı başladı: {key} @ {shape}")
+    results = []
+    for config in candidate_configs(cpus):
+        try:
+            latency = benchmark_config(model_name, config, img, runs=runs, precision=precision)
+        except Exception as e:
+            logger.warning(f"⚠️ Ayar denenemedi {config}: {e}")
+            continue
+        logger.info(f"   {config} -> {latency:.1f} ms")
+        results.append((latency, config))
+
+    if not results:
+        logger.error(f"❌ {key} için hiçbir ayar çalışmadı")
+        return None
+
+    latency, config = min(results, key=lambda r: r[0])
+    profile = load_profile(profile_path)
+    profile[profile_key(key, shape)] = {
+        'config': config,
+        'latency_ms': round(latency, 2),
+        'candidates': len(results),
+        'tuned_at': time.time()
+    }
+    save_profile(profile, profile_path)
+    logger.info(f"✅ En hızlı ayar ({key} @ {shape}): {config} -> {latency:.1f} ms")
+    return config
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != '--tune':
+        print("""
+⚙️ ONNX Runtime Otomatik Ayarlayıcı
+
+Kullanım:
+  python onnx_tuning.py --tune <model>[@int8] [<model>[@int8] ...]
+  python onnx_tuning.py --show
+
+Ortam değişkenleri:
+  ORT_INTRA_OP_THREADS, ORT_INTER_OP_THREADS   Thread sayıları
+  ORT_GRAPH_OPT_LEVEL   disable | basic | extended | all
+  ORT_EXECUTION_MODE    sequential | parallel
+  ORT_TUNING_PROFILE    Profil dosyası (varsayılan: ~/.u2net/onnx_tuning.json)
+  ORT_AUTOTUNE=1        Profil yoksa ilk session oluşturulurken ayarla
+        """)
+        if len(sys.argv) > 1 and sys.argv[1] == '--show':
+            print(json.dumps(load_profile(), indent=2))
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for name in sys.argv[2:]:
+        model_name, _, precision = name.partition('@')
+        autotune(model_name, precision=precision or 'fp32')
+
+
+if __name__ == "__main__":
+    main()
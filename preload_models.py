@@ -59,6 +59,7 @@ def main():
         'u2net_cloth_seg', # Kıyafet özel model
         'isnet-general-use', # DIS model  
         'dis-general-use',   # DIS genel
+        'u2netp',            # Hafif model - yük altında SLO için
     ]
     
     success_count = 0
@@ -70,6 +71,26 @@ def main():
     
     print(f"\n🎯 Sonuç: {success_count}/{len(models_to_preload)} model başarıyla yüklendi")
     
+    # Ultra model seçimini şimdi yap ve diske yaz - soğuk açılışlar keşfi atlar
+    if success_count > 0:
+        try:
+            from ultra_clothing_bg_remover import UltraClothingBgRemover
+            remover = UltraClothingBgRemover()
+            print(f"💾 Model seçimi kaydedildi: {remover.best_model}")
+        except Exception as e:
+            print(f"⚠️ Model seçimi kaydedilemedi: {str(e)}")
+
+    # ONNX_TUNE_AT_BUILD=1 ise thread/graf ayarlarını ölç ve profile yaz
+    # Not: profil makine şekline (CPU sayısı) göre tutulur; build makinesi
+    # çalışma ortamından farklıysa ORT_AUTOTUNE=1 ile açılışta ayarlanabilir.
+    if success_count > 0 and os.environ.get('ONNX_TUNE_AT_BUILD') == '1':
+        try:
+            from onnx_tuning import autotune
+            for model in ['u2net', 'u2net_cloth_seg']:
+                autotune(model)
+        except Exception as e:
+            print(f"⚠️ ONNX ayarlama başarısız: {str(e)}")
+    
     if success_count > 0:
         print("✅ Modeller hazır! Server başlatılabilir.")
         return 0
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+INT8 Model Niceleme (Quantization) - build adımı
+FP32 modellerden INT8 varyantlar üretir, sentetik kıyafet corpus'unda maske
+IoU'su ve CPU gecikmesini FP32 ile karşılaştırır ve raporu model klasörüne yazar.
+Çalışma zamanı int8'i sadece raporda kabul edilmiş (accepted) modeller için kullanır.
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic,
+                                      quantize_static)
+
+from batch_scheduler import session_input_spec
+from mask_utils import mask_iou
+from model_discovery import model_files, quantization_report_path, read_quantization_report
+from onnx_tuning import create_session
+from synthetic_images import make_corpus
+
+# UltraClothingBgRemover.premium_models içindeki kıyafet modelleri
+DEFAULT_MODELS = ['u2net_cloth_seg', 'isnet-general-use']
+
+# Kabul eşiği: FP32 maskelerine göre ortalama IoU
+DEFAULT_MIN_IOU = 0.95
+
+
+class SyntheticCalibrationReader(CalibrationDataReader):
+    """
+    Statik niceleme için sentetik kıyafet görüntülerinden kalibrasyon girdileri
+    """
+
+    def __init__(self, session, spec, images):
+        input_name = session.inner_session.get_inputs()[0].name
+        self._inputs = iter([
+            {input_name: session.normalize(img, spec['mean'], spec['std'], spec['size'])[input_name]}
+            for img in images
+        ])
+
+    def get_next(self):
+        return next(self._inputs, None)
+
+
+def quantize_model(model_name, mode='dynamic'):
+    """
+    Modelin INT8 varyantını üret
+    mode: 'dynamic' (ağırlıklar INT8, aktivasyonlar çalışma anında) veya
+          'static' (sentetik corpus ile kalibre edilmiş QDQ)
+    """
+    source = model_files(model_name)[0]
+    target = model_files(model_name, 'int8')[0]
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"FP32 model bulunamadı: {source} (önce preload_models.py)")
+
+    tmp_target = f"{target}.tmp"
+    start_time = time.time()
+
+    if mode == 'static':
+        # Kalibrasyon girdileri session.predict ile aynı normalizasyonu kullanmalı
+        session = create_session(model_name, config={})
+        spec = session_input_spec(session)
+        if spec is None:
+            raise ValueError(f"{model_name} için kalibrasyon ayarı okunamadı")
+        # Değerlendirme corpus'undan farklı seed'ler
+        images = [img for _, img, _ in make_corpus(sizes=(768,), seeds=range(10, 18))]
+        reader = SyntheticCalibrationReader(session, spec, images)
+        quantize_static(
+            source, tmp_target, reader,
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    else:
+        quantize_dynamic(source, tmp_target, weight_type=QuantType.QUInt8)
+
+    os.replace(tmp_target, target)
+    print(f"✅ {model_name} INT8 ({mode}) üretildi: {target} "
+          f"({os.path.getsize(source) / (1024 * 1024):.1f} MB -> {os.path.getsize(target) / (1024 * 1024):.1f} MB, "
+          f"{time.time() - start_time:.1f}s)")
+    return target
+
+
+def combined_mask(masks):
+    # Çok sınıflı modellerde (u2net_cloth_seg) tüm maskelerin birleşimi
+    return np.max(np.stack([np.asarray(mask) for mask in masks]), axis=0)
+
+
+def timed_predict(session, img, runs):
+    timings = []
+    masks = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        masks = session.predict(img)
+        timings.append((time.perf_counter() - start) * 1000)
+    return masks, sorted(timings)[len(timings) // 2]
+
+
+def evaluate_model(model_name, runs=3, min_iou=DEFAULT_MIN_IOU):
+    """
+    INT8 varyantı FP32 ile karşılaştır: maske IoU'su + CPU gecikmesi
+    """
+    fp32 = create_session(model_name)
+    int8 = create_session(model_name, precision='int8')
+    corpus = make_corpus(sizes=(512, 1024), seeds=(0, 1, 2))
+
+    # Isınma - ilk çalıştırmanın bellek ayırma maliyeti ölçüme girmesin
+    fp32.predict(corpus[0][1])
+    int8.predict(corpus[0][1])
+
+    ious, gt_fp32, gt_int8, fp32_ms, int8_ms = [], [], [], [], []
+    for name, img, truth in corpus:
+        fp32_masks, fp32_latency = timed_predict(fp32, img, runs)
+        int8_masks, int8_latency = timed_predict(int8, img, runs)
+
+        ious.append(np.mean([mask_iou(a, b) for a, b in zip(fp32_masks, int8_masks)]))
+        gt_fp32.append(mask_iou(combined_mask(fp32_masks), truth))
+        gt_int8.append(mask_iou(combined_mask(int8_masks), truth))
+        fp32_ms.append(fp32_latency)
+        int8_ms.append(int8_latency)
+        print(f"   {name}: IoU {ious[-1]:.4f}, fp32 {fp32_latency:.0f} ms, int8 {int8_latency:.0f} ms")
+
+    fp32_median = float(np.median(fp32_ms))
+    int8_median = float(np.median(int8_ms))
+    speedup = fp32_median / int8_median if int8_median > 0 else 0.0
+    mean_iou = float(np.mean(ious))
+
+    return {
+        'images': len(corpus),
+        'mean_iou_vs_fp32': round(mean_iou, 4),
+        'min_iou_vs_fp32': round(float(np.min(ious)), 4),
+        'ground_truth_iou_fp32': round(float(np.mean(gt_fp32)), 4),
+        'ground_truth_iou_int8': round(float(np.mean(gt_int8)), 4),
+        'fp32_latency_ms': round(fp32_median, 1),
+        'int8_latency_ms': round(int8_median, 1),
+        'speedup': round(speedup, 2),
+        'min_iou': min_iou,
+        # Kalite kaybı eşiğin altında ve gerçekten hızlıysa kullanılabilir
+        'accepted': mean_iou >= min_iou and speedup > 1.0
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("""
+🧮 INT8 Model Niceleme
+
+Kullanım:
+  python quantize_models.py [--static] [--min-iou 0.95] [--runs 3] [model ...]
+
+Varsayılan modeller: u2net_cloth_seg, isnet-general-use
+Rapor: ~/.u2net/quantization_report.json (QUANTIZATION_REPORT ile değiştirilebilir)
+Çalışma zamanında MODEL_PRECISION=int8 ile kullanılır.
+        """)
+        return 0
+
+    mode = 'dynamic'
+    min_iou = DEFAULT_MIN_IOU
+    runs = 3
+    models = []
+    while args:
+        arg = args.pop(0)
+        if arg == '--static':
+            mode = 'static'
+        elif arg == '--min-iou':
+            min_iou = float(args.pop(0))
+        elif arg == '--runs':
+            runs = int(args.pop(0))
+        else:
+            models.append(arg)
+    models = models or DEFAULT_MODELS
+
+    report = read_quantization_report()
+    report.setdefault('models', {})
+
+    failures = 0
+    for model_name in models:
+        print(f"🧮 {model_name} nicelleniyor ({mode})...")
+        try:
+            quantize_model(model_name, mode)
+            result = evaluate_model(model_name, runs=runs, min_iou=min_iou)
+        except Exception as e:
+            print(f"❌ {model_name} nicelenemedi: {str(e)}")
+            failures += 1
+            continue
+
+        result['mode'] = mode
+        result['generated_at'] = time.time()
+        report['models'].setdefault(model_name, {})['int8'] = result
+
+        status = "✅ kabul edildi" if result['accepted'] else "⚠️ reddedildi (fp32 kullanılacak)"
+        print(f"📊 {model_name}: IoU {result['mean_iou_vs_fp32']:.4f}, "
+              f"{result['fp32_latency_ms']} ms -> {result['int8_latency_ms']} ms "
+              f"(x{result['speedup']}) {status}")
+
+    path = quantization_report_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Rapor yazıldı: {path}")
+
+    return 1 if failures == len(models) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
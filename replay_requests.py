@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+İstek Günlüğü Tekrar Oynatıcı
+REQUEST_LOG_PATH ile kaydedilen istek zarflarını (request_log.py) veya üretim
+biçimli istek gövdelerini (ör. test_api.json: image_base64 + seçenekler) yerel
+sunucuya tekrar gönderir. Kayıttaki gelişler arası sürelerle (isteğe bağlı
+hızlandırarak) veya azami hızda oynatır ve load_test.py ile aynı raporu üretir.
+
+Zarflar görüntünün kendisini içermez. Payload şu sırayla çözülür: kayıttaki
+image_base64, --payloads klasöründeki <sha256> dosyası (REQUEST_LOG_PAYLOAD_DIR),
+yoksa kayıttaki ölçülerde deterministik sentetik kıyafet görüntüsü. Aynı hash
+her zaman aynı payload'a çözülür; böylece günlükteki tekrarlar sunucu
+önbelleğine de tekrar olarak yansır.
+"""
+
+import base64
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from load_test import (DEFAULT_URL, MetricsSampler, build_request, percentile, read_server_metrics, send,
+                       summarize, unique_variant)
+from request_log import image_header, payload_digest, read_request_log
+
+KIND_BY_ENDPOINT = {
+    '/api/remove-background': 'form',
+    '/api/remove-background-base64': 'base64',
+    '/api/mask': 'mask'
+}
+
+
+def to_replay_entry(record):
+    """
+    Günlük kaydını oynatılabilir girdiye çevir, desteklenmiyorsa None
+    """
+    if 'image_base64' in record:
+        image_base64 = record['image_base64']
+        if image_base64.startswith('data:'):
+            image_base64 = image_base64[image_base64.index(',') + 1:]
+        payload = base64.b64decode(image_base64)
+        return {
+            'kind': 'base64',
+            'ts': record.get('ts'),
+            'sha256': payload_digest(payload),
+            'payload': payload,
+            'image': image_header(payload),
+            'options': {name: value for name, value in record.items() if name not in ('image_base64', 'ts')},
+            'recorded': {}
+        }
+
+    if 'payload_sha256' in record:
+        kind = record.get('kind') or KIND_BY_ENDPOINT.get(record.get('endpoint'))
+        if kind is None:
+            return None
+        return {
+            'kind': kind,
+            'ts': record.get('ts'),
+            'sha256': record['payload_sha256'],
+            'payload': None,
+            'image': record.get('image') or {},
+            'options': record.get('options') or {},
+            'recorded': {
+                'status': record.get('status'),
+                'duration_ms': record.get('duration_ms'),
+                'cache': record.get('cache')
+            }
+        }
+
+    return None
+
+
+def request_params(options):
+    """
+    Zarf seçeneklerini istek parametrelerine çevir (bool -> 'true'/'false')
+    """
+    params = {}
+    for name, value in options.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        params[name] = str(value)
+    return params
+
+
+def encode_like(img, image_format):
+    """
+    Görüntüyü mümkünse orijinal formatında encode et
+    """
+    image_format = image_format if image_format in ('PNG', 'JPEG', 'WEBP') else 'JPEG'
+    if image_format == 'JPEG':
+        img = img.convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, **({'quality': 92} if image_format != 'PNG' else {}))
+    return buffer.getvalue()
+
+
+class PayloadResolver:
+    """
+    Hash -> payload byte'ları, her hash için bir kez çözülür
+
+    salt verilirse payload'lar piksel düzeyinde tuzlanır: önceki çalıştırmalardan
+    kalan sunucu önbelleği isabet üretmez, günlük içindeki tekrarlar yine isabet eder.
+    """
+
+    def __init__(self, payload_dir=None, salt=None):
+        self.payload_dir = payload_dir
+        self.salt = salt
+        self.sources = {'log': 0, 'payload_dir': 0, 'synthetic': 0}
+        self._payloads = {}
+
+    def resolve(self, entry):
+        key = entry['sha256']
+        if key not in self._payloads:
+            self._payloads[key] = self._load(entry)
+        return self._payloads[key]
+
+    def _load(self, entry):
+        key = entry['sha256']
+        data = entry['payload']
+        source = 'log'
+
+        if data is None and self.payload_dir:
+            path = os.path.join(self.payload_dir, key)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                source = 'payload_dir'
+
+        self.sources[source if data is not None else 'synthetic'] += 1
+        seed = int(key[:8], 16)
+
+        if data is None:
+            from synthetic_images import make_garment_image
+            width = entry['image'].get('width')
+            height = entry['image'].get('height')
+            size = (width, height) if width and height else 1024
+            img, _ = make_garment_image(size, seed % (2 ** 31), 'studio')
+            if self.salt is not None:
+                img = unique_variant(img, self.salt + seed % (1 << 16))
+            return encode_like(img, entry['image'].get('format'))
+
+        if self.salt is not None:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+            return encode_like(unique_variant(img, self.salt + seed % (1 << 16)), img.format)
+        return data
+
+
+def schedule(entries, speed=None, loops=1):
+    """
+    Her girdi için başlangıca göre planlanan gönderim zamanı (saniye)
+    speed None ise azami hız (hepsi 0). Zaman damgası olmayan kayıtlar
+    azami hızda sıraya eklenir.
+    """
+    if speed is None:
+        return [0.0] * (len(entries) * loops)
+
+    stamps = [entry['ts'] for entry in entries if entry['ts'] is not None]
+    first = min(stamps) if stamps else 0.0
+    offsets = [(entry['ts'] - first) / speed if entry['ts'] is not None else 0.0 for entry in entries]
+    span = (max(offsets) if offsets else 0.0) + (1.0 / speed)
+
+    planned = []
+    for loop in range(loops):
+        planned.extend(offset + loop * span for offset in offsets)
+    return planned
+
+
+def replay(base_url, entries, payloads, planned, concurrency, timeout=300, sample_interval=1.0):
+    """
+    Girdileri planlanan zamanlarda gönder
+    Zamanlı oynatmada gecikme planlanan zamandan ölçülür; azami hızda
+    concurrency istemci art arda gönderir.
+    """
+    records = []
+    records_lock = threading.Lock()
+    timed = any(offset > 0 for offset in planned)
+
+    def execute(index, scheduled_at):
+        entry = entries[index % len(entries)]
+        request = build_request(base_url, entry['kind'], payloads[index % len(entries)],
+                                request_params(entry['options']))
+        sent_at = time.perf_counter()
+        outcome = send(request, timeout)
+        finished_at = time.perf_counter()
+        outcome.update({
+            'endpoint': entry['kind'],
+            'latency': finished_at - (scheduled_at if scheduled_at is not None else sent_at),
+            'finished_at': finished_at - started
+        })
+        with records_lock:
+            records.append(outcome)
+
+    sampler = MetricsSampler(base_url, sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Zarflar yanıt sırasıyla yazıldığından zaman damgaları sıralı olmayabilir
+        for index, offset in sorted(enumerate(planned), key=lambda item: item[1]):
+            if timed:
+                scheduled_at = started + offset
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(execute, index, scheduled_at)
+            else:
+                executor.submit(execute, index, None)
+
+    elapsed = time.perf_counter() - started
+    samples = sampler.stop()
+    result = summarize(records, elapsed, samples, concurrency, None)
+    result['mode'] = 'timed' if timed else 'max-speed'
+    return result
+
+
+def recorded_summary(entries):
+    """
+    Günlükte kayıtlı sunucu süreleri - oynatma sonucuyla karşılaştırmak için
+    """
+    durations = sorted(entry['recorded']['duration_ms'] for entry in entries
+                       if entry['recorded'].get('duration_ms') is not None)
+    if not durations:
+        return None
+    return {
+        'requests': len(durations),
+        'p50_ms': round(percentile(durations, 50), 1),
+        'p95_ms': round(percentile(durations, 95), 1),
+        'p99_ms': round(percentile(durations, 99), 1),
+        'cache_hits': sum(1 for entry in entries if entry['recorded'].get('cache') == 'HIT')
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args or not args:
+        print("""
+🔁 İstek Günlüğü Tekrar Oynatıcı
+
+Kullanım:
+  python replay_requests.py günlük.jsonl [diğer.jsonl ...] [--url http://localhost:8000]
+                            [--max-speed | --speed 1.0] [--concurrency 8] [--loop 1]
+                            [--payloads klasör] [--allow-cache] [--timeout 300] [--output rapor.json]
+
+Varsayılan olarak kayıttaki gelişler arası sürelerle oynatılır; --speed 2 iki kat hızlı,
+--max-speed beklemeden --concurrency istemciyle gönderir.
+Günlük sunucuda REQUEST_LOG_PATH (ve isteğe bağlı REQUEST_LOG_PAYLOAD_DIR) ile kaydedilir;
+test_api.json gibi image_base64 içeren istek gövdeleri de doğrudan oynatılabilir.
+        """)
+        return 0
+
+    paths = []
+    base_url = DEFAULT_URL
+    speed = 1.0
+    concurrency = 8
+    loops = 1
+    payload_dir = None
+    salted = True
+    timeout = 300
+    output = None
+    while args:
+        arg = args.pop(0)
+        if arg == '--url':
+            base_url = args.pop(0).rstrip('/')
+        elif arg == '--speed':
+            speed = float(args.pop(0))
+        elif arg == '--max-speed':
+            speed = None
+        elif arg == '--concurrency':
+            concurrency = int(args.pop(0))
+        elif arg == '--loop':
+            loops = int(args.pop(0))
+        elif arg == '--payloads':
+            payload_dir = args.pop(0)
+        elif arg == '--allow-cache':
+            salted = False
+        elif arg == '--timeout':
+            timeout = float(args.pop(0))
+        elif arg == '--output':
+            output = args.pop(0)
+        elif arg.startswith('--'):
+            print(f"❌ Bilinmeyen argüman: {arg}", file=sys.stderr)
+            return 2
+        else:
+            paths.append(arg)
+
+    entries = []
+    skipped = 0
+    for path in paths:
+        for record in read_request_log(path):
+            entry = to_replay_entry(record)
+            if entry is None:
+                skipped += 1
+            else:
+                entries.append(entry)
+
+    if not entries:
+        print("❌ Oynatılabilir kayıt bulunamadı", file=sys.stderr)
+        return 1
+
+    print(f"📼 {len(entries)} kayıt ({skipped} atlandı), payload'lar hazırlanıyor...", file=sys.stderr)
+    resolver = PayloadResolver(payload_dir, salt=(int(time.time()) & 0xFFFF) << 8 if salted else None)
+    payloads = [resolver.resolve(entry) for entry in entries]
+    planned = schedule(entries, speed, loops)
+
+    mode = 'max-speed' if speed is None else f"x{speed} zamanlı"
+    print(f"🔁 Oynatılıyor: {len(planned)} istek, {mode}, eşzamanlılık {concurrency}", file=sys.stderr)
+    baseline = read_server_metrics(base_url)
+    result = replay(base_url, entries, payloads, planned, concurrency, timeout)
+
+    report = {
+        'benchmark': 'replay',
+        'generated_at': time.time(),
+        'config': {
+            'url': base_url,
+            'logs': paths,
+            'speed': speed,
+            'loops': loops,
+            'concurrency': concurrency,
+            'salted': salted
+        },
+        'payload_sources': resolver.sources,
+        'skipped_records': skipped,
+        'baseline_rss_bytes': baseline['rss_bytes'],
+        'recorded': recorded_summary(entries),
+        'replay': result
+    }
+
+    latency = result['latency_ms']
+    print(f"📊 {result['throughput_rps']} istek/sn, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+          f"p99 {latency['p99']} ms, hata %{(result['error_rate'] or 0) * 100:.1f}", file=sys.stderr)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Rapor yazıldı: {output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+İstek Zarfı Günlüğü
+Her işleme isteğinin arındırılmış özetini (payload hash'i ve boyutu, görüntü
+ölçüleri, seçenekler, durum, süre ve aşama süreleri) JSONL dosyasına ekler.
+Görüntünün kendisi, istemci adresi veya callback URL'leri yazılmaz; isteğe
+bağlı payload klasörü verilirse görüntüler sadece hash adıyla ayrıca saklanır.
+replay_requests.py bu günlükleri yerel sunucuya tekrar oynatır.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+from PIL import Image
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+ENVELOPE_VERSION = 1
+
+
+def payload_digest(image_bytes):
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def image_header(image_bytes):
+    """
+    Sadece başlıktan okunan format ve ölçüler (piksel decode edilmez)
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return {'format': img.format, 'width': img.width, 'height': img.height}
+    except Exception:
+        return {'format': None, 'width': None, 'height': None}
+
+
+class RequestLog:
+    """
+    Thread-safe JSONL istek günlüğü
+
+    Zarf alanları:
+        ts, endpoint, kind ('form' / 'base64' / 'binary' / 'mask'), payload_sha256,
+        payload_bytes, image {format, width, height}, options, status,
+        duration_ms, cache, model_used, timings
+    """
+
+    def __init__(self, path, payload_dir=None):
+        self.path = path
+        self.payload_dir = payload_dir
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if payload_dir:
+            os.makedirs(payload_dir, exist_ok=True)
+        logger.info(f"📝 İstek günlüğü: {path}" + (f" (payload'lar: {payload_dir})" if payload_dir else ''))
+
+    def envelope(self, kind, image_bytes, options):
+        """
+        İsteğin girdi tarafı - yanıt alanları write() sırasında eklenir
+        """
+        digest = payload_digest(image_bytes)
+        if self.payload_dir:
+            self._store_payload(digest, image_bytes)
+
+        return {
+            'v': ENVELOPE_VERSION,
+            'kind': kind,
+            'payload_sha256': digest,
+            'payload_bytes': len(image_bytes),
+            'image': image_header(image_bytes),
+            'options': options
+        }
+
+    def write(self, envelope):
+        line = json.dumps(envelope, separators=(',', ':'), default=str)
+        try:
+            with self._lock:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+        except Exception as e:
+            logger.warning(f"⚠️ İstek günlüğü yazılamadı: {e}")
+
+    def _store_payload(self, digest, image_bytes):
+        path = os.path.join(self.payload_dir, digest)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Payload saklanamadı ({digest[:12]}): {e}")
+
+
+def read_request_log(path):
+    """
+    Günlük veya üretim biçimli istek dosyasındaki kayıtlar
+    JSONL satırları ya da tek bir JSON nesnesi/listesi (ör. test_api.json) okunur.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    try:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    except json.JSONDecodeError:
+        document = json.loads(text)
+        records = document if isinstance(document, list) else [document]
+
+    return [record for record in records if isinstance(record, dict)]
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+İçerik Adresli Sonuç Önbelleği
+Girdi byte'larının hash'i + normalize edilmiş seçenekler ile anahtarlanır.
+Bellek içi LRU katmanı + processed/ altında boyut sınırlı disk katmanı.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    İki katmanlı sonuç önbelleği
+
+    Girdi (entry) biçimi:
+        {'result': PNG bytes, 'variants': {isim: PNG bytes}, 'model_used': str,
+         'variant_sizes': {isim: [genişlik, yükseklik]}, ...}
+
+    result/variants dışındaki alanlar (ör. quality_tier, cascade) JSON'a
+    çevrilebilir olmalı; disk katmanında metadata olarak aynen saklanır.
+
+    variants sadece üretilmiş varyantları içerir; variant_sizes üretilebilecek
+    olanları tanımlar ve varyantlar put_variant() ile sonradan eklenir.
+
+    Disk katmanında her girdi <key>.json (metadata), <key>.png (sonuç) ve
+    <key>_<varyant>.png dosyalarından oluşur. Dosya adları içerikten
+    türetildiği için doğrudan indirme adı olarak kullanılabilir.
+    """
+
+    def __init__(self, cache_dir, max_memory_bytes=64 * 1024 * 1024, max_disk_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        # Disk metadata'sını güncelleyen tembel varyant yazımları için
+        self._variant_lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # Disk indeksi: key -> toplam byte, en eski kullanılan başta
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.max_disk_bytes > 0:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(image_bytes, options):
+        """
+        Girdi byte'ları ve seçeneklerden içerik adresli anahtar üret
+        """
+        normalized = json.dumps(options, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(image_bytes).digest())
+        digest.update(normalized.encode('utf-8'))
+        return digest.hexdigest()
+
+    def result_filename(self, key):
+        return f"{key}.png"
+
+    def variant_filename(self, key, name):
+        return f"{key}_{name}.png"
+
+    def get(self, key):
+        """
+        Önbellekteki girdiyi döndür, yoksa None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            on_disk = key in self._disk
+            if on_disk:
+                self._disk.move_to_end(key)
+
+        entry = self._read_disk(key) if on_disk else None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Girdiyi her iki katmana yaz
+        """
+        with self._lock:
+            self._remember(key, entry)
+
+        if self.max_disk_bytes > 0:
+            try:
+                self._write_disk(key, entry)
+            except Exception as e:
+                logger.warning(f"⚠️ Önbellek diske yazılamadı ({key}): {e}")
+
+    def put_variant(self, key, name, data):
+        """
+        Sonradan (tembel) üretilen varyantı mevcut girdiye ekle
+        Girdi artık diskte değilse sadece bellek katmanı güncellenir.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and name not in entry['variants']:
+                entry['variants'][name] = data
+                self._memory_bytes += len(data)
+                self._evict_memory()
+
+        if self.max_disk_bytes <= 0:
+            return
+
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        with self._variant_lock:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except Exception:
+                return
+
+            if name in meta['variants']:
+                return
+
+            try:
+                self._write_file(self.variant_filename(key, name), data)
+                meta['variants'] = sorted(meta['variants'] + [name])
+                self._write_file(f"{key}.json", json.dumps(meta).encode('utf-8'))
+            except Exception as e:
+                logger.warning(f"⚠️ Varyant önbelleğe yazılamadı ({key}/{name}): {e}")
+                return
+
+            with self._lock:
+                if key in self._disk:
+                    self._disk[key] += len(data)
+                    self._disk_bytes += len(data)
+
+    def materialize(self, key, entry):
+        """
+        Girdinin disk dosyalarının var olduğundan emin ol
+        Dönüş: {'result': dosya adı, 'variants': {isim: dosya adı}}
+        """
+        if not os.path.exists(os.path.join(self.cache_dir, self.result_filename(key))):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write_disk(key, entry)
+
+        return {
+            'result': self.result_filename(key),
+            'variants': {name: self.variant_filename(key, name) for name in entry['variants']}
+        }
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes
+            }
+
+    @staticmethod
+    def _entry_size(entry):
+        return len(entry['result']) + sum(len(data) for data in entry['variants'].values())
+
+    def _remember(self, key, entry):
+        # Kilit tutulurken çağrılır
+        if self.max_memory_bytes <= 0:
+            return
+
+        size = self._entry_size(entry)
+        if size > self.max_memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_bytes -= self._entry_size(self._memory.pop(key))
+
+        self._memory[key] = entry
+        self._memory_bytes += size
+        self._evict_memory()
+
+    def _evict_memory(self):
+        # Kilit tutulurken çağrılır - bütçe aşılmışsa en eski kullanılanlardan başlayarak çıkar
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= self._entry_size(evicted)
+
+    def _entry_paths(self, key, variant_names):
+        paths = [
+            os.path.join(self.cache_dir, f"{key}.json"),
+            os.path.join(self.cache_dir, self.result_filename(key))
+        ]
+        paths.extend(os.path.join(self.cache_dir, self.variant_filename(key, name)) for name in variant_names)
+        return paths
+
+    def _load_disk_index(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.json'):
+                continue
+            key = filename[:-5]
+            try:
+                with open(os.path.join(self.cache_dir, filename), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                paths = self._entry_paths(key, meta['variants'])
+                size = sum(os.path.getsize(path) for path in paths)
+                entries.append((os.path.getmtime(paths[1]), key, size))
+            except Exception:
+                continue
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+        if entries:
+            logger.info(f"📦 Sonuç önbelleği: diskte {len(entries)} girdi, {self._disk_bytes / (1024 * 1024):.1f} MB")
+
+    def _read_disk(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(os.path.join(self.cache_dir, self.result_filename(key)), 'rb') as f:
+                result = f.read()
+            variants = {}
+            for name in meta['variants']:
+                with open(os.path.join(self.cache_dir, self.variant_filename(key, name)), 'rb') as f:
+                    variants[name] = f.read()
+            # LRU sırası yeniden başlatmadan sonra da korunsun
+            os.utime(os.path.join(self.cache_dir, self.result_filename(key)))
+        except Exception as e:
+            logger.warning(f"⚠️ Önbellek girdisi okunamadı ({key}): {e}")
+            with self._lock:
+                self._forget_disk(key)
+            return None
+
+        entry = {name: value for name, value in meta.items() if name != 'variants'}
+        entry.setdefault('variant_sizes', {})
+        entry.update(result=result, variants=variants)
+        return entry
+
+    def _write_disk(self, key, entry):
+        files = [(self.result_filename(key), entry['result'])]
+        files.extend((self.variant_filename(key, name), data) for name, data in entry['variants'].items())
+        meta = {name: value for name, value in entry.items() if name not in ('result', 'variants')}
+        meta['variants'] = sorted(entry['variants'])
+        meta = json.dumps(meta)
+        # Metadata en son yazılır; indeks sadece tamamlanmış girdileri görür
+        files.append((f"{key}.json", meta.encode('utf-8')))
+
+        for filename, data in files:
+            self._write_file(filename, data)
+
+        with self._lock:
+            if key in self._disk:
+                self._disk_bytes -= self._disk.pop(key)
+            size = sum(len(data) for _, data in files)
+            self._disk[key] = size
+            self._disk_bytes += size
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, _ = next(iter(self._disk.items()))
+                evicted.append(old_key)
+                self._forget_disk(old_key)
+
+        for old_key in evicted:
+            self._delete_disk_files(old_key)
+
+    def _write_file(self, filename, data):
+        path = os.path.join(self.cache_dir, filename)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _forget_disk(self, key):
+        # Kilit tutulurken çağrılır
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _delete_disk_files(self, key):
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                variant_names = json.load(f)['variants']
+        except Exception:
+            variant_names = []
+
+        for path in self._entry_paths(key, variant_names):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+İstek Başına Geçici Çalışma Alanı
+Her istek kendine ait, benzersiz bir klasörde çalışır (tercihen tmpfs /dev/shm);
+klasör istek başarılı da olsa hata da verse otomatik silinir.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+WORKSPACE_PREFIX = 'clothing-scratch-'
+
+
+def scratch_root():
+    """
+    Çalışma alanlarının kök klasörü
+    SCRATCH_DIR ortam değişkeni > yazılabilir /dev/shm (RAM) > sistem temp klasörü
+    """
+    configured = os.environ.get('SCRATCH_DIR')
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+
+    return tempfile.gettempdir()
+
+
+class ScratchWorkspace:
+    """
+    Context manager olarak kullanılan izole geçici klasör
+
+        with ScratchWorkspace() as workspace:
+            input_path = workspace.file('girdi.png')
+            ...
+    """
+
+    def __init__(self, root=None):
+        self.root = root or scratch_root()
+        self.path = None
+
+    def __enter__(self):
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+    def file(self, name):
+        """
+        Çalışma alanı içinde dosya yolu (sadece dosya adı kullanılır)
+        """
+        return os.path.join(self.path, os.path.basename(name))
+
+    def cleanup(self):
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+
+def cleanup_stale_workspaces(max_age_seconds=3600, root=None):
+    """
+    Çöken/öldürülen süreçlerden kalan eski çalışma alanlarını sil
+    max_age_seconds istek zaman aşımından büyük olmalı ki aktif olanlar silinmesin.
+    """
+    root = root or scratch_root()
+    removed = 0
+    now = time.time()
+
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        if not entry.name.startswith(WORKSPACE_PREFIX):
+            continue
+        try:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if now - entry.stat(follow_symlinks=False).st_mtime < max_age_seconds:
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed += 1
+
+    if removed:
+        logger.info(f"🧹 {removed} eski çalışma alanı silindi ({root})")
+    return removed
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Model Session Havuzu
+Süreç genelinde tek bir rembg session kaydı: model adına göre tekilleştirir,
+her session'ın bellek kullanımını izler, bütçe aşılınca LRU session'ı bırakır.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from rembg import new_session
+
+from model_discovery import model_files, session_key
+from onnx_tuning import create_session
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes():
+    """
+    Sürecin anlık RSS değeri (byte), ölçülemezse None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+
+class SessionPool:
+    """
+    Bellek bütçeli, LRU tahliyeli session kaydı
+
+    Session'lar referans olarak saklanmamalı; her kullanımda get() ile
+    alınmalı ki tahliye edilen session gerçekten serbest kalsın.
+
+    Yükleme havuz kilidi dışında yapılır: soğuk bir modelin yüklenmesi (veya
+    indirilmesi) sadece aynı modeli bekleyenleri bloklar, yüklü session'lara
+    erişim sürer.
+    """
+
+    def __init__(self, memory_budget_bytes=1200 * 1024 * 1024, session_factory=None):
+        self.memory_budget_bytes = memory_budget_bytes
+        # session_factory(model_name[, precision=...]) -> session
+        self.session_factory = session_factory or new_session
+
+        self._lock = threading.RLock()
+        # session_key(model, precision) -> {'session', 'memory_bytes', 'load_seconds', 'last_used'}
+        self._sessions = OrderedDict()
+        # session_key -> threading.Event; yüklemesi süren session'lar
+        self._loading = {}
+
+    def get(self, model_name, precision='fp32'):
+        """
+        Modelin (istenen hassasiyetteki) session'ını döndür, yoksa yükle
+        """
+        key = session_key(model_name, precision)
+        while True:
+            with self._lock:
+                entry = self._sessions.get(key)
+                if entry is not None:
+                    self._sessions.move_to_end(key)
+                    entry['last_used'] = time.time()
+                    return entry['session']
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    # Bu thread yükler
+                    loading = self._loading[key] = threading.Event()
+                    break
+
+            # Aynı modeli başka bir thread yüklüyor; başarısız olursa döngü yeniden dener
+            loading.wait()
+
+        try:
+            logger.info(f"📥 Session yükleniyor: {key}")
+            rss_before = current_rss_bytes()
+            start_time = time.time()
+
+            if precision == 'fp32':
+                session = self.session_factory(model_name)
+            else:
+                session = self.session_factory(model_name, precision=precision)
+
+            load_seconds = time.time() - start_time
+            # Eşzamanlı yüklemelerde RSS farkı diğer modelleri de içerebilir (tahmin)
+            memory_bytes = self._estimate_memory(model_name, precision, rss_before)
+
+            with self._lock:
+                self._sessions[key] = {
+                    'session': session,
+                    'memory_bytes': memory_bytes,
+                    'load_seconds': load_seconds,
+                    'last_used': time.time()
+                }
+                self._enforce_budget(keep=key)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+        logger.info(
+            f"✅ Session hazır: {key} "
+            f"({memory_bytes / (1024 * 1024):.0f} MB, {load_seconds:.2f}s)"
+        )
+        return session
+
+    def release(self, model_name, precision='fp32'):
+        """
+        Session'ı havuzdan çıkar
+        """
+        key = session_key(model_name, precision)
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+        if entry is not None:
+            del entry
+            gc.collect()
+            logger.info(f"🗑️ Session bırakıldı: {key}")
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def total_memory_bytes(self):
+        with self._lock:
+            return sum(entry['memory_bytes'] for entry in self._sessions.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'memory_bytes': sum(entry['memory_bytes'] for entry in self._sessions.values()),
+                'sessions': {
+                    name: {
+                        'memory_bytes': entry['memory_bytes'],
+                        'load_seconds': round(entry['load_seconds'], 3),
+                        'last_used': entry['last_used']
+                    }
+                    for name, entry in self._sessions.items()
+                }
+            }
+
+    def _estimate_memory(self, model_name, precision, rss_before):
+        # Yükleme öncesi/sonrası RSS farkı; ölçülemezse model dosyası boyutu
+        rss_after = current_rss_bytes()
+        if rss_before is not None and rss_after is not None and rss_after > rss_before:
+            return rss_after - rss_before
+
+        return sum(os.path.getsize(path) for path in model_files(model_name, precision) if os.path.exists(path))
+
+    def _enforce_budget(self, keep):
+        # Kilit tutulurken çağrılır
+        evicted = False
+        while self.total_memory_bytes() > self.memory_budget_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            entry = self._sessions.pop(oldest)
+            logger.info(
+                f"♻️ Bellek bütçesi aşıldı, LRU session bırakıldı: {oldest} "
+                f"({entry['memory_bytes'] / (1024 * 1024):.0f} MB)"
+            )
+            del entry
+            evicted = True
+
+        if evicted:
+            gc.collect()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """
+    Süreç genelindeki session havuzu
+    Bütçe SESSION_MEMORY_BUDGET_MB ortam değişkeninden okunur; session'lar
+    ONNX Runtime ayarlarıyla (bkz. onnx_tuning) oluşturulur.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            budget_mb = int(os.environ.get('SESSION_MEMORY_BUDGET_MB', 1200))
+            _pool = SessionPool(memory_budget_bytes=budget_mb * 1024 * 1024, session_factory=create_session)
+        return _pool
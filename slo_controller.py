@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Gecikme SLO Denetleyicisi
+Kuyruk derinliği ve son işlem sürelerine bakarak her istek için kalite
+kademesini (model + çıkarım çözünürlüğü) seçer. Yük altında p95 hedefini
+aşacak kademe yerine daha hafif olanı seçilir; yük geçince eski ölçümler
+zaman aşımına uğrar ve en yüksek kademeye geri dönülür.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct):
+    """
+    Sıralı listede doğrusal aradeğerlemeli yüzdelik
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class SloController:
+    """
+    Kalite kademesi seçici
+
+    tiers: en kaliteliden en hafife kademe listesi,
+           [{'name': 'full', 'model_name': None, 'max_dim': None}, ...]
+           model_name / max_dim None ise remover'ın varsayılanı kullanılır.
+    queue_depth(): kuyrukta bekleyen iş sayısı
+
+    Kademenin tahmini süresi son ölçümlerinin p95'i x (önündeki iş + 1)'dir;
+    hedefi karşılayan ilk kademe seçilir, hiçbiri karşılamazsa en hafifi.
+    Ölçümü olmayan kademe hedefi karşılıyor sayılır.
+    """
+
+    def __init__(self, tiers, target_p95_ms, queue_depth=None, window=50, max_sample_age=120):
+        self.tiers = list(tiers)
+        self.target_p95_ms = target_p95_ms
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.max_sample_age = max_sample_age
+
+        self._lock = threading.Lock()
+        # kademe adı -> (zaman, süre ms) son ölçümler
+        self._samples = {tier['name']: deque(maxlen=window) for tier in self.tiers}
+        self._chosen = {tier['name']: 0 for tier in self.tiers}
+        self.in_flight = 0
+
+        names = ', '.join(tier['name'] for tier in self.tiers)
+        logger.info(f"🎯 SLO denetleyicisi: p95 hedefi {target_p95_ms:.0f} ms, kademeler: {names}")
+
+    def tier_p95_ms(self, name):
+        """
+        Kademenin taze ölçümlerinden p95 (ms), ölçüm yoksa None
+        """
+        cutoff = time.time() - self.max_sample_age
+        with self._lock:
+            durations = sorted(ms for at, ms in self._samples.get(name, ()) if at >= cutoff)
+        return percentile(durations, 95)
+
+    def choose(self):
+        """
+        Bu istek için kademe seç - seçilen kademenin kopyası döner
+        """
+        backlog = self.queue_depth() + self.in_flight
+        chosen = self.tiers[-1]
+        predicted_ms = None
+
+        for tier in self.tiers:
+            p95 = self.tier_p95_ms(tier['name'])
+            if p95 is None or p95 * (backlog + 1) <= self.target_p95_ms:
+                chosen = tier
+                predicted_ms = p95 * (backlog + 1) if p95 is not None else None
+                break
+
+        with self._lock:
+            self._chosen[chosen['name']] += 1
+
+        if chosen is not self.tiers[0]:
+            logger.info(f"🎯 Yük altında '{chosen['name']}' kademesi seçildi (bekleyen: {backlog})")
+
+        plan = dict(chosen)
+        plan['predicted_ms'] = round(predicted_ms, 1) if predicted_ms is not None else None
+        return plan
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is not None:
+                samples.append((time.time(), seconds * 1000))
+
+    @contextmanager
+    def track(self, plan):
+        """
+        İşlemi eşzamanlı işlere say ve başarılıysa süresini kademesine ekle
+        Sabitlenmiş (listede olmayan) kademeler sadece eşzamanlılığa sayılır.
+        """
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        self.record(plan['name'], time.perf_counter() - start)
+
+    def stats(self):
+        with self._lock:
+            chosen = dict(self._chosen)
+            in_flight = self.in_flight
+        return {
+            'target_p95_ms': self.target_p95_ms,
+            'in_flight': in_flight,
+            'queue_depth': self.queue_depth(),
+            'tiers': [
+                {
+                    'name': tier['name'],
+                    'model_name': tier['model_name'],
+                    'max_dim': tier['max_dim'],
+                    'p95_ms': self.tier_p95_ms(tier['name']),
+                    'chosen': chosen[tier['name']]
+                }
+                for tier in self.tiers
+            ]
+        }
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Aşama Süreleri
+Tek bir isteğin pipeline aşamalarının duvar saati ve CPU süreleri; API yanıtında
+JSON olarak ve standart Server-Timing başlığı olarak döner.
+"""
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StageTimings:
+    """
+    İstek başına aşama süreleri
+
+        timings = StageTimings()
+        with timings.measure('decode'):
+            ...
+        timings.as_dict()        # {'decode': {'wall_ms': 12.3, 'cpu_ms': 11.8, 'calls': 1}}
+        timings.server_timing()  # 'decode;dur=12.3;desc="cpu 11.8ms", total;dur=12.3'
+
+    CPU süresi süreç geneli (time.process_time) ölçülür; ONNX Runtime'ın
+    iş parçacığı havuzunu da kapsar, aynı anda çalışan başka işler varsa
+    onların CPU'su da dahil olur. Aynı aşama birden fazla ölçülürse toplanır.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        # aşama -> [duvar saniyesi, CPU saniyesi, çağrı sayısı]
+        self._stages = OrderedDict()
+
+    def add(self, stage, wall_seconds, cpu_seconds=0.0):
+        entry = self._stages.setdefault(stage, [0.0, 0.0, 0])
+        entry[0] += wall_seconds
+        entry[1] += cpu_seconds
+        entry[2] += 1
+
+    @contextmanager
+    def measure(self, stage):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def wall_seconds(self, stage):
+        entry = self._stages.get(stage)
+        return entry[0] if entry else 0.0
+
+    def total_seconds(self):
+        """Nesne oluşturulduğundan beri geçen süre"""
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self):
+        timings = OrderedDict()
+        for stage, (wall, cpu, calls) in self._stages.items():
+            timings[stage] = {
+                'wall_ms': round(wall * 1000, 1),
+                'cpu_ms': round(cpu * 1000, 1),
+                'calls': calls
+            }
+        return timings
+
+    def server_timing(self):
+        """
+        Server-Timing başlık değeri - tarayıcı geliştirici araçlarında görünür
+        """
+        parts = [
+            f'{stage};dur={wall * 1000:.1f};desc="cpu {cpu * 1000:.1f}ms"'
+            for stage, (wall, cpu, _) in self._stages.items()
+        ]
+        parts.append(f"total;dur={self.total_seconds() * 1000:.1f}")
+        return ', '.join(parts)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Depolama Yaşam Döngüsü Yöneticisi
+uploads/ ve processed/ altındaki dosyalar için kategori bazlı TTL, toplam
+boyut sınırı (LRU tahliye), çökme sonrası kalan ara dosyaların temizliği ve
+metrikler. Süpürme arka plan thread'inde çalışır, istek thread'lerini bloklamaz.
+"""
+
+import logging
+import os
+import threading
+import time
+
+# Logger setup
+logger = logging.getLogger(__name__)
+
+
+class StorageCategory:
+    """
+    Yönetilen dosya grubu
+
+    ttl_seconds: bu süreden eski (mtime) dosyalar silinir, None = süresiz
+    recursive: alt klasörler de taranır (exclude_dirs hariç)
+    evictable: toplam boyut sınırı aşılınca LRU tahliyeye katılır
+    match(path): sadece True dönen dosyalar TTL/tahliyeye tabidir; None = hepsi.
+        Eşleşmeyen dosyalar silinmez ama metriklere dahildir (ör. önbellek
+        klasörlerinin sahibi kendi önbellek sınıflarıdır, burada sadece
+        yarım kalmış .tmp ve sahipsiz dosyalar temizlenir).
+    """
+
+    def __init__(self, name, directory, ttl_seconds=None, recursive=False, exclude_dirs=(),
+                 evictable=True, match=None):
+        self.name = name
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.recursive = recursive
+        self.exclude_dirs = set(exclude_dirs)
+        self.evictable = evictable
+        self.match = match
+
+    def scan(self):
+        """
+        Kategorideki dosyalar: [(yol, boyut, mtime), ...]
+        """
+        files = []
+        pending = [self.directory]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive and entry.name not in self.exclude_dirs:
+                            pending.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+
+class StorageManager:
+    """
+    Kategorileri periyodik olarak süpüren depolama yöneticisi
+
+    on_delete(kategori adı, yol): süpürmenin sildiği her dosya için (TTL veya
+        tahliye) çağrılır - ör. dosyayı gösteren kayıtları güncellemek için
+    after_sweep(): her süpürmenin sonunda çağrılır - ör. günlük temizliği
+    """
+
+    def __init__(self, categories, max_total_bytes=None, sweep_interval=300, on_delete=None, after_sweep=None):
+        self.categories = list(categories)
+        self.max_total_bytes = max_total_bytes
+        self.sweep_interval = sweep_interval
+        self.on_delete = on_delete
+        self.after_sweep = after_sweep
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._metrics = {
+            category.name: {'files': 0, 'bytes': 0, 'deleted_files': 0, 'deleted_bytes': 0}
+            for category in self.categories
+        }
+        self.sweeps = 0
+        self.last_sweep_at = None
+        self.last_sweep_seconds = None
+
+    def start(self):
+        """
+        Arka plan süpürücüsünü başlat (ilk süpürme hemen yapılır)
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="storage-sweeper", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"🧹 Depolama yöneticisi başladı: {len(self.categories)} kategori, "
+            f"her {self.sweep_interval}s"
+        )
+
+    def stop(self):
+        self._stop.set()
+
+    @staticmethod
+    def touch(path):
+        """
+        Dosyayı kullanılmış olarak işaretle - LRU tahliye mtime'a göre yapılır
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def sweep(self):
+        """
+        Tek süpürme: TTL'i dolanları sil, sonra boyut sınırı için LRU tahliye
+        """
+        start_time = time.time()
+        now = time.time()
+        evictable = []
+        totals = {}
+        deleted_paths = []
+
+        for category in self.categories:
+            files_count = 0
+            total_bytes = 0
+            deleted_files = 0
+            deleted_bytes = 0
+
+            for path, size, mtime in category.scan():
+                managed = category.match is None or category.match(path)
+                if managed and category.ttl_seconds is not None and now - mtime > category.ttl_seconds:
+                    if self._delete(path):
+                        deleted_files += 1
+                        deleted_bytes += size
+                        deleted_paths.append((category.name, path))
+                        continue
+
+                files_count += 1
+                total_bytes += size
+                if managed and category.evictable:
+                    evictable.append((mtime, path, size, category.name))
+
+            totals[category.name] = (files_count, total_bytes, deleted_files, deleted_bytes)
+
+        # Boyut sınırı - en eski kullanılan dosyalardan başlayarak
+        if self.max_total_bytes is not None:
+            evictable_bytes = sum(size for _, _, size, _ in evictable)
+            for mtime, path, size, name in sorted(evictable):
+                if evictable_bytes <= self.max_total_bytes:
+                    break
+                if self._delete(path):
+                    evictable_bytes -= size
+                    deleted_paths.append((name, path))
+                    files_count, total_bytes, deleted_files, deleted_bytes = totals[name]
+                    totals[name] = (files_count - 1, total_bytes - size, deleted_files + 1, deleted_bytes + size)
+
+        deleted_total = 0
+        with self._lock:
+            for name, (files_count, total_bytes, deleted_files, deleted_bytes) in totals.items():
+                metrics = self._metrics[name]
+                metrics['files'] = files_count
+                metrics['bytes'] = total_bytes
+                metrics['deleted_files'] += deleted_files
+                metrics['deleted_bytes'] += deleted_bytes
+                deleted_total += deleted_files
+            self.sweeps += 1
+            self.last_sweep_at = now
+            self.last_sweep_seconds = time.time() - start_time
+
+        if deleted_total:
+            logger.info(f"🧹 Depolama süpürüldü: {deleted_total} dosya silindi ({self.last_sweep_seconds:.2f}s)")
+
+        if self.on_delete is not None:
+            for name, path in deleted_paths:
+                try:
+                    self.on_delete(name, path)
+                except Exception as e:
+                    logger.warning(f"⚠️ Silme bildirimi hatası ({path}): {e}")
+
+        if self.after_sweep is not None:
+            self.after_sweep()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_total_bytes': self.max_total_bytes,
+                'sweeps': self.sweeps,
+                'last_sweep_at': self.last_sweep_at,
+                'last_sweep_seconds': round(self.last_sweep_seconds, 3) if self.last_sweep_seconds is not None else None,
+                'categories': {name: dict(metrics) for name, metrics in self._metrics.items()}
+            }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ Depolama süpürme hatası: {e}")
+            self._stop.wait(self.sweep_interval)
+
+    @staticmethod
+    def _delete(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"⚠️ Dosya silinemedi ({path}): {e}")
+            return False
+
+
+def is_temp_file(path):
+    """Yarıda kalmış atomik yazım (.tmp)"""
+    return path.endswith('.tmp')
+
+
+def is_orphaned_cache_file(path):
+    """
+    Sonuç önbelleğinde metadata'sı (<key>.json) olmayan dosya veya .tmp
+    Metadata en son yazıldığı için, yazım sırasında çöken girdiler böyle kalır.
+    """
+    if is_temp_file(path):
+        return True
+    filename = os.path.basename(path)
+    key = filename.split('.', 1)[0].split('_', 1)[0]
+    return not os.path.exists(os.path.join(os.path.dirname(path), f"{key}.json"))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Sentetik Kıyafet Görüntüsü Üretici
+Benchmark ve ayar (tuning) için deterministik test görüntüleri + doğru maskeler
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+
+def garment_polygon(width, height, rng):
+    """
+    Tişört benzeri çokgen - gövde, kollar ve yaka
+    """
+    cx = width / 2
+    jitter = lambda scale: rng.uniform(-scale, scale)
+
+    body_w = width * (0.32 + jitter(0.04))
+    top = height * (0.18 + jitter(0.03))
+    bottom = height * (0.86 + jitter(0.03))
+    shoulder = top + height * 0.04
+    sleeve_w = width * (0.16 + jitter(0.03))
+    sleeve_drop = height * (0.22 + jitter(0.03))
+    neck_w = width * 0.08
+    neck_d = height * 0.05
+
+    return [
+        (cx - neck_w, top),
+        (cx - body_w, shoulder),
+        (cx - body_w - sleeve_w, shoulder + sleeve_drop * 0.6),
+        (cx - body_w - sleeve_w * 0.5, shoulder + sleeve_drop),
+        (cx - body_w, shoulder + sleeve_drop * 0.7),
+        (cx - body_w * 0.95, bottom),
+        (cx + body_w * 0.95, bottom),
+        (cx + body_w, shoulder + sleeve_drop * 0.7),
+        (cx + body_w + sleeve_w * 0.5, shoulder + sleeve_drop),
+        (cx + body_w + sleeve_w, shoulder + sleeve_drop * 0.6),
+        (cx + body_w, shoulder),
+        (cx + neck_w, top),
+        (cx, top + neck_d),
+    ]
+
+
+def make_garment_image(size=1024, seed=0, background='studio'):
+    """
+    Deterministik sentetik kıyafet fotoğrafı üret
+
+    size: uzun kenar (int) veya (genişlik, yükseklik)
+    background: 'studio' (düz açık gri) veya 'textured' (gürültülü, gradyanlı)
+    Dönüş: (RGB görüntü, 'L' modunda doğru maske)
+    """
+    if isinstance(size, int):
+        width, height = int(size * 0.8), size
+    else:
+        width, height = size
+
+    rng = np.random.RandomState(seed)
+
+    # Arka plan
+    if background == 'textured':
+        gradient = np.linspace(170, 235, height, dtype=np.float32)[:, None, None]
+        bg = np.repeat(np.repeat(gradient, width, axis=1), 3, axis=2)
+        bg += rng.normal(0, 12, (height, width, 3))
+    else:
+        bg = np.full((height, width, 3), 235 + rng.uniform(-8, 8), dtype=np.float32)
+        bg += rng.normal(0, 1.5, (height, width, 3))
+
+    # Kumaş rengi + desen
+    color = rng.uniform(30, 200, 3)
+    xx = np.arange(width, dtype=np.float32)[None, :]
+    stripes = 18 * np.sin(xx / max(width, 1) * rng.uniform(20, 60))
+    fabric = np.clip(color[None, None, :] + stripes[:, :, None] + rng.normal(0, 4, (height, width, 3)), 0, 255)
+
+    # Maske - kenarlar hafif yumuşatılmış
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).polygon(garment_polygon(width, height, rng), fill=255)
+    mask = mask.filter(ImageFilter.GaussianBlur(radius=max(1, width // 600)))
+
+    alpha = np.asarray(mask, dtype=np.float32)[:, :, None] / 255.0
+    pixels = fabric * alpha + bg * (1 - alpha)
+
+    # Yumuşak gölge - gerçek stüdyo çekimlerine benzesin
+    shadow = np.asarray(mask.filter(ImageFilter.GaussianBlur(radius=max(2, width // 60))), dtype=np.float32)
+    shadow = np.roll(shadow, (height // 80, width // 80), axis=(0, 1))[:, :, None] / 255.0
+    pixels = pixels * (1 - 0.15 * shadow * (1 - alpha))
+
+    img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), mode="RGB")
+    return img, mask
+
+
+def make_corpus(sizes=(512, 1024, 2048), seeds=(0, 1, 2), backgrounds=('studio', 'textured')):
+    """
+    Boyut x seed x arka plan kombinasyonlarından küçük bir corpus üret
+    Dönüş: [(isim, RGB görüntü, maske), ...]
+    """
+    corpus = []
+    for size in sizes:
+        for seed in seeds:
+            for background in backgrounds:
+                img, mask = make_garment_image(size, seed, background)
+                corpus.append((f"synthetic_{background}_{size}_{seed}", img, mask))
+    return corpus
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from batch_scheduler import BATCHABLE_MODELS, BatchScheduler, session_input_spec  # noqa: E402
+
+
+class FakeDisSession:
+    def normalize(self, img, mean, std, size, *args, **kwargs):
+        raise AssertionError('paylaşılan session değiştirilmemeli')
+
+    def predict(self, img):
+        self.normalize(img, (0.5, 0.5, 0.5), (1.0, 1.0, 1.0), (1024, 1024))
+        raise AssertionError('model çalıştırılmamalı')
+
+
+def test_input_spec_is_read_from_session_without_touching_it():
+    session = FakeDisSession()
+
+    spec = session_input_spec(session)
+
+    assert spec == {'size': (1024, 1024), 'mean': (0.5, 0.5, 0.5), 'std': (1.0, 1.0, 1.0)}
+    assert 'normalize' not in vars(session)
+
+
+def clothing_image(seed, size=(400, 300)):
+    rng = np.random.default_rng(seed)
+    pixels = np.full((size[1], size[0], 3), 235, dtype=np.uint8)
+    pixels[60:260, 120:280] = rng.integers(20, 120, size=3, dtype=np.uint8)
+    return Image.fromarray(pixels, mode='RGB')
+
+
+@pytest.mark.parametrize('model_name', BATCHABLE_MODELS)
+def test_batched_mask_matches_session_predict(model_name):
+    pytest.importorskip('rembg')
+    pytest.importorskip('onnxruntime')
+    from model_discovery import local_files_ok
+    from onnx_tuning import create_session
+
+    if not local_files_ok(model_name):
+        pytest.skip(f'{model_name} modeli yerelde yok')
+
+    session = create_session(model_name, config={})
+    scheduler = BatchScheduler(lambda: session, model_name, max_batch_size=2, max_wait_ms=200)
+    images = [clothing_image(0), clothing_image(1)]
+
+    results = [None] * len(images)
+
+    def run(i):
+        results[i] = scheduler.predict(images[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(images))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for img, masks in zip(images, results):
+        expected = np.asarray(session.predict(img)[0], dtype=np.int16)
+        batched = np.asarray(masks[0], dtype=np.int16)
+        assert batched.shape == expected.shape
+        assert np.abs(batched - expected).max() <= 2
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from image_io import open_image  # noqa: E402
+
+
+def encode(img, fmt, **params):
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **params)
+    return buffer.getvalue()
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    # 6 = 90° saat yönünde döndürülerek gösterilmeli
+    exif[0x0112] = 6
+    data = encode(Image.new("RGB", (40, 20), (200, 30, 30)), "JPEG", exif=exif.tobytes())
+
+    img = open_image(data)
+
+    assert img.size == (20, 40)
+
+
+def test_path_and_bytes_decode_to_same_pixels(tmp_path):
+    data = encode(Image.new("RGBA", (6, 4), (10, 20, 30, 128)), "PNG")
+    path = tmp_path / 'input.png'
+    path.write_bytes(data)
+
+    from_path = open_image(str(path))
+    from_bytes = open_image(data)
+
+    assert from_path.mode == "RGBA"
+    assert from_path.tobytes() == from_bytes.tobytes()
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import JobQueue, QueueFullError
+
+
+def wait_for_status(jobs, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job and job['status'] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"{job_id} {status} olmadı: {jobs.get(job_id)}")
+
+
+def test_submit_runs_handler_and_stores_result(tmp_path):
+    jobs = JobQueue(lambda payload: {'echo': payload['n']}, db_path=str(tmp_path / 'jobs.db'))
+    jobs.start()
+
+    job_id = jobs.submit({'n': 7})
+
+    job = wait_for_status(jobs, job_id, JobQueue.DONE)
+    assert job['result'] == {'echo': 7}
+    assert job['finished_at'] >= job['started_at']
+
+
+def test_failed_handler_records_error(tmp_path):
+    def handler(payload):
+        raise ValueError('bozuk görüntü')
+
+    jobs = JobQueue(handler, db_path=str(tmp_path / 'jobs.db'))
+    jobs.start()
+
+    job = wait_for_status(jobs, jobs.submit({}), JobQueue.FAILED)
+    assert job['error'] == 'bozuk görüntü'
+    assert 'result' not in job
+
+
+def test_full_queue_rejects_and_forgets_job(tmp_path):
+    # Worker başlatılmaz, kuyruk boşalmaz
+    jobs = JobQueue(lambda payload: {}, db_path=str(tmp_path / 'jobs.db'), max_queue=1)
+    first = jobs.submit({})
+
+    with pytest.raises(QueueFullError):
+        jobs.submit({})
+
+    assert jobs.depth() == 1
+    assert jobs.get(first)['status'] == JobQueue.QUEUED
+    count = jobs._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    assert count == 1
+
+
+def test_restart_requeues_queued_and_running_jobs(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    crashed = JobQueue(lambda payload: {}, db_path=db_path)
+    queued = crashed.submit({'n': 1})
+    running = crashed.submit({'n': 2})
+    # Süreç iş yarıdayken öldü
+    with crashed._db:
+        crashed._db.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                            (JobQueue.RUNNING, time.time(), running))
+
+    seen = []
+    lock = threading.Lock()
+
+    def handler(payload):
+        with lock:
+            seen.append(payload['n'])
+        return {}
+
+    restarted = JobQueue(handler, db_path=db_path)
+    restarted.start()
+
+    wait_for_status(restarted, queued, JobQueue.DONE)
+    wait_for_status(restarted, running, JobQueue.DONE)
+    assert sorted(seen) == [1, 2]
+
+
+def test_expire_result_marks_only_jobs_pointing_at_file(tmp_path):
+    jobs = JobQueue(lambda payload: {'filename': payload['file']}, db_path=str(tmp_path / 'jobs.db'))
+    jobs.start()
+    swept = jobs.submit({'file': '1_a.png'})
+    similar = jobs.submit({'file': '1xa.png'})
+    wait_for_status(jobs, swept, JobQueue.DONE)
+    wait_for_status(jobs, similar, JobQueue.DONE)
+
+    assert jobs.expire_result('1_a.png') == 1
+
+    assert jobs.get(swept)['status'] == JobQueue.EXPIRED
+    assert jobs.get(similar)['status'] == JobQueue.DONE
+
+
+def test_prune_removes_old_finished_jobs_only(tmp_path):
+    jobs = JobQueue(lambda payload: {}, db_path=str(tmp_path / 'jobs.db'))
+    jobs.start()
+    finished = jobs.submit({})
+    wait_for_status(jobs, finished, JobQueue.DONE)
+    with jobs._db:
+        jobs._db.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (time.time() - 3600, finished))
+    # Worker durdurulmuş gibi: yeni iş kuyrukta beklesin
+    pending = JobQueue(lambda payload: {}, db_path=str(tmp_path / 'jobs.db')).submit({})
+
+    assert jobs.prune(60) == 1
+
+    assert jobs.get(finished) is None
+    assert jobs.get(pending)['status'] == JobQueue.QUEUED
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from mask_cache import MaskCache  # noqa: E402
+
+
+def make_mask(width=8, height=6, value=255):
+    pixels = np.zeros((height, width), dtype=np.uint8)
+    pixels[1:-1, 2:-2] = value
+    return Image.fromarray(pixels, mode="L")
+
+
+def test_round_trip_keeps_every_mask(tmp_path):
+    cache = MaskCache(str(tmp_path))
+    masks = [make_mask(value=255), make_mask(value=128)]
+
+    cache.put('k', masks)
+    loaded = cache.get('k')
+
+    assert len(loaded) == 2
+    for original, restored in zip(masks, loaded):
+        assert restored.mode == "L"
+        assert restored.size == original.size
+        assert restored.tobytes() == original.tobytes()
+
+
+def test_key_depends_on_pixels_and_model():
+    img = Image.new("RGB", (4, 4), (255, 255, 255))
+    other = Image.new("RGB", (4, 4), (250, 255, 255))
+
+    key = MaskCache.make_key(img, 'isnet-general-use')
+
+    assert key == MaskCache.make_key(img.copy(), 'isnet-general-use')
+    assert key != MaskCache.make_key(img, 'u2netp')
+    assert key != MaskCache.make_key(other, 'isnet-general-use')
+
+
+def test_get_or_predict_runs_model_once(tmp_path):
+    cache = MaskCache(str(tmp_path))
+    img = Image.new("RGB", (8, 6), (200, 10, 10))
+    calls = []
+
+    def predict(image):
+        calls.append(image)
+        return [make_mask()]
+
+    first = cache.get_or_predict(img, 'isnet-general-use', predict)
+    second = cache.get_or_predict(img, 'isnet-general-use', predict)
+
+    assert len(calls) == 1
+    assert second[0].tobytes() == first[0].tobytes()
+    assert cache.stats()['hits'] == 1
+
+
+def test_index_survives_restart_and_evicts_oldest(tmp_path):
+    cache = MaskCache(str(tmp_path))
+    cache.put('a', [make_mask()])
+    size = cache.stats()['disk_bytes']
+
+    restarted = MaskCache(str(tmp_path), max_disk_bytes=size * 2)
+    assert restarted.get('a') is not None
+    restarted.put('b', [make_mask()])
+    restarted.put('c', [make_mask()])
+
+    assert restarted.get('a') is None
+    assert not (tmp_path / 'a.npy').exists()
+    assert restarted.get('c') is not None
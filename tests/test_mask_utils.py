@@ -0,0 +1,152 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+pytest.importorskip('cv2')
+
+from mask_utils import encode_mask_rle, mask_bbox, mask_confidence, usable_alpha  # noqa: E402
+
+
+def mask_from_rows(rows):
+    return Image.fromarray(np.array(rows, dtype=np.uint8), mode="L")
+
+
+def rectangles(*boxes, size=(200, 200)):
+    pixels = np.zeros((size[1], size[0]), dtype=np.uint8)
+    for left, top, right, bottom in boxes:
+        pixels[top:bottom, left:right] = 255
+    return Image.fromarray(pixels, mode="L")
+
+
+def decode_rle(rle):
+    width, height = rle['size']
+    values = []
+    for index, count in enumerate(rle['counts']):
+        values.extend([index % 2 == 1] * count)
+    return np.array(values, dtype=bool).reshape(height, width)
+
+
+def test_rle_starting_with_foreground_has_leading_zero():
+    rle = encode_mask_rle(mask_from_rows([[255, 255, 0, 255]]))
+
+    assert rle['counts'] == [0, 2, 1, 1]
+    assert rle['size'] == [4, 1]
+
+
+def test_rle_starting_with_background():
+    rle = encode_mask_rle(mask_from_rows([[0, 0, 200, 0]]))
+
+    assert rle['counts'] == [2, 1, 1]
+
+
+def test_rle_uniform_masks():
+    assert encode_mask_rle(mask_from_rows([[255] * 3] * 2))['counts'] == [0, 6]
+    assert encode_mask_rle(mask_from_rows([[0] * 3] * 2))['counts'] == [6]
+
+
+def test_rle_round_trip_is_row_major_and_respects_threshold():
+    rows = [
+        [255, 0, 0, 127],
+        [128, 255, 0, 0],
+        [0, 0, 255, 255]
+    ]
+    rle = encode_mask_rle(mask_from_rows(rows), threshold=128)
+
+    expected = np.array(rows) >= 128
+    assert (decode_rle(rle) == expected).all()
+    assert sum(rle['counts']) == 12
+
+
+def test_mask_bbox():
+    mask = mask_from_rows([
+        [0, 0, 0, 0],
+        [0, 200, 90, 0],
+        [0, 0, 255, 0]
+    ])
+
+    assert mask_bbox(mask) == {'x': 1, 'y': 1, 'width': 2, 'height': 2}
+    assert mask_bbox(mask_from_rows([[10, 20]])) is None
+
+
+def test_confidence_of_empty_mask_is_zero():
+    confidence = mask_confidence(rectangles())
+
+    assert confidence['score'] == 0.0
+    assert confidence['components'] == 0
+
+
+def test_crisp_single_object_is_confident():
+    confidence = mask_confidence(rectangles((50, 50, 150, 150)))
+
+    assert confidence['uncertain_fraction'] == 0.0
+    assert confidence['largest_component_share'] == 1.0
+    assert confidence['components'] == 1
+    assert confidence['edge_sharpness'] > 0.8
+    assert confidence['score'] > 0.8
+
+
+def test_blurry_mask_scores_lower():
+    from PIL import ImageFilter
+
+    crisp = rectangles((50, 50, 150, 150))
+    blurry = crisp.filter(ImageFilter.GaussianBlur(8))
+
+    crisp_confidence = mask_confidence(crisp)
+    blurry_confidence = mask_confidence(blurry)
+
+    assert blurry_confidence['uncertain_fraction'] > 0.2
+    assert blurry_confidence['edge_sharpness'] < crisp_confidence['edge_sharpness']
+    assert blurry_confidence['score'] < crisp_confidence['score']
+
+
+def test_fragmented_mask_scores_lower():
+    confidence = mask_confidence(rectangles((20, 20, 80, 80), (120, 120, 180, 180)))
+
+    assert confidence['components'] == 2
+    assert confidence['largest_component_share'] == 0.5
+    assert confidence['score'] <= 0.5
+
+
+
+def cutout(alpha_mask, mode="RGBA"):
+    img = Image.new("RGB", alpha_mask.size, (20, 40, 120))
+    img.putalpha(alpha_mask)
+    return img.convert(mode)
+
+
+def test_usable_alpha_accepts_cutout():
+    mask = rectangles((50, 50, 150, 150))
+
+    alpha = usable_alpha(cutout(mask))
+
+    assert alpha is not None
+    assert alpha.tobytes() == mask.tobytes()
+    assert usable_alpha(cutout(mask, mode="LA")) is not None
+
+
+def test_usable_alpha_accepts_large_cutout_and_palette_transparency():
+    assert usable_alpha(cutout(rectangles((200, 100, 800, 700), size=(1000, 800)))) is not None
+
+    palette = Image.new("P", (100, 100), 0)
+    palette.paste(1, (25, 25, 75, 75))
+    palette.info['transparency'] = 0
+    assert usable_alpha(palette) is not None
+
+
+def test_usable_alpha_rejects_images_without_meaningful_alpha():
+    # Alfa kanalı yok
+    assert usable_alpha(Image.new("RGB", (100, 100))) is None
+    # Tamamen opak
+    assert usable_alpha(Image.new("RGBA", (100, 100), (20, 40, 120, 255))) is None
+    # Tamamen saydam
+    assert usable_alpha(Image.new("RGBA", (100, 100), (20, 40, 120, 0))) is None
+
+
+def test_usable_alpha_foreground_bounds():
+    # Köşeleri yuvarlatılmış opak fotoğraf: ön plan > %95
+    assert usable_alpha(cutout(rectangles((2, 2, 198, 198)))) is None
+    # Neredeyse boş: ön plan < %2
+    assert usable_alpha(cutout(rectangles((0, 0, 20, 20)))) is None
+    # Sınırların içi kabul edilir
+    assert usable_alpha(cutout(rectangles((0, 0, 40, 40)))) is not None
+    assert usable_alpha(cutout(rectangles((0, 0, 194, 194)))) is not None
@@ -0,0 +1,29 @@
+from metrics import STAGE_SECONDS, StageClock
+from stage_timings import StageTimings
+
+
+def stage_count(stage, model):
+    return STAGE_SECONDS._values.get((stage, model), [0])[-1]
+
+
+def test_stage_clock_labels_with_model_known_after_block():
+    timings = StageTimings()
+    before_studio = stage_count('preprocess', 'studio')
+    before_model = stage_count('preprocess', 'isnet-general-use')
+
+    with StageClock('preprocess', timings) as clock:
+        pass
+    clock.observe('studio')
+
+    assert stage_count('preprocess', 'studio') == before_studio + 1
+    assert stage_count('preprocess', 'isnet-general-use') == before_model
+    assert timings.wall_seconds('preprocess') == clock.wall_seconds
+
+
+def test_stage_clock_not_observed_until_block_finishes():
+    clock = StageClock('decode')
+    before = stage_count('decode', 'studio')
+
+    clock.observe('studio')
+
+    assert stage_count('decode', 'studio') == before
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import model_discovery
+from model_discovery import read_cached_selection, write_cached_selection
+
+
+@pytest.fixture
+def model_home(tmp_path, monkeypatch):
+    monkeypatch.setenv('U2NET_HOME', str(tmp_path))
+    monkeypatch.setattr(model_discovery, '_verified_files', {})
+    return tmp_path
+
+
+def write_model(home, name, data):
+    path = home / f"{name}.onnx"
+    path.write_bytes(data)
+    return path
+
+
+def test_cached_selection_round_trip(model_home):
+    write_model(model_home, 'isnet-general-use', b'a' * 64)
+    cache_path = str(model_home / 'selection.json')
+
+    write_cached_selection('isnet-general-use', ['isnet-general-use', 'u2net'], cache_path)
+
+    assert read_cached_selection(['isnet-general-use', 'u2net'], cache_path) == 'isnet-general-use'
+    assert read_cached_selection(['u2net'], cache_path) is None
+
+
+def test_same_size_replacement_with_restored_mtime_is_rejected(model_home):
+    path = write_model(model_home, 'isnet-general-use', b'a' * 64)
+    cache_path = str(model_home / 'selection.json')
+    write_cached_selection('isnet-general-use', ['isnet-general-use'], cache_path)
+    stat = os.stat(path)
+
+    path.write_bytes(b'b' * 64)
+    os.utime(path, (stat.st_atime, stat.st_mtime))
+
+    assert read_cached_selection(['isnet-general-use'], cache_path) is None
+
+
+def test_touched_but_identical_file_is_accepted(model_home):
+    path = write_model(model_home, 'isnet-general-use', b'a' * 64)
+    cache_path = str(model_home / 'selection.json')
+    write_cached_selection('isnet-general-use', ['isnet-general-use'], cache_path)
+
+    os.utime(path, (0, 1_000_000))
+
+    assert read_cached_selection(['isnet-general-use'], cache_path) == 'isnet-general-use'
+
+
+def test_size_change_is_rejected(model_home):
+    path = write_model(model_home, 'isnet-general-use', b'a' * 64)
+    cache_path = str(model_home / 'selection.json')
+    write_cached_selection('isnet-general-use', ['isnet-general-use'], cache_path)
+
+    path.write_bytes(b'a' * 32)
+
+    assert read_cached_selection(['isnet-general-use'], cache_path) is None
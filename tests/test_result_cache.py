@@ -0,0 +1,95 @@
+import os
+
+from result_cache import ResultCache
+
+
+def make_entry(size, **extra):
+    entry = {
+        'result': b'r' * size,
+        'variants': {},
+        'model_used': 'isnet-general-use',
+        'variant_sizes': {'square': [1024, 1024]}
+    }
+    entry.update(extra)
+    return entry
+
+
+def test_make_key_depends_on_bytes_and_options():
+    key = ResultCache.make_key(b'img', {'model': 'ultra', 'enhance': True})
+
+    assert key == ResultCache.make_key(b'img', {'enhance': True, 'model': 'ultra'})
+    assert key != ResultCache.make_key(b'img', {'model': 'ultra', 'enhance': False})
+    assert key != ResultCache.make_key(b'other', {'model': 'ultra', 'enhance': True})
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_bytes=250, max_disk_bytes=0)
+    cache.put('a', make_entry(100))
+    cache.put('b', make_entry(100))
+    assert cache.get('a') is not None
+
+    cache.put('c', make_entry(100))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.stats()['memory_bytes'] == 200
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_bytes=0, max_disk_bytes=2000)
+    cache.put('a', make_entry(700))
+    cache.put('b', make_entry(700))
+    assert cache.get('a') is not None
+
+    cache.put('c', make_entry(700))
+
+    assert cache.get('b') is None
+    assert not os.path.exists(tmp_path / 'b.png')
+    assert not os.path.exists(tmp_path / 'b.json')
+    assert cache.get('a')['result'] == b'r' * 700
+    assert cache.stats()['disk_entries'] == 2
+
+
+def test_restart_reloads_entry_with_full_metadata(tmp_path):
+    cascade = {'tier': 'heavy', 'confidence': 0.31, 'threshold': 0.5}
+    cache = ResultCache(str(tmp_path))
+    cache.put('k', make_entry(10, quality_tier='reduced', cascade=cascade))
+    cache.put_variant('k', 'square', b'v' * 5)
+
+    restarted = ResultCache(str(tmp_path))
+    entry = restarted.get('k')
+
+    assert entry['result'] == b'r' * 10
+    assert entry['variants'] == {'square': b'v' * 5}
+    assert entry['model_used'] == 'isnet-general-use'
+    assert entry['quality_tier'] == 'reduced'
+    assert entry['cascade'] == cascade
+    assert entry['variant_sizes'] == {'square': [1024, 1024]}
+    assert restarted.stats()['disk_bytes'] == 10 + 5 + os.path.getsize(tmp_path / 'k.json')
+
+
+def test_materialize_rewrites_missing_files(tmp_path):
+    cache = ResultCache(str(tmp_path), max_disk_bytes=0)
+    entry = make_entry(10, variants={'square': b'v'})
+    cache.put('k', entry)
+
+    files = cache.materialize('k', entry)
+
+    assert files == {'result': 'k.png', 'variants': {'square': 'k_square.png'}}
+    assert (tmp_path / 'k_square.png').read_bytes() == b'v'
+
+
+def test_lazy_variants_respect_memory_budget(tmp_path):
+    cache = ResultCache(str(tmp_path), max_memory_bytes=1000, max_disk_bytes=0)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, make_entry(100))
+        cache.get(key)
+        for name in ('square', 'portrait', 'landscape'):
+            cache.put_variant(key, name, b'v' * 100)
+            assert cache.stats()['memory_bytes'] <= 1000
+
+    # Her girdi 400 byte: en eski kullanılan tahliye edildi
+    assert cache.stats()['memory_entries'] == 2
+    assert cache.get('a') is None
+    assert len(cache.get('c')['variants']) == 3
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('rembg')
+pytest.importorskip('onnxruntime')
+
+from session_pool import SessionPool  # noqa: E402
+
+
+def fixed_size_pool(factory, size=100, budget=250):
+    pool = SessionPool(memory_budget_bytes=budget, session_factory=factory)
+    pool._estimate_memory = lambda model_name, precision, rss_before: size
+    return pool
+
+
+def test_same_model_is_loaded_once():
+    calls = []
+    pool = fixed_size_pool(lambda name: calls.append(name) or object())
+
+    assert pool.get('u2netp') is pool.get('u2netp')
+    assert calls == ['u2netp']
+
+
+def test_precision_variants_are_separate_sessions():
+    pool = fixed_size_pool(lambda name, precision='fp32': (name, precision))
+
+    assert pool.get('u2netp') == ('u2netp', 'fp32')
+    assert pool.get('u2netp', precision='int8') == ('u2netp', 'int8')
+    assert pool.loaded_models() == ['u2netp', 'u2netp@int8']
+
+
+def test_budget_evicts_least_recently_used():
+    pool = fixed_size_pool(lambda name: name)
+    pool.get('a')
+    pool.get('b')
+    pool.get('a')
+
+    pool.get('c')
+
+    assert pool.loaded_models() == ['a', 'c']
+
+
+def test_cold_load_does_not_block_loaded_sessions():
+    release = threading.Event()
+    started = threading.Event()
+
+    def factory(name):
+        if name == 'slow':
+            started.set()
+            assert release.wait(5)
+        return name
+
+    pool = fixed_size_pool(factory, budget=10 ** 6)
+    pool.get('warm')
+    loader = threading.Thread(target=pool.get, args=('slow',))
+    loader.start()
+    assert started.wait(5)
+
+    start = time.perf_counter()
+    assert pool.get('warm') == 'warm'
+    assert time.perf_counter() - start < 1
+
+    release.set()
+    loader.join(5)
+    assert pool.loaded_models() == ['warm', 'slow']
+
+
+def test_concurrent_misses_share_one_load():
+    calls = []
+    gate = threading.Event()
+
+    def factory(name):
+        calls.append(name)
+        assert gate.wait(5)
+        return object()
+
+    pool = fixed_size_pool(factory, budget=10 ** 6)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get('isnet'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ['isnet']
+    assert len(results) == 4 and all(session is results[0] for session in results)
+
+
+def test_failed_load_is_retried_by_next_caller():
+    attempts = []
+
+    def factory(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise RuntimeError('indirme başarısız')
+        return name
+
+    pool = fixed_size_pool(factory)
+
+    with pytest.raises(RuntimeError):
+        pool.get('isnet')
+    assert pool.get('isnet') == 'isnet'
+    assert len(attempts) == 2
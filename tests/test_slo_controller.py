@@ -0,0 +1,105 @@
+import pytest
+
+from slo_controller import SloController, percentile
+
+TIERS = [
+    {'name': 'full', 'model_name': None, 'max_dim': None},
+    {'name': 'reduced', 'model_name': None, 'max_dim': 1024},
+    {'name': 'light', 'model_name': 'u2netp', 'max_dim': 1024},
+]
+
+
+def controller(backlog=0, **kwargs):
+    depth = {'value': backlog}
+    slo = SloController(TIERS, target_p95_ms=1000, queue_depth=lambda: depth['value'], **kwargs)
+    return slo, depth
+
+
+def record(slo, name, ms, count=20):
+    for _ in range(count):
+        slo.record(name, ms / 1000)
+
+
+def test_percentile_interpolates():
+    assert percentile([], 95) is None
+    assert percentile([10], 95) == 10
+    assert percentile([0, 100], 50) == 50
+    assert percentile(list(range(101)), 95) == pytest.approx(95)
+
+
+def test_unmeasured_tiers_choose_full_quality():
+    slo, _ = controller(backlog=10)
+
+    plan = slo.choose()
+
+    assert plan['name'] == 'full'
+    assert plan['predicted_ms'] is None
+
+
+def test_backlog_moves_to_lighter_tiers():
+    slo, depth = controller()
+    record(slo, 'full', 400)
+    record(slo, 'reduced', 150)
+    record(slo, 'light', 50)
+
+    assert slo.choose()['name'] == 'full'
+
+    # full: 400 x 3 > 1000, reduced: 150 x 3 <= 1000
+    depth['value'] = 2
+    plan = slo.choose()
+    assert plan['name'] == 'reduced'
+    assert plan['predicted_ms'] == pytest.approx(450)
+
+    depth['value'] = 9
+    assert slo.choose()['name'] == 'light'
+
+
+def test_lightest_tier_when_nothing_meets_target():
+    slo, _ = controller(backlog=100)
+    for tier in TIERS:
+        record(slo, tier['name'], 500)
+
+    plan = slo.choose()
+
+    assert plan['name'] == 'light'
+    assert plan['predicted_ms'] is None
+
+
+def test_in_flight_requests_count_as_backlog():
+    slo, _ = controller()
+    record(slo, 'full', 400)
+    record(slo, 'reduced', 100)
+
+    with slo.track({'name': 'full'}), slo.track({'name': 'full'}):
+        assert slo.in_flight == 2
+        assert slo.choose()['name'] == 'reduced'
+
+    assert slo.in_flight == 0
+    assert slo.choose()['name'] == 'full'
+
+
+def test_stale_samples_expire_and_full_quality_returns():
+    slo, _ = controller(backlog=5, max_sample_age=0.05)
+    record(slo, 'full', 900)
+    assert slo.choose()['name'] != 'full'
+
+    with slo._lock:
+        samples = slo._samples['full']
+        aged = [(at - 1, ms) for at, ms in samples]
+        samples.clear()
+        samples.extend(aged)
+
+    assert slo.tier_p95_ms('full') is None
+    assert slo.choose()['name'] == 'full'
+
+
+def test_failed_request_is_not_recorded():
+    slo, _ = controller()
+
+    with pytest.raises(RuntimeError):
+        with slo.track({'name': 'full'}):
+            raise RuntimeError('model hatası')
+
+    assert slo.in_flight == 0
+    assert slo.tier_p95_ms('full') is None
+    assert slo.stats()['tiers'][0]['chosen'] == 0
@@ -0,0 +1,103 @@
+import os
+import time
+
+from storage_manager import StorageCategory, StorageManager, is_orphaned_cache_file, is_temp_file
+
+
+def write(path, size, age=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_ttl_deletes_only_expired_files(tmp_path):
+    old = write(tmp_path / 'old.png', 10, age=120)
+    fresh = write(tmp_path / 'fresh.png', 10, age=5)
+    manager = StorageManager([StorageCategory('processed', str(tmp_path), ttl_seconds=60)])
+
+    manager.sweep()
+
+    assert not old.exists()
+    assert fresh.exists()
+    metrics = manager.stats()['categories']['processed']
+    assert metrics == {'files': 1, 'bytes': 10, 'deleted_files': 1, 'deleted_bytes': 10}
+
+
+def test_size_cap_evicts_oldest_and_skips_non_evictable(tmp_path):
+    jobs = tmp_path / 'jobs'
+    processed = tmp_path / 'processed'
+    queued = write(jobs / 'queued.png', 500, age=300)
+    oldest = write(processed / 'a.png', 100, age=200)
+    middle = write(processed / 'b.png', 100, age=100)
+    newest = write(processed / 'c.png', 100, age=10)
+    manager = StorageManager(
+        [
+            StorageCategory('job_uploads', str(jobs), evictable=False),
+            StorageCategory('processed', str(processed)),
+        ],
+        max_total_bytes=150
+    )
+
+    manager.sweep()
+
+    # Boyut sınırı sadece tahliye edilebilir dosyalara uygulanır
+    assert queued.exists()
+    assert not oldest.exists()
+    assert not middle.exists()
+    assert newest.exists()
+
+
+def test_match_limits_deletion_but_not_metrics(tmp_path):
+    orphan = write(tmp_path / 'abc_square.png', 10, age=120)
+    tmp_file = write(tmp_path / 'def.json.tmp', 10, age=120)
+    owned = write(tmp_path / 'key.png', 10, age=120)
+    write(tmp_path / 'key.json', 10, age=120)
+    manager = StorageManager([
+        StorageCategory('result_cache', str(tmp_path), ttl_seconds=60, evictable=False, match=is_orphaned_cache_file)
+    ])
+
+    manager.sweep()
+
+    assert not orphan.exists()
+    assert not tmp_file.exists()
+    assert owned.exists()
+    assert manager.stats()['categories']['result_cache']['files'] == 2
+
+
+def test_recursive_scan_honours_exclude_dirs(tmp_path):
+    nested = write(tmp_path / 'workspace' / 'part.png', 10, age=120)
+    excluded = write(tmp_path / 'jobs' / 'queued.png', 10, age=120)
+    manager = StorageManager([
+        StorageCategory('uploads', str(tmp_path), ttl_seconds=60, recursive=True, exclude_dirs=('jobs',))
+    ])
+
+    manager.sweep()
+
+    assert not nested.exists()
+    assert excluded.exists()
+
+
+def test_callbacks_report_ttl_and_eviction_deletes(tmp_path):
+    expired = write(tmp_path / 'expired.png', 10, age=120)
+    evicted = write(tmp_path / 'evicted.png', 100, age=30)
+    write(tmp_path / 'kept.png', 100, age=1)
+    deleted = []
+    sweeps = []
+    manager = StorageManager(
+        [StorageCategory('processed', str(tmp_path), ttl_seconds=60)],
+        max_total_bytes=150,
+        on_delete=lambda category, path: deleted.append((category, path)),
+        after_sweep=lambda: sweeps.append(True)
+    )
+
+    manager.sweep()
+
+    assert sorted(deleted) == [('processed', str(evicted)), ('processed', str(expired))]
+    assert sweeps == [True]
+
+
+def test_file_predicates():
+    assert is_temp_file('/cache/abc.png.tmp')
+    assert not is_temp_file('/cache/abc.png')
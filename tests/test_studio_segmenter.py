@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+pytest.importorskip('cv2')
+
+from studio_segmenter import detect_uniform_background, guided_filter, studio_alpha  # noqa: E402
+
+WHITE = (255, 255, 255)
+NAVY = (20, 40, 120)
+
+
+def studio_shot(background=WHITE, garment=(96, 48, 224, 208), print_box=(144, 112, 176, 144), size=(320, 240)):
+    """Düz fonda dikdörtgen kıyafet, ortasında fon renginde baskı"""
+    pixels = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    pixels[:] = background
+    left, top, right, bottom = garment
+    pixels[top:bottom, left:right] = NAVY
+    if print_box:
+        left, top, right, bottom = print_box
+        pixels[top:bottom, left:right] = background
+    return Image.fromarray(pixels, mode="RGB")
+
+
+def test_plain_backdrop_is_uniform():
+    info = detect_uniform_background(studio_shot())
+
+    assert info['uniform']
+    assert info['coverage'] == 1.0
+    assert info['spread'] == 0.0
+
+
+def test_gradient_backdrop_is_not_uniform():
+    ramp = np.tile(np.linspace(0, 255, 320, dtype=np.uint8), (240, 1))
+    img = Image.fromarray(np.stack([ramp] * 3, axis=-1), mode="RGB")
+
+    assert not detect_uniform_background(img)['uniform']
+
+
+def test_studio_alpha_cuts_garment_and_keeps_backdrop_coloured_print():
+    mask, info = studio_alpha(studio_shot())
+
+    assert mask is not None, info
+    assert mask.size == (320, 240)
+    alpha = np.asarray(mask)
+    # Köşe fon, kıyafet ve içindeki beyaz baskı ön plan
+    assert alpha[5, 5] < 32
+    assert alpha[100, 110] > 224
+    assert alpha[128, 160] > 224
+    assert info['foreground'] == pytest.approx(128 * 160 / (320 * 240), abs=0.02)
+    assert info['confidence'] >= 0.4
+
+
+def test_grey_backdrop_works_too():
+    mask, info = studio_alpha(studio_shot(background=(200, 200, 200)))
+
+    assert mask is not None, info
+
+
+def test_non_uniform_backdrop_falls_back_to_model():
+    img = studio_shot()
+    pixels = np.asarray(img).copy()
+    pixels[:, :160] = (30, 30, 30)
+
+    mask, info = studio_alpha(Image.fromarray(pixels, mode="RGB"))
+
+    assert mask is None
+    assert info['reason'] == 'non_uniform_background'
+
+
+def test_tiny_object_falls_back_to_model():
+    mask, info = studio_alpha(studio_shot(garment=(160, 120, 166, 126), print_box=None))
+
+    assert mask is None
+    assert info['reason'] in ('foreground_out_of_range', 'no_foreground')
+
+
+def test_guided_filter_keeps_constant_source():
+    guide = np.random.default_rng(0).random((32, 32)).astype(np.float32)
+    src = np.full((32, 32), 0.75, dtype=np.float32)
+
+    assert np.allclose(guided_filter(guide, src), 0.75, atol=1e-4)
@@ -9,17 +9,63 @@ import sys
 from pathlib import Path
 from PIL import Image, ImageEnhance, ImageFilter
 import numpy as np
-from rembg import remove, new_session
+from rembg import remove
 import cv2
 import time
 import logging
+import threading
 import traceback
 
+from batch_scheduler import BatchScheduler
+from image_io import open_image
+from mask_utils import apply_masks, combine_masks, mask_confidence, usable_alpha
+from metrics import StageClock, stage_timer
+from stage_timings import StageTimings
+from studio_segmenter import studio_alpha
+from session_pool import get_session_pool
+from model_discovery import (local_files_ok, measured_score, read_model_profile, resolve_precision, select_model,
+                             session_key)
+from onnx_tuning import machine_shape, profile_key
+from variant_utils import render_variant
+
 # Logger setup
 logger = logging.getLogger(__name__)
 
 class UltraClothingBgRemover:
-    def __init__(self):
+    # Varyant boyutları (create_variants / render_variants)
+    VARIANT_SIZES = {
+        "thumbnail": (200, 200),
+        "small": (400, 400),
+        "medium": (800, 800),
+        "large": (1200, 1200),
+        "xl": (1600, 1600)
+    }
+    
+    # Model seçiminde gecikme bütçesi (ms) - ölçülmüş gecikmesi bunu aşan modellerin skoru düşer
+    DEFAULT_LATENCY_BUDGET_MS = 3000
+    
+    # Yük altında kullanılan hafif modeller, öncelik sırasıyla (slo_controller.py)
+    LIGHT_MODELS = ('u2netp', 'silueta')
+    
+    # Akıllı ön işlemede uzun kenar sınırı - daha küçüğü istek bazında verilebilir
+    DEFAULT_MAX_DIM = 2048
+    
+    # Kademeli modda hafif modelin maskesi bu güvenin altındaysa seçili model çalışır;
+    # ölçülmüş eşik model_benchmark.py --cascade ile profile yazılır
+    DEFAULT_CASCADE_THRESHOLD = 0.5
+    
+    # Düz stüdyo fonunda sinir ağı yerine klasik segmentasyon çalıştığında raporlanan model
+    STUDIO_LABEL = 'studio'
+    
+    # Girdi zaten kesilmişse (anlamlı alfa kanalı) model çalışmaz; raporlanan model
+    INPUT_ALPHA_LABEL = 'input_alpha'
+    
+    # Seçili model hata verince sonucu rembg'nin varsayılan u2net'i ürettiğinde raporlanan model
+    FALLBACK_LABEL = 'u2net_fallback'
+    
+    def __init__(self, batch_size=1, batch_wait_ms=10, mask_cache=None, session_pool=None, precision='fp32',
+                 latency_budget_ms=None, cascade=False, cascade_threshold=None, studio_fast_path=False,
+                 reuse_input_alpha=False):
         # En son ve en gelişmiş modeller
         self.premium_models = {
             'isnet-general-use': {
@@ -49,60 +95,261 @@ class UltraClothingBgRemover:
                 'speed': 85,
                 'clothing_score': 88,
                 'recommended': True
+            },
+            'u2netp': {
+                'description': 'U2Net hafif sürüm - yük altında hızlı yol',
+                'quality': 70,
+                'speed': 98,
+                'clothing_score': 70,
+                'recommended': False
+            },
+            'silueta': {
+                'description': 'Silueta - küçültülmüş u2net',
+                'quality': 75,
+                'speed': 95,
+                'clothing_score': 72,
+                'recommended': False
             }
         }
         
         self.best_model = None
-        self.session = None
+        # İstenen hassasiyet ('fp32' / 'int8'); model için kullanılamazsa fp32'ye düşer
+        self.requested_precision = precision
+        self.precision = 'fp32'
+        # Session'lar süreç genelindeki havuzdan alınır (diğer remover'larla paylaşılır)
+        self.session_pool = session_pool or get_session_pool()
+        self.scheduler = None
+        # best_model dışındaki modellerin zamanlayıcıları (hafif / sabitlenmiş modeller)
+        self.schedulers = {}
+        self.batch_size = batch_size
+        self.batch_wait_ms = batch_wait_ms
+        self._scheduler_lock = threading.Lock()
+        self._light_model = None
+        # Ham model maskelerinin önbelleği (isteğe bağlı, MaskCache)
+        self.mask_cache = mask_cache
+        self.latency_budget_ms = latency_budget_ms or self.DEFAULT_LATENCY_BUDGET_MS
         self.auto_select_best_model()
         
+        # Stüdyo hızlı yolu: düz fonlu görüntülerde model hiç çalışmaz (studio_segmenter.py)
+        self.studio_fast_path = studio_fast_path
+        
+        # Alfa kanalı zaten ön plan maskesi olan girdiler (ör. kendi çıktılarımız) modele gitmez
+        self.reuse_input_alpha = reuse_input_alpha
+        
+        # Kademeli mod: önce hafif model, güven düşükse seçili model
+        self.cascade = cascade
+        self.cascade_threshold = cascade_threshold
+        if cascade:
+            if self.cascade_threshold is None:
+                self.cascade_threshold = self.measured_cascade_threshold()
+            logger.info(f"🪜 Kademeli mod: {self.light_model or '-'} -> {self.model_label}, "
+                        f"güven eşiği {self.cascade_threshold:.3f}")
+        
+        # Eşzamanlı istekleri tek ONNX çalıştırmasında toplayan zamanlayıcı
+        if self.best_model != 'simple_ultra':
+            self.scheduler = BatchScheduler(
+                lambda: self.session_pool.get(self.best_model, self.precision),
+                self.best_model, batch_size, batch_wait_ms
+            )
+        
+    @property
+    def session(self):
+        """
+        Seçili modelin session'ı - havuzdan alınır, model yoksa None
+        """
+        if self.best_model in (None, 'simple_ultra'):
+            return None
+        return self.session_pool.get(self.best_model, self.precision)
+    
+    @property
+    def model_label(self):
+        """
+        Yanıtlarda raporlanan model adı, ör. 'u2net_cloth_seg@int8'
+        """
+        return session_key(self.best_model, self.precision)
+    
+    def label_for(self, model_name=None):
+        """
+        Verilen model için raporlanan ad (model_name None ise seçili model)
+        """
+        if model_name in (None, self.best_model):
+            return self.model_label
+        return session_key(model_name, resolve_precision(model_name, self.requested_precision))
+    
+    def scheduler_for(self, model_name=None):
+        """
+        Modelin mikro-batch zamanlayıcısı - seçili model dışındakiler ilk kullanımda kurulur
+        """
+        if model_name in (None, self.best_model):
+            return self.scheduler
+        
+        with self._scheduler_lock:
+            scheduler = self.schedulers.get(model_name)
+            if scheduler is None:
+                if model_name not in self.premium_models:
+                    raise ValueError(f"Bilinmeyen model: {model_name}")
+                precision = resolve_precision(model_name, self.requested_precision)
+                # Yüklenemeyen model zamanlayıcı kurulmadan hata versin
+                self.session_pool.get(model_name, precision)
+                scheduler = BatchScheduler(
+                    lambda: self.session_pool.get(model_name, precision),
+                    model_name, self.batch_size, self.batch_wait_ms
+                )
+                self.schedulers[model_name] = scheduler
+        return scheduler
+    
+    @property
+    def light_model(self):
+        """
+        Yerel dosyası olan ilk hafif model, yoksa None
+        İstek sırasında model indirilmesin diye sadece yereldeki modellere bakılır.
+        """
+        if self._light_model is None:
+            self._light_model = next((m for m in self.LIGHT_MODELS if local_files_ok(m)), '')
+        return self._light_model or None
+    
+    def input_alpha(self, img, model_name=None):
+        """
+        Alfa yeniden kullanılacaksa girdinin alfa maskesi, değilse None
+        Model sabitlenmişse (model_name) istemci o modelin maskesini istiyordur.
+        """
+        if not self.reuse_input_alpha or model_name is not None:
+            return None
+        alpha = usable_alpha(img)
+        if alpha is not None:
+            logger.info(f"♻️ Girdi zaten kesilmiş, alfa kanalı kullanılıyor: {img.size[0]}x{img.size[1]}")
+        return alpha
+    
+    def studio_masks(self, img, timings=None):
+        """
+        Fon düz stüdyo fonuysa klasik segmentasyon maskeleri, değilse None
+        """
+        try:
+            with stage_timer('inference', self.STUDIO_LABEL, timings):
+                mask, info = studio_alpha(img)
+        except Exception as e:
+            logger.warning(f"⚠️ Stüdyo yolu hatası: {e}")
+            return None
+        
+        if mask is None:
+            logger.info(f"🎞️ Stüdyo yolu atlandı: {info['reason']}")
+            return None
+        logger.info(f"🎞️ Stüdyo yolu: kapsama {info['coverage']}, güven {info['confidence']}")
+        return [mask]
+    
+    def cascade_profile_key(self):
+        return profile_key(f"{self.light_model}>{self.best_model}", machine_shape())
+    
+    def measured_cascade_threshold(self):
+        """
+        Bu makine ve model çifti için ölçülmüş güven eşiği, yoksa varsayılan
+        """
+        measured = read_model_profile().get('cascade', {}).get(self.cascade_profile_key())
+        if measured:
+            return measured['threshold']
+        return self.DEFAULT_CASCADE_THRESHOLD
+    
+    def cascade_masks(self, img, timings=None):
+        """
+        Kademeli çıkarım: hafif modelin maskesi yeterince güvenliyse o döner,
+        değilse seçili model çalışır
+        Dönüş: (maskeler, {'model': sunan model, 'cascade': {'tier', 'confidence', 'threshold'}})
+        """
+        light = self.light_model
+        if light is None or light == self.best_model:
+            with stage_timer('inference', self.model_label, timings):
+                return self.predict_masks(img), {'model': self.model_label}
+        
+        light_label = self.label_for(light)
+        try:
+            with stage_timer('inference', light_label, timings):
+                masks = self.predict_masks(img, light)
+                confidence = mask_confidence(combine_masks(masks))['score']
+        except Exception as e:
+            logger.warning(f"⚠️ Hafif model çalışmadı ({light}): {e}")
+            confidence = None
+        
+        cascade = {
+            'tier': 'light',
+            'confidence': round(confidence, 4) if confidence is not None else None,
+            'threshold': self.cascade_threshold
+        }
+        if confidence is not None and confidence >= self.cascade_threshold:
+            return masks, {'model': light_label, 'cascade': cascade}
+        
+        logger.info(f"🪜 Güven düşük ({cascade['confidence']}), {self.model_label} çalışıyor...")
+        with stage_timer('inference', self.model_label, timings):
+            masks = self.predict_masks(img)
+        cascade['tier'] = 'heavy'
+        return masks, {'model': self.model_label, 'cascade': cascade}
+    
+    def load_model(self, model_name):
+        """
+        Modeli istenen hassasiyette yükle (int8 kabul edilmemişse fp32)
+        """
+        return self.session_pool.get(model_name, resolve_precision(model_name, self.requested_precision))
+    
     def auto_select_best_model(self):
         """
         Sistemde mevcut olan en iyi modeli otomatik seç
         """
         logger.info("🔍 En iyi model aranıyor...")
         
-        # Öncelik sırası: kalite * kıyafet_skoru
+        # Öncelik sırası: bu makinede ölçülmüş modeller (model_benchmark.py profili,
+        # kalite x gecikme bütçesi), sonra ölçülmemişler (kalite * kıyafet_skoru)
+        profile = read_model_profile().get('models', {})
+        shape = machine_shape()
+        measured_scores = {}
         model_scores = {}
         
         for model_name, info in self.premium_models.items():
-            if info['recommended']:
-                score = (info['quality'] * info['clothing_score']) / 100
-                model_scores[model_name] = score
-        
-        # En yüksek skordan başlayarak dene
-        sorted_models = sorted(model_scores.items(), key=lambda x: x[1], reverse=True)
+            if not info['recommended']:
+                continue
+            measured = profile.get(profile_key(model_name, shape))
+            if measured:
+                measured_scores[model_name] = measured_score(measured, self.latency_budget_ms)
+            else:
+                model_scores[model_name] = (info['quality'] * info['clothing_score']) / 100
         
+        # En yüksek skordan başlayarak dene - yerel dosyası olanlar önce,
+        # sadece kazanan yüklenir ve seçim sonraki açılışlar için diske yazılır
+        sorted_models = (sorted(measured_scores.items(), key=lambda x: x[1], reverse=True) +
+                         sorted(model_scores.items(), key=lambda x: x[1], reverse=True))
         for model_name, score in sorted_models:
-            try:
-                logger.info(f"🧪 Test ediliyor: {model_name} (skor: {score:.1f})")
-                self.session = new_session(model_name)
-                self.best_model = model_name
-                logger.info(f"✅ Seçildi: {model_name}")
-                logger.info(f"📋 {self.premium_models[model_name]['description']}")
-                return
-            except Exception as e:
-                logger.warning(f"❌ {model_name} yüklenemedi: {e}")
-                continue
+            source = 'ölçülmüş' if model_name in measured_scores else 'tahmini'
+            logger.info(f"📊 Aday: {model_name} (skor: {score:.1f}, {source})")
+        
+        selected = select_model([m for m, _ in sorted_models], self.load_model)
+        if selected:
+            self.best_model = selected
+            self.precision = resolve_precision(selected, self.requested_precision)
+            logger.info(f"✅ Seçildi: {self.model_label}")
+            logger.info(f"📋 {self.premium_models[selected]['description']}")
+            return
         
         # Hiçbiri çalışmazsa son çare
         logger.warning("⚠️  Premium modeller yüklenemedi, varsayılan kullanılıyor...")
         try:
-            self.session = new_session('u2net')
+            self.session_pool.get('u2net')
             self.best_model = 'u2net'
             logger.info("✅ u2net modeli fallback olarak yüklendi")
         except Exception as e:
             logger.error(f"❌ KRITIK: u2net modeli bile yüklenemedi: {e}")
             logger.error(f"Model yükleme traceback: {traceback.format_exc()}")
-            self.session = None
             self.best_model = 'simple_ultra'
     
     def intelligent_preprocessing(self, image_path):
         """
         Akıllı ön işleme - görüntü tipine göre optimize et
         """
+        return self.intelligent_preprocessing_image(Image.open(image_path))
+    
+    def intelligent_preprocessing_image(self, img, max_dim=None):
+        """
+        Akıllı ön işleme (bellek içi) - PIL görüntüsü alır, PIL görüntüsü döner
+        max_dim: uzun kenar sınırı (varsayılan DEFAULT_MAX_DIM)
+        """
         try:
-            img = Image.open(image_path)
             original_size = img.size
             
             print(f"🧠 Akıllı analiz: {original_size[0]}x{original_size[1]}")
@@ -112,6 +359,7 @@ class UltraClothingBgRemover:
                 img = img.convert('RGB')
             
             # Akıllı boyutlandırma
+            limit = max_dim or self.DEFAULT_MAX_DIM
             max_dim = max(original_size)
             
             if max_dim < 512:
@@ -122,9 +370,9 @@ class UltraClothingBgRemover:
                 img = img.resize(new_size, Image.Resampling.LANCZOS)
                 print(f"📈 Büyütüldü: {original_size} -> {new_size}")
                 
-            elif max_dim > 2048:
+            elif max_dim > limit:
                 # Çok büyük görüntü - küçült
-                scale_factor = 2048 / max_dim
+                scale_factor = limit / max_dim
                 new_size = (int(original_size[0] * scale_factor), 
                            int(original_size[1] * scale_factor))
                 img = img.resize(new_size, Image.Resampling.LANCZOS)
@@ -134,85 +382,192 @@ class UltraClothingBgRemover:
             
         except Exception as e:
             print(f"❌ Ön işleme hatası: {e}")
-            return Image.open(image_path)
+            return img
     
     def ultra_background_removal(self, input_path, output_path=None):
         """
         Ultra gelişmiş arka plan kaldırma
         """
+        logger.info(f"🚀 ULTRA İŞLEM: {os.path.basename(input_path)}")
+        
         try:
-            logger.info(f"🚀 ULTRA İŞLEM: {os.path.basename(input_path)}")
-            logger.info(f"🤖 Model: {self.best_model}")
+            img = Image.open(input_path)
+        except Exception as e:
+            logger.error(f"❌ Görüntü açılamadı: {e}")
+            return None
+        
+        result = self.ultra_background_removal_image(img)
+        if result is None:
+            return None
+        
+        # Çıktı dosyası
+        if output_path is None:
+            input_file = Path(input_path)
+            output_path = input_file.parent / f"{input_file.stem}_ultra_bg_removed.png"
+        
+        result.save(output_path, "PNG")
+        logger.info(f"📁 Çıktı: {output_path}")
+        
+        return str(output_path)
+    
+    def ultra_background_removal_image(self, img, timings=None, model_name=None, max_dim=None, report=None):
+        """
+        Ultra gelişmiş arka plan kaldırma (bellek içi) - RGBA PIL görüntüsü döner
+        timings (StageTimings) verilirse ön işleme ve model süreleri eklenir.
+        model_name / max_dim verilirse seçili model ve varsayılan çözünürlük yerine kullanılır.
+        report (dict) verilirse sunan model ve kademeli mod bilgisi yazılır.
+        """
+        label = self.label_for(model_name)
+        try:
+            logger.info(f"🤖 Model: {label}")
+            
+            # Zaten kesilmiş girdi - ön işleme sonrası alfa geri eklenir, model atlanır
+            alpha = self.input_alpha(img, model_name)
+            if alpha is not None:
+                with stage_timer('preprocess', self.INPUT_ALPHA_LABEL, timings):
+                    result = self.intelligent_preprocessing_image(img, max_dim)
+                    result.putalpha(alpha.resize(result.size, Image.Resampling.BILINEAR))
+                if report is not None:
+                    report.update({'model': self.INPUT_ALPHA_LABEL})
+                return result
             
             # Session kontrolü
-            if self.session is None:
+            if self.best_model == 'simple_ultra' and model_name is None:
                 logger.warning("⚠️  Rembg session bulunamadı, basit işlem yapılıyor...")
-                return self.simple_background_removal(input_path, output_path)
+                with stage_timer('inference', label, timings):
+                    return self.simple_background_removal_image(img)
             
             start_time = time.time()
             
-            # Akıllı ön işleme
-            processed_img = self.intelligent_preprocessing(input_path)
-            
-            # Byte array'e çevir
-            import io
-            img_byte_arr = io.BytesIO()
-            processed_img.save(img_byte_arr, format='PNG', quality=95)
-            input_data = img_byte_arr.getvalue()
-            
-            # Arka planı kaldır
-            logger.info("🧠 AI model çalışıyor...")
-            output_data = remove(input_data, session=self.session)
+            # Akıllı ön işleme - metrik etiketi sunan yol belli olunca yazılır
+            with StageClock('preprocess', timings) as preprocess_clock:
+                processed_img = self.intelligent_preprocessing_image(img, max_dim)
+            
+            # Arka planı kaldır - PIL görüntüsü doğrudan verilir, PNG encode/decode yok
+            studio = self.studio_masks(processed_img, timings) if self.studio_fast_path and model_name is None else None
+            if studio is not None:
+                result = apply_masks(processed_img, studio)
+                served = {'model': self.STUDIO_LABEL}
+            elif self.cascade and model_name is None:
+                logger.info("🧠 AI model çalışıyor...")
+                masks, served = self.cascade_masks(processed_img, timings)
+                result = apply_masks(processed_img, masks)
+            else:
+                logger.info("🧠 AI model çalışıyor...")
+                with stage_timer('inference', label, timings):
+                    result = apply_masks(processed_img, self.predict_masks(processed_img, model_name))
+                served = {'model': label}
+            preprocess_clock.observe(served['model'])
+            if report is not None:
+                report.update(served)
             
             process_time = time.time() - start_time
-            logger.info(f"⏱️ Model işlem süresi: {process_time:.2f} saniye")
-            
-            # Çıktı dosyası
-            if output_path is None:
-                input_file = Path(input_path)
-                output_path = input_file.parent / f"{input_file.stem}_ultra_bg_removed.png"
-            
-            # Kaydet
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
-            
             logger.info(f"✅ Tamamlandı: {process_time:.2f} saniye")
-            logger.info(f"📁 Çıktı: {output_path}")
             
-            return str(output_path)
+            return result
             
         except Exception as e:
             logger.error(f"❌ Ultra işlem hatası: {e}")
             logger.error(f"Ultra traceback: {traceback.format_exc()}")
-            # Fallback olarak basit işlem dene
+            # Fallback olarak basit işlem dene - sonucu istenen model değil u2net üretir
             logger.info("🔄 Fallback basit işlem deneniyor...")
-            return self.simple_background_removal(input_path, output_path)
+            if report is not None:
+                report.clear()
+                report['model'] = self.FALLBACK_LABEL
+            with stage_timer('inference', self.FALLBACK_LABEL, timings):
+                return self.simple_background_removal_image(img)
+    
+    def predict_alpha(self, img, model_name=None, max_dim=None, report=None):
+        """
+        Sadece alfa maskesi (bellek içi) - girdiyle aynı boyutta 'L' maske döner
+        Konumlandırma/iyileştirme yapılmaz; maske orijinal fotoğrafla hizalıdır.
+        report (dict) verilirse sunan model ve kademeli mod bilgisi yazılır.
+        """
+        label = self.label_for(model_name)
+        try:
+            alpha = self.input_alpha(img, model_name)
+            if alpha is not None:
+                if report is not None:
+                    report.update({'model': self.INPUT_ALPHA_LABEL})
+                return alpha
+            
+            if self.best_model == 'simple_ultra' and model_name is None:
+                result = self.simple_background_removal_image(img)
+                return result.getchannel('A') if result is not None else None
+            
+            # Kaldırma ile aynı ön işleme - maske önbelleği iki yol arasında paylaşılır
+            with StageClock('preprocess') as preprocess_clock:
+                processed_img = self.intelligent_preprocessing_image(img, max_dim)
+            studio = self.studio_masks(processed_img) if self.studio_fast_path and model_name is None else None
+            if studio is not None:
+                masks, served = studio, {'model': self.STUDIO_LABEL}
+            elif self.cascade and model_name is None:
+                masks, served = self.cascade_masks(processed_img)
+            else:
+                with stage_timer('inference', label):
+                    masks = self.predict_masks(processed_img, model_name)
+                served = {'model': label}
+            preprocess_clock.observe(served['model'])
+            if report is not None:
+                report.update(served)
+            alpha = combine_masks(masks)
+            if alpha is not None and alpha.size != img.size:
+                alpha = alpha.resize(img.size, Image.Resampling.BILINEAR)
+            return alpha
+            
+        except Exception as e:
+            logger.error(f"❌ Maske hatası: {e}")
+            logger.error(f"Mask traceback: {traceback.format_exc()}")
+            # Kaldırma ile aynı fallback - maskeyi u2net üretir
+            logger.info("🔄 Fallback basit işlem deneniyor...")
+            if report is not None:
+                report.clear()
+                report['model'] = self.FALLBACK_LABEL
+            with stage_timer('inference', self.FALLBACK_LABEL):
+                result = self.simple_background_removal_image(img)
+            return result.getchannel('A') if result is not None else None
+    
+    def predict_masks(self, img, model_name=None):
+        """
+        Model maskelerini al - önce maske önbelleği, sonra mikro-batch zamanlayıcı
+        """
+        scheduler = self.scheduler_for(model_name)
+        if self.mask_cache is not None:
+            return self.mask_cache.get_or_predict(img, self.label_for(model_name), scheduler.predict)
+        return scheduler.predict(img)
     
     def simple_background_removal(self, input_path, output_path=None):
         """
         Basit arka plan kaldırma - session olmadan
         """
+        logger.info(f"🔧 Basit işlem: {os.path.basename(input_path)}")
+        
         try:
-            logger.info(f"🔧 Basit işlem: {os.path.basename(input_path)}")
-            
-            # Session olmadan varsayılan modeli kullan
-            with open(input_path, 'rb') as f:
-                input_data = f.read()
-            
-            # Varsayılan rembg kullan
-            output_data = remove(input_data)
-            
-            # Çıktı dosyası
-            if output_path is None:
-                input_file = Path(input_path)
-                output_path = input_file.parent / f"{input_file.stem}_ultra_bg_removed.png"
-            
-            # Kaydet
-            with open(output_path, 'wb') as f:
-                f.write(output_data)
-            
-            logger.info(f"✅ Basit işlem tamamlandı: {output_path}")
-            return str(output_path)
+            img = Image.open(input_path)
+        except Exception as e:
+            logger.error(f"❌ Görüntü açılamadı: {e}")
+            return None
+        
+        result = self.simple_background_removal_image(img)
+        if result is None:
+            return None
+        
+        # Çıktı dosyası
+        if output_path is None:
+            input_file = Path(input_path)
+            output_path = input_file.parent / f"{input_file.stem}_ultra_bg_removed.png"
+        
+        result.save(output_path, "PNG")
+        logger.info(f"✅ Basit işlem tamamlandı: {output_path}")
+        return str(output_path)
+    
+    def simple_background_removal_image(self, img):
+        """
+        Basit arka plan kaldırma (bellek içi) - seçili session olmadan
+        """
+        try:
+            # Varsayılan rembg modeli, havuzdaki paylaşılan session ile
+            return remove(img, session=self.session_pool.get('u2net'))
             
         except Exception as e:
             logger.error(f"❌ Basit işlem de başarısız: {e}")
@@ -224,18 +579,42 @@ class UltraClothingBgRemover:
         AI destekli akıllı konumlandırma
         """
         try:
-            img = Image.open(image_path).convert("RGBA")
-            width, height = img.size
+            img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ AI konumlandırma hatası: {e}")
+            return image_path
+        
+        positioned = self.ai_positioning_image(img, mode=mode)
+        if positioned is img:
+            return image_path
+        
+        # Çıktı dosyası
+        if output_path is None:
+            input_file = Path(image_path)
+            output_path = input_file.parent / f"{input_file.stem}_ai_positioned.png"
+        
+        positioned.save(output_path, "PNG")
+        
+        return str(output_path)
+    
+    def ai_positioning_image(self, img, mode='smart'):
+        """
+        AI destekli akıllı konumlandırma (bellek içi)
+        Nesne bulunamazsa veya hata olursa girdi görüntüsünü aynen döner
+        """
+        try:
+            rgba = img.convert("RGBA")
+            width, height = rgba.size
             
             print(f"🧠 AI konumlandırma: {width}x{height}")
             
             # Alpha kanalından nesne analizi
-            alpha = np.array(img)[:,:,3]
+            alpha = np.array(rgba)[:,:,3]
             non_zero_indices = np.where(alpha > 0)
             
             if len(non_zero_indices[0]) == 0:
                 print("⚠️  Nesne bulunamadı")
-                return image_path
+                return img
             
             # Nesne sınırları
             top = np.min(non_zero_indices[0])
@@ -266,32 +645,47 @@ class UltraClothingBgRemover:
             
             # Nesneyi kes ve yapıştır
             crop_box = (left, top, right + 1, bottom + 1)
-            object_img = img.crop(crop_box)
+            object_img = rgba.crop(crop_box)
             new_canvas.paste(object_img, (paste_x, paste_y), object_img)
             
-            # Çıktı dosyası
-            if output_path is None:
-                input_file = Path(image_path)
-                output_path = input_file.parent / f"{input_file.stem}_ai_positioned.png"
-            
-            new_canvas.save(output_path, "PNG")
-            
             print(f"✅ AI konumlandırma: {canvas_width}x{canvas_height}")
             
-            return str(output_path)
+            return new_canvas
             
         except Exception as e:
             print(f"❌ AI konumlandırma hatası: {e}")
-            return image_path
+            return img
     
     def enhance_for_ecommerce(self, image_path, output_path=None):
         """E-ticaret iyileştirmesi"""
         try:
-            img = Image.open(image_path).convert("RGBA")
+            img = Image.open(image_path)
+        except Exception as e:
+            print(f"❌ İyileştirme hatası: {e}")
+            return image_path
+        
+        enhanced = self.enhance_for_ecommerce_image(img)
+        if enhanced is img:
+            return image_path
+        
+        if output_path is None:
+            input_file = Path(image_path)
+            output_path = input_file.parent / f"{input_file.stem}_ultra_enhanced.png"
+        
+        enhanced.save(output_path, "PNG")
+        print(f"✅ Ultra iyileştirme: {output_path}")
+        
+        return str(output_path)
+    
+    def enhance_for_ecommerce_image(self, img):
+        """E-ticaret iyileştirmesi (bellek içi)"""
+        try:
+            rgba = img.convert("RGBA")
+            alpha = rgba.split()[3]
             
             # RGB kısmını al
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])
+            rgb_img = Image.new("RGB", rgba.size, (255, 255, 255))
+            rgb_img.paste(rgba, mask=alpha)
             
             # İyileştirmeler
             enhancer = ImageEnhance.Contrast(rgb_img)
@@ -305,20 +699,13 @@ class UltraClothingBgRemover:
             
             # Alpha geri ekle
             final_img = rgb_img.convert("RGBA")
-            final_img.putalpha(img.split()[3])
-            
-            if output_path is None:
-                input_file = Path(image_path)
-                output_path = input_file.parent / f"{input_file.stem}_ultra_enhanced.png"
-            
-            final_img.save(output_path, "PNG")
-            print(f"✅ Ultra iyileştirme: {output_path}")
+            final_img.putalpha(alpha)
             
-            return str(output_path)
+            return final_img
             
         except Exception as e:
             print(f"❌ İyileştirme hatası: {e}")
-            return image_path
+            return img
     
     def create_variants(self, image_path, output_dir=None):
         """Varyant oluşturma"""
@@ -330,87 +717,160 @@ class UltraClothingBgRemover:
             
             output_dir.mkdir(exist_ok=True)
             
-            img = Image.open(image_path).convert("RGBA")
+            img = Image.open(image_path)
             base_name = Path(image_path).stem
             
-            variants = {
-                "thumbnail": (200, 200),
-                "small": (400, 400),
-                "medium": (800, 800),
-                "large": (1200, 1200),
-                "xl": (1600, 1600)
-            }
-            
-            created_files = []
-            
-            for variant_name, size in variants.items():
-                img_copy = img.copy()
-                img_copy.thumbnail(size, Image.Resampling.LANCZOS)
-                
-                canvas = Image.new("RGBA", size, (0, 0, 0, 0))
-                paste_x = (size[0] - img_copy.width) // 2
-                paste_y = (size[1] - img_copy.height) // 2
-                canvas.paste(img_copy, (paste_x, paste_y), img_copy)
-                
-                variant_path = output_dir / f"{base_name}_ultra_{variant_name}.png"
-                canvas.save(variant_path, "PNG")
-                created_files.append(str(variant_path))
-            
-            return created_files
+            return self.save_variants(self.render_variants(img), output_dir, base_name)
             
         except Exception as e:
             print(f"❌ Varyant hatası: {e}")
             return []
     
-    def ultra_process(self, input_path, options=None):
+    def render_variants(self, img):
+        """Varyantları bellek içinde oluştur - {isim: RGBA görüntü} döner"""
+        img = img.convert("RGBA")
+        return {
+            variant_name: render_variant(img, size)
+            for variant_name, size in self.VARIANT_SIZES.items()
+        }
+    
+    def save_variants(self, variants, output_dir, base_name):
+        """Bellek içi varyantları PNG olarak kaydet"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True)
+        
+        created_files = []
+        for variant_name, canvas in variants.items():
+            variant_path = output_dir / f"{base_name}_ultra_{variant_name}.png"
+            canvas.save(variant_path, "PNG")
+            created_files.append(str(variant_path))
+        
+        return created_files
+    
+    def ultra_process_image(self, img, options=None, timings=None):
         """
-        Ultra tam işlem pipeline'ı
+        Ultra tam işlem pipeline'ı (bellek içi)
+        Aşamalar arasında PIL görüntüsü taşınır, hiçbir ara dosya yazılmaz.
+        
+        options['model_name'] / options['max_dim'] seçili model ve varsayılan
+        çözünürlük yerine kullanılır (SLO denetleyicisi veya istemci sabitlemesi).
+        
+        Dönüş: {'image': son görüntü, 'variants': {isim: görüntü},
+                'model': kullanılan model, 'stages': çalışan aşamalar,
+                'timings': StageTimings, 'cascade': kademeli mod bilgisi veya None} veya None
         """
         default_options = {
             'ai_positioning': True,
             'enhance': True,
             'create_variants': True,
-            'positioning_mode': 'smart'
+            'positioning_mode': 'smart',
+            'model_name': None,
+            'max_dim': None
         }
         
         if options:
             default_options.update(options)
         
-        print(f"\n{'='*60}")
-        print(f"🚀 ULTRA PROCESS: {os.path.basename(input_path)}")
-        print(f"{'='*60}")
-        
-        current_file = input_path
+        stages = []
+        if timings is None:
+            timings = StageTimings()
         
         # 1. Ultra arka plan kaldırma
-        bg_removed = self.ultra_background_removal(current_file)
-        if not bg_removed:
+        report = {}
+        current = self.ultra_background_removal_image(
+            img, timings,
+            model_name=default_options['model_name'],
+            max_dim=default_options['max_dim'],
+            report=report
+        )
+        if current is None:
             return None
-        current_file = bg_removed
+        stages.append('bg_removed')
+        label = report.get('model') or self.label_for(default_options['model_name'])
         
         # 2. AI konumlandırma
         if default_options['ai_positioning']:
-            positioned = self.ai_positioning(
-                current_file,
-                mode=default_options['positioning_mode']
-            )
-            current_file = positioned
+            with stage_timer('positioning', label, timings):
+                positioned = self.ai_positioning_image(
+                    current,
+                    mode=default_options['positioning_mode']
+                )
+            if positioned is not current:
+                stages.append('ai_positioned')
+            current = positioned
         
         # 3. E-ticaret iyileştirmesi
         if default_options['enhance']:
-            enhanced = self.enhance_for_ecommerce(current_file)
-            current_file = enhanced
+            with stage_timer('enhance', label, timings):
+                enhanced = self.enhance_for_ecommerce_image(current)
+            if enhanced is not current:
+                stages.append('enhanced')
+            current = enhanced
         
         # 4. Varyantlar
+        variants = {}
         if default_options['create_variants']:
-            variants = self.create_variants(current_file)
+            with stage_timer('variants', label, timings):
+                variants = self.render_variants(current)
             print(f"✅ {len(variants)} varyant oluşturuldu")
         
+        return {
+            'image': current,
+            'variants': variants,
+            'model': label,
+            'stages': stages,
+            'timings': timings,
+            'cascade': report.get('cascade')
+        }
+    
+    def ultra_process(self, input_path, options=None, output_dir=None, timings=None, report=None):
+        """
+        Ultra tam işlem pipeline'ı
+        Girdi bir kez okunur, sadece son çıktılar PNG olarak yazılır.
+        output_dir verilmezse çıktılar girdinin yanına yazılır.
+        timings (StageTimings) verilirse aşama süreleri (decode ... encode) eklenir.
+        report (dict) verilirse sunan model ve kademeli mod bilgisi yazılır.
+        """
+        print(f"\n{'='*60}")
+        print(f"🚀 ULTRA PROCESS: {os.path.basename(input_path)}")
+        print(f"{'='*60}")
+        
+        try:
+            # Metrik etiketi sunan model (stüdyo / girdi alfası / model) belli olunca yazılır
+            with StageClock('decode', timings) as decode_clock:
+                img = open_image(input_path)
+        except Exception as e:
+            print(f"❌ Görüntü açılamadı: {e}")
+            return None
+        
+        result = self.ultra_process_image(img, options, timings)
+        if result is None:
+            return None
+        decode_clock.observe(result['model'])
+        if report is not None:
+            report.update(model=result['model'], cascade=result['cascade'])
+        
+        # Dosya adı, eski dosya tabanlı pipeline ile aynı kalır
+        suffixes = {
+            'bg_removed': '_ultra_bg_removed',
+            'ai_positioned': '_ai_positioned',
+            'enhanced': '_ultra_enhanced'
+        }
+        input_file = Path(input_path)
+        output_dir = Path(output_dir) if output_dir else input_file.parent
+        stem = input_file.stem + ''.join(suffixes[s] for s in result['stages'])
+        current_file = output_dir / f"{stem}.png"
+        with stage_timer('encode', result['model'], timings):
+            result['image'].save(current_file, "PNG")
+        
+        if result['variants']:
+            self.save_variants(result['variants'], output_dir / "ultra_variants", stem)
+        
         print(f"\n🎉 ULTRA İŞLEM TAMAMLANDI!")
         print(f"📁 Son dosya: {current_file}")
-        print(f"🤖 Kullanılan model: {self.best_model}")
+        print(f"🤖 Kullanılan model: {result['model']}")
         
-        return current_file
+        return str(current_file)
 
 
 def main():
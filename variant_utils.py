@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Varyant yardımcıları
+Ana (master) sonuçtan tek bir e-ticaret varyantı üretir; hem remover'ların
+toplu varyant üretimi hem de API'nin tembel (lazy) varyant endpoint'i kullanır.
+"""
+
+from PIL import Image
+
+
+def render_variant(img, size):
+    """
+    Görüntüyü en-boy oranını koruyarak size (genişlik, yükseklik) şeffaf
+    canvas'ına sığdır ve ortala - RGBA görüntü döner
+    """
+    size = tuple(size)
+    # convert() her zaman kopya döner; thumbnail() çağıranın görüntüsünü bozmaz
+    img_copy = img.convert("RGBA")
+    img_copy.thumbnail(size, Image.Resampling.LANCZOS)
+
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    paste_x = (size[0] - img_copy.width) // 2
+    paste_y = (size[1] - img_copy.height) // 2
+    canvas.paste(img_copy, (paste_x, paste_y), img_copy)
+
+    return canvas